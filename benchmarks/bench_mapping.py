@@ -0,0 +1,93 @@
+"""Mapping benchmark: ranked spec -> client matching over a large client.
+
+Usage::
+
+    python -m benchmarks.bench_mapping [--client 50000] [--spec 1500] [--words 3000] [--threshold 0.8]
+
+Generates ``client`` client functions with Lodestar-like camelCase names
+(some fork-suffixed, some methods, some near misses of spec names) and
+``spec`` spec functions spread over the default forks, their words drawn
+from consensus terms and ``words`` made-up ones, then times building
+:class:`~eth_spec_lint.client.mapping_index.MappingIndex` and running
+:func:`~eth_spec_lint.client.mapping.build_fork_mapping` with exact names
+only and with fuzzy matching at ``threshold``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import string
+import time
+
+from eth_spec_lint.client.base import ClientFunction
+from eth_spec_lint.client.mapping import build_fork_mapping, snake_to_camel
+from eth_spec_lint.client.mapping_index import MappingIndex
+from eth_spec_lint.parser.fork_graph import FORK_ORDER, ForkGraph, ForkRegistry
+from eth_spec_lint.parser.models import SpecFunction
+
+_VERBS = ["get", "process", "compute", "is", "has", "verify", "apply", "update", "initialize", "upgrade"]
+_WORDS = [
+    "attestation", "attestations", "validator", "validators", "balance", "balances", "slot", "epoch",
+    "committee", "sync", "aggregate", "deposit", "withdrawal", "block", "header", "root", "proposer",
+    "index", "indices", "churn", "limit", "participation", "flags", "reward", "penalty", "execution",
+    "payload", "blob", "sidecar", "inclusion", "proof", "state", "fork", "digest", "domain", "signing",
+]
+
+
+def _vocabulary(rng: random.Random, size: int) -> tuple[list[str], list[float]]:
+    """Consensus words first, padded with made-up ones; Zipf-weighted like identifier words."""
+    words = [*_WORDS, *("".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10))) for _ in range(size))]
+    return words, [1 / rank for rank in range(1, len(words) + 1)]
+
+
+def _names(rng: random.Random, count: int, vocabulary: tuple[list[str], list[float]]) -> list[str]:
+    words, weights = vocabulary
+    return [
+        "_".join([rng.choice(_VERBS), *rng.choices(words, weights, k=rng.randint(1, 4))])
+        for _ in range(count)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--client", type=int, default=50_000)
+    parser.add_argument("--spec", type=int, default=1_500)
+    parser.add_argument("--words", type=int, default=3_000, help="distinct words in names")
+    parser.add_argument("--threshold", type=float, default=0.8)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    vocabulary = _vocabulary(rng, args.words)
+    spec_fns = [
+        SpecFunction(name, f"def {name}(): pass", ["state"] * rng.randint(0, 3), fork=rng.choice(FORK_ORDER))
+        for name in _names(rng, args.spec, vocabulary)
+    ]
+    client_fns = []
+    for i, name in enumerate(_names(rng, args.client, vocabulary)):
+        camel = snake_to_camel(name)
+        if i % 7 == 0:
+            camel += rng.choice(FORK_ORDER).capitalize()
+        elif i % 50 == 0:
+            # Near misses of spec names, for fuzzy matching to find
+            camel = snake_to_camel(rng.choice(spec_fns).name) + "s"
+        client_fns.append(ClientFunction(
+            camel, params=("state",) * rng.randint(0, 3), file_path=f"src/dir{i % 300}/file{i % 3000}.ts",
+            kind="method" if i % 5 == 0 else "function", exported=i % 2 == 0,
+        ))
+    graph = ForkGraph(spec_fns, ForkRegistry(FORK_ORDER))
+
+    start = time.perf_counter()
+    MappingIndex(client_fns, FORK_ORDER)
+    build = time.perf_counter() - start
+    print(f"index build:     {build * 1000:8.1f} ms  ({len(client_fns)} client functions)")
+
+    for label, threshold in (("exact", None), (f"fuzzy {args.threshold}", args.threshold)):
+        start = time.perf_counter()
+        pairs = build_fork_mapping(graph, client_fns, threshold=threshold)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<16} {elapsed * 1000:8.1f} ms  ({len(pairs)} pairs for {len(graph)} spec functions)")
+
+
+if __name__ == "__main__":
+    main()
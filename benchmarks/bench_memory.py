@@ -0,0 +1,100 @@
+"""Memory benchmark: parsed record types, plain dataclasses vs. current.
+
+Usage::
+
+    python -m benchmarks.bench_memory [--count 200000]
+
+Builds ``count`` spec functions and client functions the way the parse
+indexes decode them (fresh fork/path strings per record) and reports the
+traced allocation for the legacy ``__dict__`` dataclasses against the
+slotted, frozen, string-interning ones. Source text is excluded from both,
+since it is the same size either way (and lazy for client functions).
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import tracemalloc
+from dataclasses import dataclass
+
+from eth_spec_lint.client.base import ClientFunction
+from eth_spec_lint.parser.models import SpecFunction
+
+
+@dataclass
+class LegacySpecFunction:
+    name: str
+    source: str
+    args: list[str]
+    return_type: str | None = None
+    fork: str = ""
+    file_path: str = ""
+    line_number: int = 0
+
+
+@dataclass
+class LegacyClientFunction:
+    name: str
+    source: str
+    params: list[str]
+    return_type: str | None = None
+    file_path: str = ""
+    line_number: int = 0
+    exported: bool = False
+
+
+def _rows(count: int) -> list[list]:
+    forks = ["phase0", "altair", "bellatrix", "capella", "deneb", "electra"]
+    rows = [
+        [f"fn_{i}", ["state", "index"], "None", forks[i % len(forks)],
+         f"consensus-specs/specs/{forks[i % len(forks)]}/beacon-chain-{i % 40}.md", i]
+        for i in range(count)
+    ]
+    # Round-trip through JSON so every string is a distinct object, as after
+    # decoding index payloads
+    return json.loads(json.dumps(rows))
+
+
+def _measure(build) -> int:
+    gc.collect()
+    tracemalloc.start()
+    records = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del records
+    return size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=200_000)
+    args = parser.parse_args()
+
+    rows = _rows(args.count)
+    cases = {
+        "spec, legacy": lambda: [
+            LegacySpecFunction(n, "", list(a), r, f, p, l) for n, a, r, f, p, l in json.loads(json.dumps(rows))
+        ],
+        "spec, current": lambda: [
+            SpecFunction(n, "", a, r, f, p, l) for n, a, r, f, p, l in json.loads(json.dumps(rows))
+        ],
+        "client, legacy": lambda: [
+            LegacyClientFunction(n, "", list(a), r, p, l) for n, a, r, _, p, l in json.loads(json.dumps(rows))
+        ],
+        "client, current": lambda: [
+            ClientFunction(n, params=a, return_type=r, file_path=p, line_number=l)
+            for n, a, r, _, p, l in json.loads(json.dumps(rows))
+        ],
+    }
+    results = {label: _measure(build) for label, build in cases.items()}
+    for label, size in results.items():
+        print(f"{label:<16} {size / 1e6:8.1f} MB  ({size / args.count:.0f} B/record)")
+    for kind in ("spec", "client"):
+        saved = 1 - results[f"{kind}, current"] / results[f"{kind}, legacy"]
+        print(f"{kind}: {saved:.0%} smaller")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Semantic mapping benchmark: embedding cache and top-k search over a large client.
+
+Usage::
+
+    python -m benchmarks.bench_semantic [--client 50000] [--spec 500] [--identifiers 50000] [--top-k 5]
+
+Generates ``client`` client function bodies and ``spec`` spec function
+bodies from a shared pool of ``identifiers``, then times
+:func:`~eth_spec_lint.client.semantic.semantic_candidates` with the local
+hashing embedder against a fresh embedding store (every body embedded) and
+again against the filled one (every body a cache hit, as on a re-run).
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import string
+import tempfile
+import time
+from pathlib import Path
+
+from eth_spec_lint.client.base import ClientFunction
+from eth_spec_lint.client.mapping import snake_to_camel
+from eth_spec_lint.client.semantic import EmbeddingStore, HashingEmbedder, semantic_candidates
+from eth_spec_lint.parser.models import SpecFunction
+
+
+def _body(rng: random.Random, identifiers: list[str], weights: list[float]) -> list[str]:
+    """Identifiers of one function body, snake_case."""
+    return rng.choices(identifiers, weights, k=rng.randint(5, 40))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--client", type=int, default=50_000)
+    parser.add_argument("--spec", type=int, default=500)
+    parser.add_argument("--identifiers", type=int, default=50_000, help="distinct identifiers in bodies")
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10))) for _ in range(3_000)]
+    word_weights = [1 / rank for rank in range(1, len(words) + 1)]
+    # Code reuses its identifiers; draw bodies from a Zipf-weighted pool
+    identifiers = ["_".join(rng.choices(words, word_weights, k=rng.randint(1, 3))) for _ in range(args.identifiers)]
+    weights = [1 / rank for rank in range(1, len(identifiers) + 1)]
+    spec_fns = [
+        SpecFunction(f"spec_{i}", "\n".join(f"    {name}(state)" for name in _body(rng, identifiers, weights)), ["state"])
+        for i in range(args.spec)
+    ]
+    client_fns = [
+        ClientFunction(f"client{i}", "\n".join(f"  {snake_to_camel(name)}(state);" for name in _body(rng, identifiers, weights)))
+        for i in range(args.client)
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label in ("cold", "warm"):
+            with EmbeddingStore(Path(tmp) / "index.db", HashingEmbedder()) as store:
+                start = time.perf_counter()
+                semantic_candidates(spec_fns, client_fns, store, args.top_k, min_score=0.0)
+                elapsed = time.perf_counter() - start
+            print(f"{label:<6} {elapsed * 1000:8.1f} ms  ({store.misses} embedded, {store.hits} cached)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Micro-benchmark: spec code-block extraction, old vs. current.
+
+Usage::
+
+    python -m benchmarks.bench_spec_parser path/to/consensus-specs [--repeat 5]
+
+The "legacy" path reproduces the original extraction (a DOTALL regex over the
+whole file, ``ast.walk`` over every node, ``ast.get_source_segment`` on a
+re-joined block per definition); the
+"current" path is :func:`eth_spec_lint.parser.spec_parser.parse_spec_text`.
+Both run on markdown already read into memory, so only extraction is timed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import re
+import time
+from pathlib import Path
+
+from eth_spec_lint.parser.spec_parser import parse_spec_text
+
+_LEGACY_BLOCK_RE = re.compile(r"```python\s*\n(.*?)```", re.DOTALL)
+
+
+def legacy_extract(text: str) -> int:
+    count = 0
+    for block in _LEGACY_BLOCK_RE.findall(text):
+        try:
+            tree = ast.parse(block)
+        except SyntaxError:
+            continue
+        lines = block.splitlines()
+        for node in ast.walk(tree):
+            if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+                ast.get_source_segment("\n".join(lines), node)
+                count += 1
+    return count
+
+
+def current_extract(text: str) -> int:
+    fns, _, containers = parse_spec_text(text, "bench")
+    return len(fns) + len(containers)
+
+
+def _best(fn, texts: list[str], repeat: int) -> tuple[float, int]:
+    best, count = float("inf"), 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = sum(fn(text) for text in texts)
+        best = min(best, time.perf_counter() - start)
+    return best, count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("specs_repo", type=Path)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    files = sorted((args.specs_repo / "specs").rglob("*.md"))
+    texts = [f.read_text() for f in files]
+    size = sum(len(t) for t in texts)
+    print(f"{len(files)} files, {size / 1e6:.1f} MB of markdown")
+
+    legacy, legacy_defs = _best(legacy_extract, texts, args.repeat)
+    current, current_defs = _best(current_extract, texts, args.repeat)
+    # legacy also counts nested defs, which the current parser no longer reports
+    print(f"legacy:  {legacy * 1000:8.1f} ms  ({legacy_defs} definitions)")
+    print(f"current: {current * 1000:8.1f} ms  ({current_defs} definitions)")
+    print(f"speedup: {legacy / current:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,32 +2,152 @@
 
 from __future__ import annotations
 
+import re
 import subprocess
+import sys
+from collections.abc import Iterable
 from pathlib import Path
 
 from ..client.base import ClientFunction
+from ..client.prefilter import NamePrefilter
 from ..parser.models import SpecFunction
+from ..parser.spec_parser import list_spec_files, parse_spec_files, parse_spec_text
 
+_HUNK_RE = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
 
-def get_changed_files(base_ref: str = "origin/main") -> list[str]:
-    """Get list of files changed relative to base ref."""
+
+def get_changed_hunks(base_ref: str, repo_path: str | Path = ".") -> dict[str, list[tuple[int, int]]]:
+    """Changed line ranges of each file in ``repo_path`` since ``base_ref``.
+
+    Ranges are ``(first, last)`` line numbers in the working tree version.
+    A pure deletion yields the two lines either side of it. Paths are
+    relative to ``repo_path``.
+    """
     result = subprocess.run(
-        ["git", "diff", "--name-only", base_ref],
-        capture_output=True, text=True, check=True,
+        ["git", "diff", "-U0", "--no-color", "--no-renames", "--relative", base_ref],
+        capture_output=True, text=True, check=True, cwd=repo_path,
     )
-    return [line.strip() for line in result.stdout.splitlines() if line.strip()]
+    hunks: dict[str, list[tuple[int, int]]] = {}
+    current: list[tuple[int, int]] | None = None
+    for line in result.stdout.splitlines():
+        if line.startswith("+++ "):
+            current = hunks.setdefault(line[6:], []) if line.startswith("+++ b/") else None
+        elif current is not None and (m := _HUNK_RE.match(line)):
+            start, count = int(m[1]), int(m[2] or 1)
+            current.append((start, start + count - 1) if count else (start, start + 1))
+    return hunks
+
+
+def changed_spec_functions(
+    repo_path: str | Path,
+    forks: list[str],
+    base_ref: str,
+    jobs: int = 1,
+) -> list[SpecFunction]:
+    """Spec functions of the checkout whose source differs from ``base_ref``.
+
+    Only definitions whose lines a diff hunk touches are considered, and of
+    those only the ones that are new or whose source actually changed
+    (edits around a function shift its lines without changing it).
+    """
+    repo = Path(repo_path)
+    hunks = get_changed_hunks(base_ref, repo)
+    files = [
+        (path, fork) for path, fork in list_spec_files(repo, forks) if path.relative_to(repo).as_posix() in hunks
+    ]
+    changed: list[SpecFunction] = []
+    by_file: dict[str, list[SpecFunction]] = {}
+    for fn in parse_spec_files(files, jobs=jobs)[0]:
+        by_file.setdefault(fn.file_path, []).append(fn)
+    for path, fork in files:
+        rel = path.relative_to(repo).as_posix()
+        touched = [
+            fn for fn in by_file.get(str(path), [])
+            if any(first <= fn.end_line and fn.line_number <= last for first, last in hunks[rel])
+        ]
+        if not touched:
+            continue
+        old = subprocess.run(
+            ["git", "show", f"{base_ref}:./{rel}"], capture_output=True, text=True, cwd=repo,
+        )
+        # A file added since base_ref has no old version
+        old_sources = {fn.name: fn.source for fn in parse_spec_text(old.stdout, fork)[0]} if old.returncode == 0 else {}
+        changed.extend(fn for fn in touched if old_sources.get(fn.name) != fn.source)
+    return changed
+
+
+class ChangedLines:
+    """Changed line ranges per file, looked up by resolved path.
+
+    ``hunks`` is :func:`get_changed_hunks` output (paths relative to the
+    working directory). Each changed path, and each path queried, is
+    resolved once rather than once per function.
+    """
+
+    def __init__(self, hunks: dict[str, list[tuple[int, int]]]) -> None:
+        self._ranges = {str(Path(path).resolve()): ranges for path, ranges in hunks.items()}
+        self._resolved: dict[str, str] = {}
+
+    @classmethod
+    def whole_files(cls, paths: Iterable[str]) -> ChangedLines:
+        """Every line of ``paths`` counts as changed."""
+        return cls({path: [(1, sys.maxsize)] for path in paths})
+
+    def ranges(self, path: str) -> list[tuple[int, int]]:
+        resolved = self._resolved.get(path)
+        if resolved is None:
+            resolved = self._resolved[path] = str(Path(path).resolve())
+        return self._ranges.get(resolved, [])
+
+    def touches(self, fn: ClientFunction) -> bool:
+        """Whether a changed range overlaps the lines of ``fn``."""
+        last = max(fn.end_line, fn.line_number)
+        return any(first <= last and fn.line_number <= end for first, end in self.ranges(fn.file_path))
 
 
 def filter_pairs_by_changed_files(
     pairs: list[tuple[SpecFunction, ClientFunction]],
     changed_files: list[str],
+    changed_spec: Iterable[SpecFunction] = (),
+) -> list[tuple[SpecFunction, ClientFunction]]:
+    """Keep only pairs where the client file was changed, or the spec function
+    is one of ``changed_spec``."""
+    changed = ChangedLines.whole_files(changed_files)
+    spec_keys = {(fn.file_path, fn.name) for fn in changed_spec}
+    return [
+        (spec, client)
+        for spec, client in pairs
+        if changed.ranges(client.file_path) or (spec.file_path, spec.name) in spec_keys
+    ]
+
+
+def changed_functions(functions: Iterable[ClientFunction], changed: ChangedLines) -> list[ClientFunction]:
+    """Functions a hunk overlaps, plus functions that call (mention by name) one of those."""
+    functions = list(functions)
+    touched = {id(fn) for fn in functions if changed.touches(fn)}
+    calls = NamePrefilter(fn.name for fn in functions if id(fn) in touched)
+    return [fn for fn in functions if id(fn) in touched or calls.search(fn.source.encode())]
+
+
+def filter_pairs_by_changed_lines(
+    pairs: list[tuple[SpecFunction, ClientFunction]],
+    changed: ChangedLines,
+    functions: Iterable[ClientFunction] = (),
+    changed_spec: Iterable[SpecFunction] = (),
 ) -> list[tuple[SpecFunction, ClientFunction]]:
-    """Keep only pairs where the client file was changed."""
-    changed_set = {str(Path(f).resolve()) for f in changed_files}
-    # Also try relative paths
-    changed_set.update(changed_files)
+    """Keep only pairs whose client function itself changed.
+
+    A client function counts as changed when a hunk overlaps its lines, or
+    when it calls (mentions by name) one of ``functions`` that a hunk
+    overlaps, such as an unmapped helper. Pairs of ``changed_spec``
+    functions are always kept.
+    """
+    calls = NamePrefilter(fn.name for fn in functions if changed.touches(fn))
+    spec_keys = {(fn.file_path, fn.name) for fn in changed_spec}
     return [
         (spec, client)
         for spec, client in pairs
-        if client.file_path in changed_set or str(Path(client.file_path).resolve()) in changed_set
+        if (spec.file_path, spec.name) in spec_keys
+        or changed.touches(client)
+        or calls.search(client.source.encode())
     ]
@@ -0,0 +1,161 @@
+"""Diff-scoped PR checks: parse only what a change can reach."""
+
+from __future__ import annotations
+
+import logging
+import re
+from collections.abc import Iterable
+from pathlib import Path
+
+from ..client.base import ClientFunction
+from ..client.lodestar import ANALYZER_VERSION, LodestarAnalyzer
+from ..client.mapping import build_fork_mapping, candidate_names, spec_name_candidates
+from ..client.mapping_index import MappingIndex, name_key
+from ..config import ClientConfig, Config
+from ..file_index import FileIndex
+from ..parser.fork_graph import ForkGraph, ForkRegistry
+from ..parser.models import SpecFunction
+from ..parser.spec_parser import PARSER_VERSION, parse_spec_files, spec_files_defining
+from .pr_filter import ChangedLines, changed_functions
+
+logger = logging.getLogger(__name__)
+
+
+def _glob_regex(pattern: str) -> re.Pattern[str]:
+    """Compile a ``glob`` pattern (with recursive ``**``) for whole-path matching."""
+    parts: list[str] = []
+    for token in re.split(r"(\*\*/|\*\*|\*|\?)", pattern):
+        if token == "**/":
+            parts.append(r"(?:.*/)?")
+        elif token == "**":
+            parts.append(r".*")
+        elif token == "*":
+            parts.append(r"[^/]*")
+        elif token == "?":
+            parts.append(r"[^/]")
+        else:
+            parts.append(re.escape(token))
+    return re.compile("".join(parts))
+
+
+class _ClientFiles:
+    """Maps paths to the keys the analyzer uses for files under ``source_globs``."""
+
+    def __init__(self, client: ClientConfig) -> None:
+        self.repo_path = client.repo_path
+        self.root = Path(client.repo_path).resolve()
+        self.patterns = [_glob_regex(g) for g in client.source_globs]
+
+    def key(self, path: str | Path) -> str | None:
+        path = Path(path).resolve()
+        if not path.is_relative_to(self.root) or not path.is_file():
+            return None
+        rel = path.relative_to(self.root).as_posix()
+        if not any(p.fullmatch(rel) for p in self.patterns):
+            return None
+        # Same form as globbing f"{repo_path}/{glob}" yields
+        return f"{self.repo_path}/{rel}"
+
+
+def changed_client_files(changed: list[str], client: ClientConfig) -> list[str]:
+    """Changed files (relative to the working directory) covered by the client globs.
+
+    Deleted files are dropped.
+    """
+    files = _ClientFiles(client)
+    return sorted({key for name in changed if (key := files.key(name)) is not None})
+
+
+def importing_client_files(files: list[str], index: FileIndex, client: ClientConfig) -> list[str]:
+    """Client files that import any of ``files``, excluding ``files``.
+
+    Uses the import references of the analysis ``index``, so importers are
+    only known once they have been analyzed through it.
+    """
+    lookup = _ClientFiles(client)
+    importers = {
+        lookup.key(path)
+        for path in index.referrers((str(Path(f).resolve()) for f in files), "import")
+    }
+    return sorted(importers - set(files) - {None})
+
+
+def scoped_pairs(
+    config: Config,
+    changed: list[str],
+    overrides: dict[str, str] | None = None,
+    jobs: int = 1,
+    changed_spec: Iterable[SpecFunction] = (),
+    hunks: dict[str, list[tuple[int, int]]] | None = None,
+) -> list[tuple[SpecFunction, ClientFunction]] | None:
+    """Spec/client pairs affected by ``changed``, parsing only what they reach.
+
+    Client functions count as changed when a hunk overlaps them (with no
+    ``hunks``, everything in a changed file does) or when they call a
+    changed function from the same file or a file importing it; see
+    :func:`~.pr_filter.changed_functions`. Pairs of those, and of the spec
+    functions in ``changed_spec`` (see
+    :func:`~.pr_filter.changed_spec_functions`), are returned. Spec
+    definitions are found through the names the parse index records per
+    spec file (see :func:`~..parser.spec_parser.spec_files_defining`) and
+    in the files of ``changed_spec``, and other client definitions of the
+    matched names are loaded
+    so that mapping precedence is the same as in a full scan. Work is
+    proportional to the diff, not the repos.
+
+    Returns None when the parse index (``index.path``) is disabled or was not
+    populated by a full run with the current parser versions, in which case
+    nothing can be looked up.
+    """
+    if not config.index.path:
+        return None
+    overrides = overrides or {}
+    changed_spec = list(changed_spec)
+    spec_keys = {(fn.file_path, fn.name) for fn in changed_spec}
+    with (
+        FileIndex(config.index.path, "spec", PARSER_VERSION) as spec_index,
+        FileIndex(config.index.path, config.client.name, ANALYZER_VERSION) as client_index,
+    ):
+        if not len(spec_index) or not len(client_index):
+            return None
+
+        analyzer = LodestarAnalyzer(client_index, jobs=jobs)
+        changed_files = changed_client_files(changed, config.client)
+        client_fns = analyzer.analyze_files(changed_files)
+        importers = importing_client_files(changed_files, client_index, config.client)
+        client_fns += analyzer.analyze_files(importers)
+        # Both indexes share one database; only one may hold a write transaction
+        client_index.commit()
+        lines = ChangedLines(hunks) if hunks is not None else ChangedLines.whole_files(changed)
+        affected = set(changed_functions(client_fns, lines))
+
+        registry = ForkRegistry.from_config(config.spec)
+        wanted = spec_name_candidates({fn.name for fn in affected}, registry.forks, overrides)
+        threshold = config.mapping.fuzzy_threshold
+        if threshold is not None:
+            fuzzy = MappingIndex(affected, registry.forks)
+            wanted.update(name for name in spec_index.all_refs("name") if fuzzy.lookup(name, threshold))
+        wanted.update(name for _, name in spec_keys)
+        spec_files = spec_files_defining(config.spec.repo_path, config.spec.forks, spec_index, wanted)
+        # The changed functions' own files, whatever the index recorded
+        spec_files += sorted({(Path(fn.file_path), fn.fork) for fn in changed_spec}.difference(spec_files))
+        spec_fns = [fn for fn in parse_spec_files(spec_files, spec_index, jobs)[0] if fn.name in wanted]
+        spec_index.commit()
+
+        names = candidate_names(spec_fns, overrides, registry.forks)
+        scope = {*changed_files, *importers}
+        keys = {name_key(name) for name in names}
+        others = sorted(p for p in client_index.referrers(keys, "key") - scope if Path(p).is_file())
+        client_fns += analyzer.analyze_files(others)
+        logger.debug(
+            "PR scope: %d changed and %d importing client files (%d changed functions), "
+            "%d spec files, %d other client files",
+            len(changed_files), len(importers), len(affected), len(spec_files), len(others),
+        )
+
+    pairs = build_fork_mapping(ForkGraph(spec_fns, registry), client_fns, overrides, threshold)
+    return [
+        (spec_fn, client_fn)
+        for spec_fn, client_fn in pairs
+        if client_fn in affected or (spec_fn.file_path, spec_fn.name) in spec_keys
+    ]
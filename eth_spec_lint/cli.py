@@ -13,8 +13,9 @@ from .config import load_config
 @click.group()
 @click.option("--config", "-c", "config_path", default=None, help="Path to config YAML file")
 @click.option("--verbose", "-v", is_flag=True, help="Enable verbose logging")
+@click.option("--jobs", "-j", type=click.IntRange(min=1), default=1, help="Worker processes for parsing")
 @click.pass_context
-def main(ctx: click.Context, config_path: str | None, verbose: bool) -> None:
+def main(ctx: click.Context, config_path: str | None, verbose: bool, jobs: int) -> None:
     """eth-spec-lint: LLM-powered Ethereum spec drift detector."""
     logging.basicConfig(
         level=logging.DEBUG if verbose else logging.INFO,
@@ -22,17 +23,79 @@ def main(ctx: click.Context, config_path: str | None, verbose: bool) -> None:
     )
     ctx.ensure_object(dict)
     ctx.obj["config"] = load_config(config_path)
+    ctx.obj["jobs"] = jobs
+
+
+def _parse_spec(config, jobs: int = 1):
+    """Parse the spec repo, through the on-disk parse index unless disabled."""
+    from .parser.spec_parser import PARSER_VERSION, parse_spec_repo
+
+    if not config.index.path:
+        return parse_spec_repo(config.spec.repo_path, config.spec.forks, jobs=jobs)
+
+    from .file_index import FileIndex
+
+    with FileIndex(config.index.path, "spec", PARSER_VERSION) as index:
+        result = parse_spec_repo(config.spec.repo_path, config.spec.forks, index, jobs)
+    logging.getLogger(__name__).debug(
+        "Spec parse index: %d files reused, %d parsed", index.hits, index.misses,
+    )
+    return result
+
+
+def _load_spec(config, jobs: int = 1):
+    """Parse the spec repo into a fork-resolved view shared by a command."""
+    from .parser.fork_graph import ForkRegistry, SpecView
+
+    fns, consts, containers = _parse_spec(config, jobs)
+    return SpecView(fns, consts, containers, ForkRegistry.from_config(config.spec))
+
+
+def _analyze_client(config, jobs: int = 1, names: set[str] | None = None):
+    """Analyze client sources, through the on-disk analysis index unless disabled.
+
+    With ``names`` (and ``client.prefilter`` on), files that must be parsed
+    but mention none of them are skipped. Fuzzy mapping needs every
+    function, so it turns the prefilter off.
+    """
+    from .client.lodestar import ANALYZER_VERSION, LodestarAnalyzer
+    from .client.prefilter import NamePrefilter
+
+    # Combine repo_path with source_globs
+    full_globs = [f"{config.client.repo_path}/{g}" for g in config.client.source_globs]
+    use_prefilter = config.client.prefilter and config.mapping.fuzzy_threshold is None
+    prefilter = NamePrefilter(names) if names is not None and use_prefilter else None
+    if not config.index.path:
+        analyzer = LodestarAnalyzer(jobs=jobs, prefilter=prefilter)
+        result = analyzer.analyze(full_globs)
+    else:
+        from .file_index import FileIndex
+
+        with FileIndex(config.index.path, config.client.name, ANALYZER_VERSION) as index:
+            analyzer = LodestarAnalyzer(index, jobs=jobs, prefilter=prefilter)
+            result = analyzer.analyze(full_globs)
+        logging.getLogger(__name__).debug(
+            "Client analysis index: %d files reused, %d parsed", index.hits, index.misses,
+        )
+    if prefilter is not None:
+        logging.getLogger(__name__).debug("Prefilter skipped %d client files", analyzer.skipped)
+    return result
+
+
+def _has_numpy() -> bool:
+    """Whether the optional ``semantic`` extra (numpy) is installed."""
+    import importlib.util
+
+    return importlib.util.find_spec("numpy") is not None
 
 
 @main.command()
+@click.option("--batch", is_flag=True, help="Use the provider batch API (slower, cheaper)")
 @click.pass_context
-def scan(ctx: click.Context) -> None:
+def scan(ctx: click.Context, batch: bool) -> None:
     """Run full spec-vs-client comparison scan."""
-    from .client.lodestar import LodestarAnalyzer
-    from .client.mapping import build_mapping, load_overrides
+    from .client.mapping import build_fork_mapping, candidate_names, load_overrides
     from .compare.engine import compare_all
-    from .parser.fork_graph import resolve_functions
-    from .parser.spec_parser import parse_spec_repo
     from .report.json_report import generate_json_report
     from .report.markdown_report import generate_markdown_report
     from .report.sarif_report import generate_sarif_report
@@ -40,26 +103,34 @@ def scan(ctx: click.Context) -> None:
     config = ctx.obj["config"]
 
     click.echo("Parsing spec files...")
-    fns, consts, containers = parse_spec_repo(config.spec.repo_path, config.spec.forks)
-    resolved = resolve_functions(fns)
-    click.echo(f"  Found {len(resolved)} spec functions across {len(fns)} definitions")
+    spec = _load_spec(config, ctx.obj["jobs"])
+    click.echo(f"  Found {len(spec.graph)} spec functions across {len(spec.functions)} definitions")
+    click.echo(f"  Found {len(spec.latest.constants)} constants and {len(spec.latest.containers)} containers")
 
     click.echo("Analyzing client code...")
-    analyzer = LodestarAnalyzer()
-    # Combine repo_path with source_globs
-    full_globs = [f"{config.client.repo_path}/{g}" for g in config.client.source_globs]
-    client_fns = analyzer.analyze(full_globs)
+    overrides = load_overrides(config.mapping.overrides_file)
+    names = candidate_names(spec.functions, overrides, spec.registry.forks)
+    client_fns = _analyze_client(config, ctx.obj["jobs"], names)
     click.echo(f"  Found {len(client_fns)} client functions")
 
     click.echo("Building mappings...")
-    overrides = load_overrides(config.mapping.overrides_file)
-    pairs = build_mapping(list(resolved.values()), client_fns, overrides)
+    pairs = build_fork_mapping(spec.graph, client_fns, overrides, config.mapping.fuzzy_threshold)
     click.echo(f"  Matched {len(pairs)} function pairs")
+    unmatched = len(spec.graph) - len({spec_fn.name for spec_fn, _ in pairs})
+    if unmatched:
+        hint = "see list-mappings --semantic" if _has_numpy() else "pip install 'eth-spec-lint[semantic]' for candidates"
+        click.echo(f"  {unmatched} spec functions have no client match ({hint})")
 
     if not pairs:
         click.echo("No matched pairs found. Check your config paths and mappings.")
         sys.exit(0)
 
+    if batch:
+        from .compare.batch import run_batch
+
+        click.echo("Submitting batch comparisons...")
+        run_batch(pairs, config)
+
     click.echo("Running LLM comparison...")
     findings = compare_all(pairs, config)
     click.echo(f"  Found {len(findings)} findings")
@@ -78,34 +149,57 @@ def scan(ctx: click.Context) -> None:
 
 @main.command("check-pr")
 @click.option("--base", default="origin/main", help="Base ref for diff")
+@click.option("--spec-base", default=None, help="Also re-check spec functions changed in the spec checkout since this ref")
 @click.pass_context
-def check_pr(ctx: click.Context, base: str) -> None:
-    """Run comparison scoped to files changed in current PR."""
-    from .ci.pr_filter import filter_pairs_by_changed_files, get_changed_files
-    from .client.lodestar import LodestarAnalyzer
-    from .client.mapping import build_mapping, load_overrides
+def check_pr(ctx: click.Context, base: str, spec_base: str | None) -> None:
+    """Run comparison scoped to files changed in current PR.
+
+    Only client functions whose lines changed, or that call a changed
+    function, are compared. With the parse index enabled, only the changed
+    client files, the files importing them, and the spec definitions they
+    map to are parsed; the first run fills the index with one full parse. With
+    ``--spec-base`` (a spec version bump, or a PR on the spec repo itself),
+    pairs of spec functions whose source changed since that ref are
+    re-checked too.
+    """
+    from .ci.pr_filter import (
+        ChangedLines,
+        changed_spec_functions,
+        filter_pairs_by_changed_lines,
+        get_changed_hunks,
+    )
+    from .ci.pr_scope import scoped_pairs
+    from .client.mapping import build_fork_mapping, candidate_names, load_overrides
     from .compare.engine import compare_all
-    from .parser.fork_graph import resolve_functions
-    from .parser.spec_parser import parse_spec_repo
     from .report.json_report import generate_json_report
     from .report.markdown_report import generate_markdown_report
     from .report.sarif_report import generate_sarif_report
 
     config = ctx.obj["config"]
+    jobs = ctx.obj["jobs"]
 
-    changed = get_changed_files(base)
+    hunks = get_changed_hunks(base)
+    changed = list(hunks)
     click.echo(f"Changed files: {len(changed)}")
-
-    fns, consts, containers = parse_spec_repo(config.spec.repo_path, config.spec.forks)
-    resolved = resolve_functions(fns)
-
-    analyzer = LodestarAnalyzer()
-    full_globs = [f"{config.client.repo_path}/{g}" for g in config.client.source_globs]
-    client_fns = analyzer.analyze(full_globs)
+    changed_spec = []
+    if spec_base:
+        changed_spec = changed_spec_functions(config.spec.repo_path, config.spec.forks, spec_base, jobs)
+        click.echo(f"Changed spec functions: {len(changed_spec)}")
 
     overrides = load_overrides(config.mapping.overrides_file)
-    pairs = build_mapping(list(resolved.values()), client_fns, overrides)
-    pairs = filter_pairs_by_changed_files(pairs, changed)
+    pairs = scoped_pairs(config, changed, overrides, jobs, changed_spec, hunks)
+    if pairs is None:
+        spec = _load_spec(config, jobs)
+        if config.index.path:
+            _analyze_client(config, jobs, candidate_names(spec.functions, overrides, spec.registry.forks))
+            # The full parse has filled the index; scope through it
+            pairs = scoped_pairs(config, changed, overrides, jobs, changed_spec, hunks) or []
+        else:
+            # No prefilter: changed helpers that map to no spec name must be
+            # parsed too, so their callers elsewhere are re-checked
+            client_fns = _analyze_client(config, jobs)
+            pairs = build_fork_mapping(spec.graph, client_fns, overrides, config.mapping.fuzzy_threshold)
+            pairs = filter_pairs_by_changed_lines(pairs, ChangedLines(hunks), client_fns, changed_spec)
     click.echo(f"Pairs affected by PR: {len(pairs)}")
 
     if not pairs:
@@ -126,27 +220,171 @@ def check_pr(ctx: click.Context, base: str) -> None:
 
 
 @main.command("list-mappings")
+@click.option("--candidates", "-n", type=click.IntRange(min=0), default=0,
+              help="Also show the top N ranked client candidates per spec function")
+@click.option("--semantic", is_flag=True,
+              help="Propose candidates for unmatched spec functions by body similarity "
+                   "(mapping.embedder, else the local hashing embedder)")
 @click.pass_context
-def list_mappings(ctx: click.Context) -> None:
+def list_mappings(ctx: click.Context, candidates: int, semantic: bool) -> None:
     """Show matched spec<->client function pairs."""
-    from .client.lodestar import LodestarAnalyzer
-    from .client.mapping import build_mapping, load_overrides
-    from .parser.fork_graph import resolve_functions
-    from .parser.spec_parser import parse_spec_repo
+    from .client.mapping import build_fork_mapping, candidate_names, load_overrides
+    from .client.mapping_index import MappingIndex
 
     config = ctx.obj["config"]
+    if semantic and config.mapping.embedder is None:
+        config.mapping.embedder = "hashing"
 
-    fns, _, _ = parse_spec_repo(config.spec.repo_path, config.spec.forks)
-    resolved = resolve_functions(fns)
-
-    analyzer = LodestarAnalyzer()
-    full_globs = [f"{config.client.repo_path}/{g}" for g in config.client.source_globs]
-    client_fns = analyzer.analyze(full_globs)
+    spec = _load_spec(config, ctx.obj["jobs"])
 
     overrides = load_overrides(config.mapping.overrides_file)
-    pairs = build_mapping(list(resolved.values()), client_fns, overrides)
+    # Semantic proposals rank every client function, so skip the prefilter
+    names = None if config.mapping.embedder is not None else candidate_names(
+        spec.functions, overrides, spec.registry.forks,
+    )
+    client_fns = _analyze_client(config, ctx.obj["jobs"], names)
+
+    pairs = build_fork_mapping(spec.graph, client_fns, overrides, config.mapping.fuzzy_threshold)
 
-    click.echo(f"{'Spec Function':<40} {'Client Function':<40} {'Client File'}")
-    click.echo("-" * 120)
+    click.echo(f"{'Spec Function':<40} {'Fork':<10} {'Client Function':<40} {'Client File'}")
+    click.echo("-" * 130)
     for spec_fn, client_fn in pairs:
-        click.echo(f"{spec_fn.name:<40} {client_fn.name:<40} {client_fn.file_path}")
+        click.echo(f"{spec_fn.name:<40} {spec_fn.fork:<10} {client_fn.name:<40} {client_fn.file_path}")
+
+    if candidates:
+        index = MappingIndex(client_fns, spec.registry.forks)
+        click.echo(f"\n{'Spec Function':<40} {'Score':>6} {'Fork':<10} {'Client Function':<40} {'Client File'}")
+        click.echo("-" * 130)
+        for name, spec_fn in spec.latest.functions.items():
+            ranked = index.candidates(spec_fn, spec.registry.forks, threshold=config.mapping.fuzzy_threshold)
+            for candidate in ranked[:candidates]:
+                fn = candidate.function
+                fork = candidate.fork or "-"
+                click.echo(f"{name:<40} {candidate.score:>6.2f} {fork:<10} {fn.name:<40} {fn.file_path}")
+
+    if config.mapping.embedder is not None:
+        from .client.semantic import EmbeddingStore, get_embedder, semantic_candidates
+
+        matched = {spec_fn.name for spec_fn, _ in pairs}
+        unmatched = [spec_fn for name, spec_fn in spec.latest.functions.items() if name not in matched]
+        with EmbeddingStore(config.index.path, get_embedder(config.mapping)) as store:
+            proposals = semantic_candidates(
+                unmatched, client_fns, store, config.mapping.semantic_top_k, config.mapping.semantic_min_score,
+            )
+        logging.getLogger(__name__).debug("Embeddings: %d cached, %d computed", store.hits, store.misses)
+        click.echo(f"\nSemantic candidates for {len(unmatched)} unmatched spec functions")
+        click.echo(f"{'Spec Function':<40} {'Score':>6} {'Client Function':<40} {'Client File'}")
+        click.echo("-" * 130)
+        for spec_fn, ranked in proposals:
+            for candidate in ranked:
+                fn = candidate.function
+                click.echo(f"{spec_fn.name:<40} {candidate.score:>6.2f} {fn.name:<40} {fn.file_path}")
+
+
+@main.group()
+def cache() -> None:
+    """Inspect and maintain the LLM result cache."""
+
+
+def _cache_location(config) -> str:
+    return config.cache.db_path if config.cache.backend == "sqlite" else config.cache.dir_path
+
+
+@cache.command("stats")
+@click.pass_context
+def cache_stats(ctx: click.Context) -> None:
+    """Show cache size, hit counts and per-model entry counts."""
+    from datetime import datetime
+
+    from .compare.cache import open_cache
+
+    config = ctx.obj["config"]
+    store = open_cache(config.cache)
+    try:
+        stats = store.stats()
+    finally:
+        store.close()
+
+    def _when(ts: float | None) -> str:
+        return datetime.fromtimestamp(ts).isoformat(timespec="seconds") if ts else "-"
+
+    click.echo(f"Cache:         {_cache_location(config)} ({stats['file_bytes'] / 1e6:.1f} MB on disk)")
+    click.echo(f"Entries:       {stats['entries']} ({stats['value_bytes'] / 1e6:.1f} MB of results)")
+    click.echo(f"Hits:          {stats['hits']} ({stats['tokens_saved']} tokens saved)")
+    click.echo(f"Oldest entry:  {_when(stats['oldest'])}")
+    click.echo(f"Newest entry:  {_when(stats['newest'])}")
+    for provider, model, count in stats["by_model"]:
+        click.echo(f"  {provider or '?'}/{model or '?'}: {count}")
+
+
+@cache.command("prune")
+@click.option("--max-size-mb", type=float, default=None, help="Keep at most this much (LRU eviction)")
+@click.option("--max-age-days", type=float, default=None, help="Drop entries unused for this long")
+@click.pass_context
+def cache_prune(ctx: click.Context, max_size_mb: float | None, max_age_days: float | None) -> None:
+    """Evict old or least recently used entries (defaults from cache config)."""
+    from .compare.cache import open_cache
+
+    config = ctx.obj["config"]
+    if max_size_mb is None:
+        max_size_mb = config.cache.max_size_mb
+    if max_age_days is None:
+        max_age_days = config.cache.max_age_days
+    if max_size_mb is None and max_age_days is None:
+        raise click.UsageError("Set --max-size-mb/--max-age-days or cache.max_size_mb/max_age_days")
+
+    store = open_cache(config.cache)
+    try:
+        removed = store.prune(max_size_mb, max_age_days)
+    finally:
+        store.close()
+    click.echo(f"Removed {removed} entries")
+
+
+@cache.command("vacuum")
+@click.pass_context
+def cache_vacuum(ctx: click.Context) -> None:
+    """Compact the cache database file."""
+    from .compare.cache import open_cache
+
+    config = ctx.obj["config"]
+    store = open_cache(config.cache)
+    try:
+        store.vacuum()
+    finally:
+        store.close()
+    click.echo(f"Vacuumed {_cache_location(config)}")
+
+
+@cache.command("export")
+@click.argument("path")
+@click.pass_context
+def cache_export(ctx: click.Context, path: str) -> None:
+    """Write all cache entries to a JSON-lines file (.gz to compress)."""
+    from .compare.cache import open_cache
+
+    config = ctx.obj["config"]
+    store = open_cache(config.cache)
+    try:
+        count = store.export_entries(path)
+    finally:
+        store.close()
+    click.echo(f"Exported {count} entries to {path}")
+
+
+@cache.command("import")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.pass_context
+def cache_import(ctx: click.Context, path: str) -> None:
+    """Merge entries from an exported file, keeping existing ones."""
+    from .compare.cache import open_cache
+
+    config = ctx.obj["config"]
+    store = open_cache(config.cache)
+    try:
+        count = store.import_entries(path)
+    except ValueError as exc:
+        raise click.ClickException(f"{path}: {exc}") from None
+    finally:
+        store.close()
+    click.echo(f"Imported {count} new entries from {path}")
@@ -2,19 +2,79 @@
 
 from __future__ import annotations
 
+import sys
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
 
+if TYPE_CHECKING:
+    from .source_store import SourceStore
 
-@dataclass
+
+@dataclass(init=False, slots=True, frozen=True)
 class ClientFunction:
+    """A client function; ``source`` is either given or read lazily.
+
+    Analyzers pass ``start_byte``/``end_byte`` and a :class:`SourceStore`
+    instead of the text, which is then only read (and kept) once something
+    accesses ``source``.
+    """
     name: str
-    source: str
-    params: list[str]
+    params: tuple[str, ...]
     return_type: str | None = None
     file_path: str = ""
     line_number: int = 0
     exported: bool = False
+    end_line: int = 0
+    # "function" (declarations, function-valued consts) or "method"
+    kind: str = "function"
+    # Enclosing class/namespace, dotted when nested
+    container: str | None = None
+    start_byte: int = 0
+    end_byte: int = 0
+    _source: str | None = field(default=None, repr=False, compare=False)
+    _store: SourceStore | None = field(default=None, repr=False, compare=False)
+
+    def __init__(
+        self,
+        name: str,
+        source: str | None = None,
+        params: Iterable[str] = (),
+        return_type: str | None = None,
+        file_path: str = "",
+        line_number: int = 0,
+        exported: bool = False,
+        end_line: int = 0,
+        kind: str = "function",
+        container: str | None = None,
+        start_byte: int = 0,
+        end_byte: int = 0,
+        store: SourceStore | None = None,
+    ) -> None:
+        init = object.__setattr__
+        init(self, "name", name)
+        init(self, "params", tuple(params))
+        init(self, "return_type", return_type)
+        init(self, "file_path", sys.intern(file_path))
+        init(self, "line_number", line_number)
+        init(self, "exported", exported)
+        init(self, "end_line", end_line)
+        init(self, "kind", kind)
+        init(self, "container", container)
+        init(self, "start_byte", start_byte)
+        init(self, "end_byte", end_byte)
+        init(self, "_source", source)
+        init(self, "_store", store)
+
+    @property
+    def source(self) -> str:
+        if self._source is None:
+            if self._store is None:
+                return ""
+            # Frozen for callers; the lazily read text is a private cache
+            object.__setattr__(self, "_source", self._store.read(self.file_path, self.start_byte, self.end_byte))
+        return self._source
 
 
 class ClientAnalyzer(ABC):
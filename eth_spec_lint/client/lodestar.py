@@ -3,18 +3,56 @@
 from __future__ import annotations
 
 import glob as globmod
+from functools import lru_cache
 from pathlib import Path
+from typing import TYPE_CHECKING
 
+from ..parallel import parallel_map
 from .base import ClientAnalyzer, ClientFunction
+from .mapping_index import name_key
+from .source_store import SourceStore
+
+if TYPE_CHECKING:
+    from ..file_index import FileIndex
+    from .prefilter import NamePrefilter
 
 try:
     import tree_sitter_typescript as ts_typescript
-    from tree_sitter import Language, Parser
+    from tree_sitter import Language, Parser, Query
 
     _TS_AVAILABLE = True
 except ImportError:
     _TS_AVAILABLE = False
 
+try:
+    from tree_sitter import QueryCursor
+except ImportError:  # tree-sitter < 0.25 runs queries on the Query itself
+    QueryCursor = None
+
+# Bump whenever extraction output changes, to invalidate analysis index entries
+ANALYZER_VERSION = "5"
+
+# Everything that can hold a spec function's logic. @def is the node whose
+# source is reported, @fn the callable node carrying parameters/return type.
+_FUNCTION_QUERY = """
+(function_declaration name: (identifier) @name) @def @fn
+(generator_function_declaration name: (identifier) @name) @def @fn
+(lexical_declaration
+  (variable_declarator
+    name: (identifier) @name
+    value: [(arrow_function) (function_expression)] @fn)) @def
+(method_definition name: (property_identifier) @name) @def @fn
+(public_field_definition
+  name: (property_identifier) @name
+  value: [(arrow_function) (function_expression)] @fn) @def
+"""
+
+# Extensions ESM imports name in place of the .ts source (import "./x.js")
+_SCRIPT_SUFFIXES = {".js", ".mjs", ".cjs"}
+
+_CONTAINER_TYPES = {"class_declaration", "abstract_class_declaration", "class", "internal_module", "module"}
+_METHOD_TYPES = {"method_definition", "public_field_definition"}
+
 
 def _build_parser() -> "Parser":
     if not _TS_AVAILABLE:
@@ -23,81 +61,312 @@ def _build_parser() -> "Parser":
     return parser
 
 
-def _extract_functions_from_tree(tree, source_bytes: bytes, file_path: str) -> list[ClientFunction]:
-    """Walk tree-sitter AST and extract exported function declarations."""
+@lru_cache(maxsize=1)
+def _function_query() -> "Query":
+    return Query(Language(ts_typescript.language_typescript()), _FUNCTION_QUERY)
+
+
+def _matches(query, node) -> list[tuple[int, dict]]:
+    if QueryCursor is not None:
+        return QueryCursor(query).matches(node)
+    return query.matches(node)
+
+
+def _is_module_level(decl) -> bool:
+    """Whether a declaration sits at file or namespace scope (not in a body)."""
+    parent = decl.parent
+    if parent.type == "export_statement":
+        parent = parent.parent
+    if parent.type == "program":
+        return True
+    return parent.type == "statement_block" and parent.parent.type in ("internal_module", "module")
+
+
+def _container_name(node) -> str | None:
+    """Dotted name of the enclosing classes/namespaces, if any."""
+    names: list[str] = []
+    ancestor = node.parent
+    while ancestor is not None:
+        if ancestor.type in _CONTAINER_TYPES:
+            name = ancestor.child_by_field_name("name")
+            names.append(name.text.decode() if name is not None else "<anonymous>")
+        ancestor = ancestor.parent
+    return ".".join(reversed(names)) or None
+
+
+def _params(fn) -> list[str]:
+    single = fn.child_by_field_name("parameter")  # x => ...
+    if single is not None:
+        return [single.text.decode()]
+    params: list[str] = []
+    formal = fn.child_by_field_name("parameters")
+    for param in formal.children if formal is not None else ():
+        if param.type in ("required_parameter", "optional_parameter"):
+            for pc in param.children:
+                if pc.type == "identifier":
+                    params.append(pc.text.decode())
+                    break
+    return params
+
+
+def _extract_functions_from_tree(tree, file_path: str, store: SourceStore | None = None) -> list[ClientFunction]:
+    """Extract function declarations, module-level function consts and class
+    methods in one native query pass over the tree.
+
+    Sources are not copied out; each function records its byte range and
+    reads it from ``store`` on first use.
+    """
     functions: list[ClientFunction] = []
-    root = tree.root_node
-
-    for node in _walk(root):
-        # export function foo(...)
-        if node.type == "export_statement":
-            for child in node.children:
-                if child.type == "function_declaration":
-                    fn = _parse_function_node(child, source_bytes, file_path, exported=True)
-                    if fn:
-                        functions.append(fn)
-        # Plain function declarations
-        elif node.type == "function_declaration":
-            # Check if parent is export_statement (already handled)
-            if node.parent and node.parent.type == "export_statement":
+    for _, captures in _matches(_function_query(), tree.root_node):
+        decl, fn, name = captures["def"][0], captures["fn"][0], captures["name"][0].text.decode()
+        is_method = decl.type in _METHOD_TYPES
+        if is_method:
+            if name == "constructor":
                 continue
-            fn = _parse_function_node(node, source_bytes, file_path, exported=False)
-            if fn:
-                functions.append(fn)
-
+            owner = decl.parent.parent  # class_body -> class
+            exported = owner.parent is not None and owner.parent.type == "export_statement"
+        else:
+            if decl.type == "lexical_declaration" and not _is_module_level(decl):
+                continue
+            exported = decl.parent.type == "export_statement"
+        return_type = fn.child_by_field_name("return_type")
+        functions.append(ClientFunction(
+            name=name,
+            params=_params(fn),
+            return_type=return_type.text.decode().lstrip(": ").strip() if return_type is not None else None,
+            file_path=file_path,
+            line_number=decl.start_point[0] + 1,
+            end_line=decl.end_point[0] + 1,
+            exported=exported,
+            kind="method" if is_method else "function",
+            container=_container_name(decl),
+            start_byte=decl.start_byte,
+            end_byte=decl.end_byte,
+            store=store,
+        ))
     return functions
 
 
-def _parse_function_node(node, source_bytes: bytes, file_path: str, exported: bool) -> ClientFunction | None:
-    name = None
-    params: list[str] = []
-    return_type = None
-
-    for child in node.children:
-        if child.type == "identifier":
-            name = child.text.decode()
-        elif child.type == "formal_parameters":
-            for param in child.children:
-                if param.type in ("required_parameter", "optional_parameter"):
-                    param_name = None
-                    for pc in param.children:
-                        if pc.type == "identifier":
-                            param_name = pc.text.decode()
-                            break
-                    if param_name:
-                        params.append(param_name)
-        elif child.type == "type_annotation":
-            return_type = child.text.decode().lstrip(": ").strip()
-
-    if not name:
+def _resolve_import(file_path: str, specifier: str) -> str | None:
+    """Absolute path of the source file a relative import refers to.
+
+    Package imports (``@lodestar/types``) are not resolved.
+    """
+    if not specifier.startswith("."):
         return None
+    base = Path(file_path).parent / specifier
+    stem = base.with_suffix("") if base.suffix in _SCRIPT_SUFFIXES else base
+    for candidate in (base, stem.parent / f"{stem.name}.ts", stem / "index.ts"):
+        if candidate.suffix == ".ts" and candidate.is_file():
+            return str(candidate.resolve())
+    return None
+
+
+def _imports(tree, file_path: str) -> list[str]:
+    """Files a module imports or re-exports from, as absolute paths."""
+    targets: list[str] = []
+    for node in tree.root_node.children:
+        if node.type in ("import_statement", "export_statement"):
+            source = node.child_by_field_name("source")
+            if source is not None:
+                target = _resolve_import(file_path, source.text.decode().strip("'\"`"))
+                if target is not None:
+                    targets.append(target)
+    return targets
+
+
+def _point(source: bytes, offset: int) -> tuple[int, int]:
+    """Tree-sitter (row, byte column) of a byte offset."""
+    row = source.count(b"\n", 0, offset)
+    return row, offset - (source.rfind(b"\n", 0, offset) + 1)
+
 
-    return ClientFunction(
-        name=name,
-        source=source_bytes[node.start_byte:node.end_byte].decode(errors="replace"),
-        params=params,
-        return_type=return_type,
-        file_path=file_path,
-        line_number=node.start_point[0] + 1,
-        exported=exported,
+def _edit_tree(tree, old: bytes, new: bytes) -> None:
+    """Describe the change from ``old`` to ``new`` to ``tree`` as one edit.
+
+    The edited range spans from the first to the last differing byte, which is
+    all tree-sitter needs to reuse the unchanged subtrees on either side.
+    """
+    limit = min(len(old), len(new))
+    start = 0
+    while start < limit and old[start] == new[start]:
+        start += 1
+    suffix = 0
+    while suffix < limit - start and old[-suffix - 1] == new[-suffix - 1]:
+        suffix += 1
+    old_end, new_end = len(old) - suffix, len(new) - suffix
+    tree.edit(
+        start_byte=start,
+        old_end_byte=old_end,
+        new_end_byte=new_end,
+        start_point=_point(old, start),
+        old_end_point=_point(old, old_end),
+        new_end_point=_point(new, new_end),
     )
 
 
-def _walk(node):
-    yield node
-    for child in node.children:
-        yield from _walk(child)
+def _encode_functions(functions: list[ClientFunction]) -> list:
+    """Compact index payload; the file path is implied by the index key."""
+    return [
+        [f.name, f.params, f.return_type, f.line_number, f.end_line, f.exported, f.kind, f.container,
+         f.start_byte, f.end_byte]
+        for f in functions
+    ]
+
+
+def _encode_analysis(tree, file_path: str, functions: list[ClientFunction]) -> dict:
+    return {"f": _encode_functions(functions), "i": _imports(tree, file_path)}
+
+
+def _analysis_refs(payload: dict) -> dict[str, list[str]]:
+    """Index references of an analyzed file: the name keys it defines and the files it imports.
+
+    Names are recorded as :func:`~.mapping_index.name_key` values, the form
+    mapping matches on, so ``getBLSPubkey`` is found for ``get_bls_pubkey``.
+    """
+    return {"key": [name_key(record[0]) for record in payload["f"]], "import": payload["i"]}
+
+
+def _decode_functions(payload: list, file_path: str, store: SourceStore) -> list[ClientFunction]:
+    return [
+        ClientFunction(name=name, params=params, return_type=ret, file_path=file_path, line_number=line,
+                       end_line=end_line, exported=exported, kind=kind, container=container,
+                       start_byte=start, end_byte=end, store=store)
+        for name, params, ret, line, end_line, exported, kind, container, start, end in payload
+    ]
+
+
+_worker_parser = None
+
+
+def _init_worker() -> None:
+    global _worker_parser
+    _worker_parser = _build_parser()
+
+
+def _analyze_worker(task: tuple[str, bytes | None]) -> dict:
+    """Parse one file (reading it unless its bytes are given); return its index payload.
+
+    Module-level so it can run in a process pool set up by :func:`_init_worker`.
+    """
+    fpath, source = task
+    if source is None:
+        source = Path(fpath).read_bytes()
+    tree = _worker_parser.parse(source)
+    return _encode_analysis(tree, fpath, _extract_functions_from_tree(tree, fpath))
 
 
 class LodestarAnalyzer(ClientAnalyzer):
-    def __init__(self) -> None:
+    """Extract functions from Lodestar TypeScript sources.
+
+    With an ``index``, files whose content is unchanged since the last run are
+    served from it without being read or parsed. With ``retain_trees``, parse
+    trees are kept in memory so re-analyzing a file that changed since (e.g.
+    in a watch loop) is an incremental tree-sitter re-parse; trees cannot be
+    persisted, so this only helps within one process. With ``jobs > 1``,
+    :meth:`analyze` parses files in a process pool (ignored with
+    ``retain_trees``, whose trees must live in this process). With a
+    ``prefilter``, files that need parsing but mention none of its names are
+    skipped; indexed files are always returned in full. Index entries also
+    record the names each file defines and the files it imports (see
+    :meth:`FileIndex.referrers <eth_spec_lint.file_index.FileIndex.referrers>`).
+    """
+
+    def __init__(
+        self,
+        index: FileIndex | None = None,
+        retain_trees: bool = False,
+        jobs: int = 1,
+        prefilter: NamePrefilter | None = None,
+    ) -> None:
         self._parser = _build_parser()
+        self._index = index
+        self._retain_trees = retain_trees
+        self._jobs = jobs
+        self._prefilter = prefilter
+        self._trees: dict[str, tuple[bytes, object]] = {}
+        self.sources = SourceStore()
+        self.skipped = 0
 
-    def analyze(self, source_paths: list[str]) -> list[ClientFunction]:
+    def _wanted(self, fpath: str, source: bytes | None) -> bool:
+        """Apply the prefilter to a file about to be parsed."""
+        if self._prefilter is None:
+            return True
+        found = self._prefilter.search(source) if source is not None else self._prefilter.matches_file(fpath)
+        if not found:
+            self.skipped += 1
+        return found
+
+    def _parse(self, fpath: str, source: bytes):
+        previous = self._trees.get(fpath)
+        if previous is None:
+            tree = self._parser.parse(source)
+        else:
+            old_source, old_tree = previous
+            _edit_tree(old_tree, old_source, source)
+            tree = self._parser.parse(source, old_tree)
+        if self._retain_trees:
+            self._trees[fpath] = (source, tree)
+        return tree
+
+    def analyze_file(self, fpath: str) -> list[ClientFunction]:
+        """Extract the functions of a single file."""
+        if self._index is None or fpath in self._trees:
+            if not self._wanted(fpath, None):
+                return []
+            # Retained trees need a stable copy to diff against on the next edit
+            source = Path(fpath).read_bytes() if self._retain_trees else self.sources.buffer(fpath)
+        else:
+            payload, source = self._index.get(fpath)
+            if payload is not None:
+                return _decode_functions(payload["f"], fpath, self.sources)
+            if not self._wanted(fpath, source):
+                return []
+        tree = self._parse(fpath, source)
+        functions = _extract_functions_from_tree(tree, fpath, self.sources)
+        if self._index is not None:
+            payload = _encode_analysis(tree, fpath, functions)
+            self._index.put(fpath, source, payload, _analysis_refs(payload))
+        return functions
+
+    def _analyze_parallel(self, files: list[str]) -> list[ClientFunction]:
+        payloads: list[dict | None] = [None] * len(files)
+        tasks: list[tuple[str, bytes | None]] = []
+        for position, fpath in enumerate(files):
+            source = None
+            if self._index is not None:
+                payloads[position], source = self._index.get(fpath)
+                if payloads[position] is not None:
+                    continue
+            if not self._wanted(fpath, source):
+                payloads[position] = {"f": []}
+                continue
+            tasks.append((fpath, source))
+
+        parsed = zip(tasks, parallel_map(_analyze_worker, tasks, self._jobs, _init_worker))
         functions: list[ClientFunction] = []
-        for pattern in source_paths:
-            for fpath in sorted(globmod.glob(pattern, recursive=True)):
-                source = Path(fpath).read_bytes()
-                tree = self._parser.parse(source)
-                functions.extend(_extract_functions_from_tree(tree, source, fpath))
+        for position, fpath in enumerate(files):
+            payload = payloads[position]
+            if payload is None:
+                (_, source), payload = next(parsed)
+                if self._index is not None:
+                    self._index.put(fpath, source, payload, _analysis_refs(payload))
+            functions.extend(_decode_functions(payload["f"], fpath, self.sources))
+        return functions
+
+    def analyze_files(self, files: list[str]) -> list[ClientFunction]:
+        """Extract the functions of ``files``, leaving other index entries alone."""
+        if self._jobs > 1 and not self._retain_trees:
+            return self._analyze_parallel(files)
+        return [fn for fpath in files for fn in self.analyze_file(fpath)]
+
+    def analyze(self, source_paths: list[str]) -> list[ClientFunction]:
+        files = [
+            fpath
+            for pattern in source_paths
+            for fpath in sorted(globmod.glob(pattern, recursive=True))
+        ]
+        functions = self.analyze_files(files)
+        if self._index is not None:
+            self._index.retain(files)
         return functions
@@ -3,12 +3,15 @@
 from __future__ import annotations
 
 import re
+from collections.abc import Iterable
 from pathlib import Path
 
 import yaml
 
+from ..parser.fork_graph import ForkGraph
 from ..parser.models import SpecFunction
 from .base import ClientFunction
+from .mapping_index import MappingIndex, name_tokens
 
 
 def snake_to_camel(name: str) -> str:
@@ -31,38 +34,132 @@ def load_overrides(path: str | Path | None) -> dict[str, str]:
     return {str(k): str(v) for k, v in data.items()}
 
 
+def fork_specific_names(name: str, fork: str) -> list[str]:
+    """Client names used for a fork-specific implementation of spec ``name``.
+
+    Lodestar suffixes these with the fork (``processAttestationsAltair``).
+    """
+    return [snake_to_camel(name) + fork.capitalize(), f"{name}_{fork}"]
+
+
+def candidate_names(
+    spec_functions: Iterable[SpecFunction],
+    overrides: dict[str, str] | None = None,
+    forks: Iterable[str] = (),
+) -> set[str]:
+    """Every client name :func:`build_mapping` (or, given ``forks``,
+    :func:`build_fork_mapping`) could match for ``spec_functions``."""
+    overrides = overrides or {}
+    forks = list(forks)
+    names: set[str] = set()
+    for spec_fn in spec_functions:
+        names.add(spec_fn.name)
+        names.add(snake_to_camel(spec_fn.name))
+        if spec_fn.name in overrides:
+            names.add(overrides[spec_fn.name])
+        for fork in forks:
+            names.update(fork_specific_names(spec_fn.name, fork))
+            if f"{spec_fn.name}@{fork}" in overrides:
+                names.add(overrides[f"{spec_fn.name}@{fork}"])
+    return names
+
+
+def spec_name_candidates(
+    client_names: Iterable[str],
+    forks: Iterable[str] = (),
+    overrides: dict[str, str] | None = None,
+) -> set[str]:
+    """Spec function names that client functions named ``client_names`` could
+    be paired with; the inverse of :func:`candidate_names`."""
+    forks = {fork.lower() for fork in forks}
+    reverse: dict[str, set[str]] = {}
+    for spec_name, client_name in (overrides or {}).items():
+        reverse.setdefault(client_name, set()).add(spec_name.partition("@")[0])
+    names: set[str] = set()
+    for name in client_names:
+        tokens = name_tokens(name)
+        names.update((name, "_".join(tokens)))
+        names.update(reverse.get(name, ()))
+        if len(tokens) > 1 and tokens[-1] in forks:
+            names.add("_".join(tokens[:-1]))
+    return names
+
+
+def _override(index: MappingIndex, target: str | None) -> ClientFunction | None:
+    named = index.named(target) if target else []
+    return named[0] if named else None
+
+
 def build_mapping(
     spec_functions: list[SpecFunction],
     client_functions: list[ClientFunction],
     overrides: dict[str, str] | None = None,
+    threshold: float | None = None,
 ) -> list[tuple[SpecFunction, ClientFunction]]:
     """Match spec functions to client functions.
 
     Strategy:
     1. Use manual overrides first.
-    2. Try snake_to_camel conversion.
-    3. Try exact name match.
+    2. Take the best :class:`~.mapping_index.MappingIndex` candidate: a
+       client name with the same words (``processSlot`` for
+       ``process_slot``), generic or specific to the spec function's fork,
+       ranked by fork, arity and kind.
+    3. With ``threshold``, fall back to fuzzy name matches at least that
+       similar (0-1).
     """
     overrides = overrides or {}
-    client_by_name: dict[str, ClientFunction] = {f.name: f for f in client_functions}
+    index = MappingIndex(client_functions)
 
     pairs: list[tuple[SpecFunction, ClientFunction]] = []
     for spec_fn in spec_functions:
-        # Check override
-        if spec_fn.name in overrides:
-            target = overrides[spec_fn.name]
-            if target in client_by_name:
-                pairs.append((spec_fn, client_by_name[target]))
-                continue
+        forks = [spec_fn.fork] if spec_fn.fork else []
+        match = _override(index, overrides.get(spec_fn.name)) or index.best(spec_fn, forks=forks)
+        if match is None and threshold is not None:
+            match = index.best(spec_fn, forks=forks, threshold=threshold)
+        if match is not None:
+            pairs.append((spec_fn, match))
+    return pairs
 
-        # Try camelCase conversion
-        camel = snake_to_camel(spec_fn.name)
-        if camel in client_by_name:
-            pairs.append((spec_fn, client_by_name[camel]))
-            continue
 
-        # Try exact match
-        if spec_fn.name in client_by_name:
-            pairs.append((spec_fn, client_by_name[spec_fn.name]))
+def build_fork_mapping(
+    graph: ForkGraph,
+    client_functions: list[ClientFunction],
+    overrides: dict[str, str] | None = None,
+    threshold: float | None = None,
+) -> list[tuple[SpecFunction, ClientFunction]]:
+    """Match every distinct fork version of each spec function.
+
+    Each version in ``graph.versions(name)`` is paired with a client function
+    specific to one of the forks it covers: an override keyed
+    ``name@fork``, or a fork-specific :class:`~.mapping_index.MappingIndex`
+    candidate (fork-suffixed name, or fork-named namespace or directory).
+    The latest version additionally falls back to :func:`build_mapping`'s
+    rules, so shared implementations are compared once against the current
+    spec, and older versions without a fork-specific counterpart are not
+    compared at all. With ``threshold``, fuzzy name matches are tried last.
+    """
+    overrides = overrides or {}
+    index = MappingIndex(client_functions, graph.forks)
 
+    pairs: list[tuple[SpecFunction, ClientFunction]] = []
+    for name in graph.names():
+        versions = graph.versions(name)
+        for position, version in enumerate(versions):
+            latest = position == len(versions) - 1
+            match = None
+            for fork in reversed(version.forks):
+                match = _override(index, overrides.get(f"{name}@{fork}"))
+                if match is not None:
+                    break
+            if match is None:
+                match = index.best(version.function, forks=version.forks, generic=False)
+            if match is None and latest:
+                match = _override(index, overrides.get(name))
+            if match is None and latest:
+                match = index.best(version.function, forks=version.forks)
+            # Exact names always outrank fuzzy ones, so only misses need fuzzy lookups
+            if match is None and threshold is not None:
+                match = index.best(version.function, forks=version.forks, generic=latest, threshold=threshold)
+            if match is not None:
+                pairs.append((version.function, match))
     return pairs
@@ -0,0 +1,260 @@
+"""Ranked lookup of client functions that may implement a spec function."""
+
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass
+from itertools import chain, combinations
+
+from ..parser.fork_graph import FORK_ORDER
+from ..parser.models import SpecFunction
+from .base import ClientFunction
+
+# Words of an identifier: acronyms ("BLS" in getBLSPubkey), capitalized or
+# lowercase words with trailing digits ("Eth1", "phase0")
+_TOKEN_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z0-9]+|[A-Z]+[0-9]*")
+
+# Score components; an exact name always outranks a fuzzy one, and a
+# fork-specific implementation outranks a generic one with the same name
+EXACT_SCORE = 2.0
+FORK_SPECIFIC_BONUS = 0.5
+ARITY_MATCH_BONUS = 0.1
+ARITY_MISMATCH_PENALTY = 0.05
+FUNCTION_BONUS = 0.05
+EXPORTED_BONUS = 0.01
+
+
+def name_tokens(name: str) -> list[str]:
+    """Lowercase words of a camelCase, PascalCase or snake_case identifier."""
+    return [token.lower() for token in _TOKEN_RE.findall(name)]
+
+
+def name_key(name: str) -> str:
+    """``name``'s :func:`name_tokens` joined by ``_``: ``getBLSPubkey`` -> ``get_bls_pubkey``."""
+    return "_".join(_TOKEN_RE.findall(name)).lower()
+
+
+def _word_trigrams(word: str) -> frozenset[str]:
+    padded = f"_{word}_"
+    return frozenset({padded[i:i + 3] for i in range(len(padded) - 2)})
+
+
+@dataclass(slots=True, frozen=True)
+class Candidate:
+    """A client function that may implement a spec function, with its score.
+
+    ``fork`` is the fork the client function is specific to (from a fork
+    suffix, or a fork-named namespace or directory), or None if generic.
+    ``exact`` is False for fuzzy name matches.
+    """
+    function: ClientFunction
+    score: float
+    fork: str | None
+    exact: bool
+
+
+class MappingIndex:
+    """Client functions indexed by normalized name, for ranked matching.
+
+    Names are reduced to their lowercase words joined by ``_``, so
+    ``processSlot``, ``process_slot`` and ``ProcessSlot`` share the key
+    ``process_slot``. A trailing fork word is split off
+    (``processAttestationsAltair`` is also indexed as ``process_attestations``
+    specific to altair), and functions in a fork-named namespace or directory
+    are specific to that fork. Every function with a key is kept, so
+    duplicates across files are ranked rather than overwritten.
+
+    Fuzzy lookups match keys word by word, allowing near-identical words;
+    see :meth:`_fuzzy_keys`.
+    """
+
+    def __init__(self, functions: Iterable[ClientFunction], forks: Iterable[str] = FORK_ORDER) -> None:
+        self._forks = {fork.lower() for fork in forks}
+        self._by_key: dict[str, list[tuple[ClientFunction, str | None]]] = {}
+        self._by_name: dict[str, list[ClientFunction]] = {}
+        # Names and locations repeat across functions; work each out once
+        key_of: dict[str, str] = {}
+        scope_fork: dict[tuple[str, str | None], str | None] = {}
+        for fn in functions:
+            self._by_name.setdefault(fn.name, []).append(fn)
+            key = key_of.get(fn.name)
+            if key is None:
+                key = key_of[fn.name] = name_key(fn.name)
+            if not key:
+                continue
+            scope = (fn.file_path, fn.container)
+            if scope not in scope_fork:
+                scope_fork[scope] = self._scope_fork(*scope)
+            self._by_key.setdefault(key, []).append((fn, scope_fork[scope]))
+            head, _, last = key.rpartition("_")
+            if head and last in self._forks:
+                self._by_key.setdefault(head, []).append((fn, last))
+        # Fuzzy matching state, built on first use
+        self._keys_by_word: dict[str, list[str]] | None = None
+        self._key_words: dict[str, frozenset[str]] = {}
+        self._word_grams: dict[str, frozenset[str]] = {}
+        self._words_by_gram: dict[str, list[str]] = {}
+        self._similar: dict[tuple[str, float], dict[str, float]] = {}
+        self._near: dict[tuple[str, float], frozenset[str]] = {}
+        self._fuzzy: dict[tuple[str, float], list[tuple[str, float]]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(fns) for fns in self._by_name.values())
+
+    def _scope_fork(self, file_path: str, container: str | None) -> str | None:
+        """Fork named by the enclosing namespace/class or a parent directory."""
+        scopes = [*file_path.replace("\\", "/").split("/")[:-1], *(container or "").split(".")]
+        for scope in reversed(scopes):
+            if scope.lower() in self._forks:
+                return scope.lower()
+        return None
+
+    def named(self, name: str) -> list[ClientFunction]:
+        """Functions named exactly ``name``, free functions before methods."""
+        return sorted(self._by_name.get(name, []), key=lambda fn: fn.kind == "method")
+
+    def _similar_words(self, word: str, threshold: float) -> dict[str, float]:
+        """Indexed words whose trigram Dice similarity to ``word`` is at least ``threshold``."""
+        cached = self._similar.get((word, threshold))
+        if cached is not None:
+            return cached
+        grams = self._word_grams.get(word) or _word_trigrams(word)
+        # Shared trigram counts, straight from the trigram -> word postings
+        shared = Counter(chain.from_iterable(self._words_by_gram.get(gram, ()) for gram in grams))
+        similar = {word: 1.0} if word in self._keys_by_word else {}
+        for other, count in shared.items():
+            dice = 2 * count / (len(grams) + len(self._word_grams[other]))
+            if dice >= threshold:
+                similar[other] = dice
+        self._similar[(word, threshold)] = similar
+        return similar
+
+    def _keys_near(self, word: str, threshold: float) -> frozenset[str]:
+        """Keys with a word at least ``threshold`` similar to ``word``."""
+        cached = self._near.get((word, threshold))
+        if cached is None:
+            similar = self._similar_words(word, threshold)
+            cached = self._near[(word, threshold)] = frozenset().union(*(self._keys_by_word[w] for w in similar))
+        return cached
+
+    def _fuzzy_keys(self, key: str, threshold: float) -> list[tuple[str, float]]:
+        """Keys whose word similarity to ``key`` is at least ``threshold``.
+
+        Words match when their trigram Dice similarity reaches ``threshold``
+        (``attestation`` and ``attestations``). Two keys score the Dice
+        coefficient of their word sets, with words paired one to one, closest
+        first, and each pair counting its similarity rather than 1.
+        Keys are indexed by word and only the trigrams of distinct words are
+        compared, so building the index costs little more than splitting
+        the keys. A key reaching ``threshold`` must match at least
+        ``t * n / (2 - t)`` of the ``n`` query words, so candidates are
+        found by intersecting the (memoized) key sets of that many query
+        words at a time rather than scanning every key sharing a common word.
+        Results are memoized per key.
+        """
+        cached = self._fuzzy.get((key, threshold))
+        if cached is not None:
+            return cached
+        if self._keys_by_word is None:
+            self._keys_by_word = {}
+            for k in self._by_key:
+                self._key_words[k] = key_words = frozenset(k.split("_"))
+                for word in key_words:
+                    self._keys_by_word.setdefault(word, []).append(k)
+            for word in self._keys_by_word:
+                self._word_grams[word] = grams = _word_trigrams(word)
+                for gram in grams:
+                    self._words_by_gram.setdefault(gram, []).append(word)
+        words = list(dict.fromkeys(key.split("_")))
+        similar = {word: self._similar_words(word, threshold) for word in words}
+        size = len(words)
+        overlap = max(1, math.ceil(threshold * size / (2 - threshold)))
+        # Dice >= threshold also bounds the other key's word count
+        low, high = overlap, math.floor((2 - threshold) * size / threshold)
+        # Keys with a word matching each query word; a key reaching
+        # ``threshold`` is in at least ``overlap`` of them
+        reaching = sorted((self._keys_near(word, threshold) for word in words), key=len)
+        seen: set[str] = set()
+        for group in combinations(reaching, overlap):
+            seen.update(group[0].intersection(*group[1:]))
+        seen.discard(key)
+        # Every paired word of the other key matches some word of this one
+        reachable = set().union(*similar.values())
+        matches: list[tuple[str, float]] = []
+        for other in seen:
+            other_words = self._key_words[other]
+            if not low <= len(other_words) <= high or len(other_words & reachable) < overlap:
+                continue
+            pairs = sorted(
+                ((dice, word, o) for word in words for o in other_words if (dice := similar[word].get(o))),
+                reverse=True,
+            )
+            # Pair words one to one, closest first
+            total, left, right = 0.0, set(), set()
+            for dice, word, o in pairs:
+                if word not in left and o not in right:
+                    total += dice
+                    left.add(word)
+                    right.add(o)
+            score = 2 * total / (size + len(other_words))
+            if score >= threshold:
+                matches.append((other, score))
+        self._fuzzy[(key, threshold)] = matches
+        return matches
+
+    def lookup(self, name: str, threshold: float | None = None) -> list[tuple[ClientFunction, str | None, float]]:
+        """``(function, fork, name_score)`` for every function whose key matches ``name``.
+
+        Exact key matches score :data:`EXACT_SCORE`; with ``threshold``,
+        fuzzy matches score their word similarity (at most 1).
+        """
+        key = name_key(name)
+        found = [(fn, fork, EXACT_SCORE) for fn, fork in self._by_key.get(key, ())]
+        if threshold is not None and key:
+            for other, dice in self._fuzzy_keys(key, threshold):
+                found.extend((fn, fork, dice) for fn, fork in self._by_key[other])
+        return found
+
+    def candidates(
+        self,
+        spec_fn: SpecFunction,
+        forks: Iterable[str] = (),
+        generic: bool = True,
+        threshold: float | None = None,
+    ) -> list[Candidate]:
+        """Client functions that may implement ``spec_fn``, best first.
+
+        Fork-specific functions qualify only for ``forks`` (listed oldest
+        first; later forks rank slightly higher) and get
+        :data:`FORK_SPECIFIC_BONUS`; generic ones qualify unless ``generic``
+        is False. Scores also reward a parameter count equal to
+        ``spec_fn.args`` (and penalize each extra or missing parameter), free
+        functions over methods, and exported functions. Ties keep client
+        file order.
+        """
+        forks = [fork.lower() for fork in forks]
+        best: dict[int, Candidate] = {}
+        for fn, fork, name_score in self.lookup(spec_fn.name, threshold):
+            if fork is None:
+                if not generic:
+                    continue
+                score = name_score
+            elif fork in forks:
+                score = name_score + FORK_SPECIFIC_BONUS + 0.01 * forks.index(fork)
+            else:
+                continue
+            arity = abs(len(fn.params) - len(spec_fn.args))
+            score += ARITY_MATCH_BONUS if arity == 0 else -ARITY_MISMATCH_PENALTY * min(arity, 4)
+            score += FUNCTION_BONUS if fn.kind != "method" else 0.0
+            score += EXPORTED_BONUS if fn.exported else 0.0
+            if id(fn) not in best or score > best[id(fn)].score:
+                best[id(fn)] = Candidate(fn, round(score, 4), fork, name_score == EXACT_SCORE)
+        return sorted(best.values(), key=lambda c: -c.score)
+
+    def best(self, spec_fn: SpecFunction, **kwargs) -> ClientFunction | None:
+        """The top :meth:`candidates` entry's function, if any."""
+        ranked = self.candidates(spec_fn, **kwargs)
+        return ranked[0].function if ranked else None
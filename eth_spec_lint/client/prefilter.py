@@ -0,0 +1,60 @@
+"""Cheap byte-level pre-scan that skips client files mentioning no mappable name."""
+
+from __future__ import annotations
+
+import mmap
+import re
+from collections.abc import Iterable
+from pathlib import Path
+
+
+def _trie_regex(node: dict) -> str:
+    """Regex for the words stored in a character trie ("" marks a word end).
+
+    Shared prefixes are factored out, so the regex engine does one pass of
+    character tests instead of trying every alternative at each position.
+    """
+    terminal = "" in node
+    branches = [re.escape(ch) + _trie_regex(child) for ch, child in sorted(node.items()) if ch]
+    if not branches:
+        return ""
+    if len(branches) == 1 and not terminal:
+        return branches[0]
+    group = "(?:" + "|".join(branches) + ")"
+    return group + "?" if terminal else group
+
+
+class NamePrefilter:
+    """Multi-name whole-identifier search over raw file bytes.
+
+    Matching ignores case, since mapping pairs names by their lowercase
+    words (``getBLSPubkey`` implements ``get_bls_pubkey``, whose camelCase
+    spelling is ``getBlsPubkey``).
+    """
+
+    def __init__(self, names: Iterable[str]) -> None:
+        trie: dict = {}
+        for name in names:
+            if not name:
+                continue
+            node = trie
+            for ch in name.lower():
+                node = node.setdefault(ch, {})
+            node[""] = {}
+        self.empty = not trie
+        # Identifier boundaries in JS/TS also include "$"
+        pattern = rf"(?<![\w$])(?:{_trie_regex(trie)})(?![\w$])"
+        self._regex = re.compile(pattern.encode(), re.IGNORECASE)
+
+    def search(self, data: bytes | mmap.mmap) -> bool:
+        """Whether ``data`` contains any of the names as a whole identifier, in any case."""
+        return not self.empty and self._regex.search(data) is not None
+
+    def matches_file(self, path: str | Path) -> bool:
+        """:meth:`search` over a file, memory-mapped rather than read."""
+        with open(path, "rb") as fh:
+            try:
+                with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    return self.search(data)
+            except ValueError:  # empty file
+                return False
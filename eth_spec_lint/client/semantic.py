@@ -0,0 +1,250 @@
+"""Embedding-based candidates for spec functions with no name match."""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import sqlite3
+import zlib
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError as exc:
+    raise ImportError("Semantic mapping needs numpy: pip install 'eth-spec-lint[semantic]'") from exc
+
+from ..config import MappingConfig
+from ..parser.models import SpecFunction
+from ..sqlite_query import select_in
+from .base import ClientFunction
+from .mapping_index import Candidate, name_tokens
+
+# Score matrix entries computed per matmul block
+_BLOCK_CELLS = 1 << 24
+
+_IDENTIFIER_RE = re.compile(r"[A-Za-z_$][A-Za-z0-9_$]*")
+
+# Python and TypeScript keywords and boilerplate; they say nothing about
+# what a function does
+_STOP_WORDS = frozenset("""
+    and as assert async await break case catch class const continue def default del elif else
+    export extends false finally for from function if import in instanceof is let new none not
+    null of or pass raise return self static switch this throw true try type typeof undefined
+    var void while with yield number string boolean bigint uint64 int bool readonly
+""".split())
+
+
+class Embedder(ABC):
+    """Maps function source text to unit-length vectors.
+
+    ``key`` identifies the embedding space (model and its settings) in the
+    on-disk cache; vectors from embedders with different keys are never mixed.
+    """
+
+    key: str
+
+    @abstractmethod
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """``len(texts) x dim`` float32 matrix with L2-normalized rows."""
+        ...
+
+
+class HashingEmbedder(Embedder):
+    """Local, dependency-free embedding: hashed bag of identifier words.
+
+    Identifiers are split into words (:func:`~.mapping_index.name_tokens`),
+    so ``get_current_epoch(state)`` and ``getCurrentEpoch(state)`` embed alike
+    across Python and TypeScript. Each word and each pair of adjacent words
+    within an identifier is hashed to one of ``dim`` signed buckets, weighted
+    ``1 + log(count)``. Deterministic, so cached vectors stay valid.
+    """
+
+    dim = 256
+
+    def __init__(self, config: MappingConfig | None = None) -> None:
+        self.key = f"hashing-v1:{self.dim}"
+        # Identifiers repeat across functions; split and hash each once
+        self._features: dict[str, list[int]] = {}
+        self._feature_ids: dict[str, int] = {}
+        self._buckets: list[int] = []
+        self._signs: list[float] = []
+
+    def _feature_id(self, feature: str) -> int:
+        feature_id = self._feature_ids.get(feature)
+        if feature_id is None:
+            feature_id = self._feature_ids[feature] = len(self._buckets)
+            digest = zlib.crc32(feature.encode())
+            self._buckets.append(digest % self.dim)
+            self._signs.append(1.0 if digest & (1 << 31) else -1.0)
+        return feature_id
+
+    def _identifier_features(self, identifier: str) -> list[int]:
+        """Ids of the words and adjacent word pairs of ``identifier``."""
+        features = self._features.get(identifier)
+        if features is None:
+            words = [w for w in name_tokens(identifier) if w not in _STOP_WORDS]
+            features = self._features[identifier] = [
+                self._feature_id(feature) for feature in (*words, *(f"{a} {b}" for a, b in zip(words, words[1:])))
+            ]
+        return features
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        rows: list[int] = []
+        features: list[int] = []
+        for row, text in enumerate(texts):
+            before = len(features)
+            for identifier in _IDENTIFIER_RE.findall(text):
+                features.extend(self._identifier_features(identifier))
+            rows.extend([row] * (len(features) - before))
+        # Count each (text, feature) pair at once, then add the signed,
+        # log-scaled counts into the buckets
+        pairs, counts = np.unique(
+            np.asarray(rows, dtype=np.int64) * len(self._buckets) + np.asarray(features, dtype=np.int64),
+            return_counts=True,
+        )
+        rows_of, features_of = np.divmod(pairs, len(self._buckets))
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        weights = np.asarray(self._signs, dtype=np.float32)[features_of] * (1 + np.log(counts)).astype(np.float32)
+        np.add.at(matrix, (rows_of, np.asarray(self._buckets, dtype=np.int64)[features_of]), weights)
+        return _normalize(matrix)
+
+
+class OpenAIEmbedder(Embedder):
+    """Embeddings from the OpenAI API (``OPENAI_API_KEY``), ``batch_size`` texts per request."""
+
+    default_model = "text-embedding-3-small"
+    batch_size = 256
+    # Keep each input well inside the model's context window
+    max_chars = 16_000
+
+    def __init__(self, config: MappingConfig | None = None) -> None:
+        import openai
+
+        self.model = (config.embedding_model if config else None) or self.default_model
+        self.key = f"openai:{self.model}"
+        self._client = openai.OpenAI()
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        rows: list[list[float]] = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = [text[:self.max_chars] or " " for text in texts[start:start + self.batch_size]]
+            response = self._client.embeddings.create(model=self.model, input=batch)
+            rows.extend(item.embedding for item in sorted(response.data, key=lambda item: item.index))
+        return _normalize(np.asarray(rows, dtype=np.float32).reshape(len(texts), -1))
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    # All-zero rows (no identifiers) stay zero and score 0 against everything
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+
+# Embedder name (``mapping.embedder``) -> implementation
+EMBEDDERS: dict[str, type[Embedder]] = {
+    "hashing": HashingEmbedder,
+    "openai": OpenAIEmbedder,
+}
+
+
+def get_embedder(config: MappingConfig) -> Embedder:
+    try:
+        cls = EMBEDDERS[config.embedder]
+    except KeyError:
+        raise ValueError(f"Unknown embedder: {config.embedder}") from None
+    return cls(config)
+
+
+class EmbeddingStore:
+    """SQLite cache of embeddings keyed by embedder and source SHA-256.
+
+    Vectors are stored as float16 (half the size, ample precision for cosine
+    ranking) and returned as a float32 matrix with one row per text, so an
+    unchanged function is never embedded twice. With ``db_path`` None the
+    store only lives for the process.
+    """
+
+    def __init__(self, db_path: str | Path | None, embedder: Embedder) -> None:
+        self.embedder = embedder
+        self._conn = sqlite3.connect(str(db_path) if db_path else ":memory:")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " embedder TEXT NOT NULL, sha256 TEXT NOT NULL, vector BLOB NOT NULL,"
+            " PRIMARY KEY (embedder, sha256))"
+        )
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def _cached(self, digests: list[str]) -> dict[str, bytes]:
+        return dict(select_in(
+            self._conn, "SELECT sha256, vector FROM embeddings WHERE embedder = ? AND sha256", digests,
+            (self.embedder.key,),
+        ))
+
+    def vectors(self, texts: Sequence[str]) -> np.ndarray:
+        """Embeddings of ``texts``, computing and storing only the uncached ones."""
+        digests = [hashlib.sha256(text.encode()).hexdigest() for text in texts]
+        cached = self._cached(list(dict.fromkeys(digests)))
+        missing = {digest: text for digest, text in zip(digests, texts) if digest not in cached}
+        self.hits += len(cached)
+        self.misses += len(missing)
+        if missing:
+            embedded = self.embedder.embed(list(missing.values())).astype(np.float16)
+            new = {digest: row.tobytes() for digest, row in zip(missing, embedded)}
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (embedder, sha256, vector) VALUES (?, ?, ?)",
+                [(self.embedder.key, digest, vector) for digest, vector in new.items()],
+            )
+            self._conn.commit()
+            cached.update(new)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        matrix = np.frombuffer(b"".join(cached[digest] for digest in digests), dtype=np.float16)
+        return matrix.reshape(len(texts), -1).astype(np.float32)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> EmbeddingStore:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def semantic_candidates(
+    spec_functions: Sequence[SpecFunction],
+    client_functions: Sequence[ClientFunction],
+    store: EmbeddingStore,
+    top_k: int = 5,
+    min_score: float = 0.0,
+) -> list[tuple[SpecFunction, list[Candidate]]]:
+    """The ``top_k`` client functions whose bodies embed closest to each spec function's.
+
+    Scores are cosine similarities (-1 to 1); candidates below ``min_score``
+    are dropped. Spec rows are scored against the whole client matrix in
+    blocks sized to bound memory, one matrix multiplication per block, and
+    the top ``k`` of each row are selected with a partial sort.
+    """
+    if not spec_functions or not client_functions or top_k <= 0:
+        return [(spec_fn, []) for spec_fn in spec_functions]
+    clients = store.vectors([fn.source for fn in client_functions])
+    specs = store.vectors([fn.source for fn in spec_functions])
+    k = min(top_k, len(client_functions))
+    block = max(1, _BLOCK_CELLS // len(client_functions))
+    results: list[tuple[SpecFunction, list[Candidate]]] = []
+    for start in range(0, len(spec_functions), block):
+        scores = specs[start:start + block] @ clients.T
+        top = np.argpartition(scores, -k, axis=1)[:, -k:]
+        for offset, columns in enumerate(top):
+            row = scores[offset]
+            ranked = sorted(columns, key=lambda column: (-row[column], column))
+            results.append((spec_functions[start + offset], [
+                Candidate(client_functions[column], round(float(row[column]), 4), None, False)
+                for column in ranked
+                if row[column] >= min_score
+            ]))
+    return results
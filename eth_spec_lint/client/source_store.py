@@ -0,0 +1,58 @@
+"""Lazy, memory-mapped access to client source text."""
+
+from __future__ import annotations
+
+import mmap
+import threading
+from collections import OrderedDict
+
+
+class SourceStore:
+    """Reads byte ranges of source files on demand through memory maps.
+
+    Client functions keep only ``(file_path, start_byte, end_byte)`` and ask
+    the store for their text when it is actually needed (i.e. for compared
+    pairs), so unrelated source never has to be held in memory. A small LRU
+    of open maps bounds the number of file descriptors in use.
+    """
+
+    def __init__(self, max_open: int = 64) -> None:
+        self.max_open = max_open
+        self._maps: OrderedDict[str, mmap.mmap | bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _map(self, file_path: str) -> mmap.mmap | bytes:
+        data = self._maps.get(file_path)
+        if data is not None:
+            self._maps.move_to_end(file_path)
+            return data
+        with open(file_path, "rb") as fh:
+            try:
+                data = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # empty file
+                data = b""
+        self._maps[file_path] = data
+        if len(self._maps) > self.max_open:
+            _, evicted = self._maps.popitem(last=False)
+            if isinstance(evicted, mmap.mmap):
+                evicted.close()
+        return data
+
+    def buffer(self, file_path: str) -> mmap.mmap | bytes:
+        """The whole file as a read-only buffer (valid until evicted or closed)."""
+        with self._lock:
+            return self._map(file_path)
+
+    def read_bytes(self, file_path: str, start: int, end: int) -> bytes:
+        with self._lock:
+            return self._map(file_path)[start:end]
+
+    def read(self, file_path: str, start: int, end: int) -> str:
+        return self.read_bytes(file_path, start, end).decode(errors="replace")
+
+    def close(self) -> None:
+        with self._lock:
+            for data in self._maps.values():
+                if isinstance(data, mmap.mmap):
+                    data.close()
+            self._maps.clear()
@@ -0,0 +1,89 @@
+"""Provider batch-API mode: submit every cache miss at once, poll, ingest into the cache."""
+
+from __future__ import annotations
+
+import logging
+import time
+
+from ..client.base import ClientFunction
+from ..config import Config, LLMConfig
+from ..parser.models import SpecFunction
+from .cache import Cache, open_cache
+from .engine import _cache_entry, _cache_key, _render_prompt
+from .prompts import Prompt
+from .providers import BatchProvider, get_provider
+
+logger = logging.getLogger(__name__)
+
+
+def _ingest_finished(
+    provider: BatchProvider,
+    cache: Cache,
+    pending: list[tuple[str, list[str]]],
+    llm: LLMConfig,
+) -> int:
+    """Store results of every finished batch in ``pending``; return how many finished."""
+    finished = 0
+    for batch_id, keys in list(pending):
+        if not provider.batch_done(batch_id):
+            continue
+        results = provider.batch_results(batch_id)
+        for resp in results.values():
+            provider.usage.add(resp)
+        cache.set_many({key: _cache_entry(resp, llm) for key, resp in results.items()})
+        missing = len(set(keys) - results.keys())
+        if missing:
+            logger.warning("Batch %s: %d requests failed and will be compared live", batch_id, missing)
+        logger.info("Batch %s finished: %d results", batch_id, len(results))
+        cache.remove_batch(batch_id)
+        pending.remove((batch_id, keys))
+        finished += 1
+    return finished
+
+
+def run_batch(
+    pairs: list[tuple[SpecFunction, ClientFunction]],
+    config: Config,
+) -> None:
+    """Fill the comparison cache for ``pairs`` through the provider's batch API.
+
+    Batches left over from an interrupted run (recorded in the cache DB) are
+    resumed rather than resubmitted. Requests that fail inside a batch are
+    left uncached, so a following :func:`compare_all` picks them up live.
+    """
+    cache = open_cache(config.cache)
+    try:
+        with get_provider(config.llm) as provider:
+            if not isinstance(provider, BatchProvider):
+                raise ValueError(f"Provider {config.llm.provider!r} does not support batch mode")
+
+            pending = cache.pending_batches(config.llm.provider)
+            if pending:
+                logger.info("Resuming %d pending batches", len(pending))
+            submitted = {key for _, keys in pending for key in keys}
+
+            keys = [_cache_key(spec_fn.source, client_fn.source, config.llm) for spec_fn, client_fn in pairs]
+            cached = cache.get_many(keys)
+            prompts: dict[str, Prompt] = {}
+            for key, (spec_fn, client_fn) in zip(keys, pairs):
+                if key in prompts or key in submitted or key in cached:
+                    continue
+                prompts[key] = _render_prompt(spec_fn, client_fn)
+
+            items = list(prompts.items())
+            for start in range(0, len(items), provider.max_batch_size):
+                chunk = dict(items[start:start + provider.max_batch_size])
+                batch_id = provider.submit_batch(chunk)
+                # Persist before polling so a killed run can pick the batch back up
+                cache.add_batch(batch_id, config.llm.provider, list(chunk))
+                pending.append((batch_id, list(chunk)))
+                logger.info("Submitted batch %s with %d requests", batch_id, len(chunk))
+
+            while pending:
+                _ingest_finished(provider, cache, pending, config.llm)
+                if pending:
+                    logger.info("Waiting on %d batches", len(pending))
+                    time.sleep(config.llm.batch_poll_interval)
+            logger.info("Batch usage: %s", provider.usage.summary())
+    finally:
+        cache.close()
@@ -0,0 +1,655 @@
+"""Result cache for LLM comparisons, with SQLite and directory/tarball backends."""
+
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import os
+import re
+import shutil
+import sqlite3
+import tarfile
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Any
+
+from ..config import CacheConfig
+from ..sqlite_query import QUERY_CHUNK, select_in
+
+logger = logging.getLogger(__name__)
+
+# Columns added after the original (key, value) schema; existing databases
+# are migrated in place with ALTER TABLE.
+_METADATA_COLUMNS = {
+    "provider": "TEXT",
+    "model": "TEXT",
+    "created_at": "REAL",
+    "last_hit_at": "REAL",
+    "hits": "INTEGER NOT NULL DEFAULT 0",
+    "input_tokens": "INTEGER",
+    "output_tokens": "INTEGER",
+    "latency_ms": "REAL",
+}
+
+# Recency used for LRU eviction; pre-metadata rows sort as oldest
+_RECENCY = "COALESCE(last_hit_at, created_at, 0)"
+
+# Cache keys are SHA-256 hex digests (see ``engine._cache_key``); anything
+# else, e.g. from an imported file, could name a path outside the cache
+_KEY_RE = re.compile(r"[0-9a-f]{64}")
+
+
+def check_key(key: str) -> str:
+    """Return ``key`` if it is a valid cache key, else raise ValueError."""
+    if not isinstance(key, str) or not _KEY_RE.fullmatch(key):
+        raise ValueError(f"Invalid cache key: {key!r}")
+    return key
+
+
+@dataclass
+class CacheEntry:
+    """A cached LLM response plus the metadata recorded when it was produced."""
+    value: str
+    provider: str = ""
+    model: str = ""
+    input_tokens: int = 0
+    output_tokens: int = 0
+    latency_ms: float = 0.0
+    # Set by the backend on first write; preserved by export/import
+    created_at: float = 0.0
+
+
+class CacheBackend(ABC):
+    """Storage behind :class:`Cache`. Implementations must be thread-safe."""
+
+    @abstractmethod
+    def get_many(self, keys: Iterable[str]) -> dict[str, str]:
+        """Return values for the keys present, counting each as a hit."""
+        ...
+
+    @abstractmethod
+    def set_many(self, entries: Mapping[str, CacheEntry]) -> None:
+        ...
+
+    @abstractmethod
+    def entries(self) -> Iterator[tuple[str, CacheEntry]]:
+        """Iterate over every stored entry (used by export)."""
+        ...
+
+    @abstractmethod
+    def stats(self) -> dict[str, Any]:
+        """Summary with entries, value_bytes, file_bytes, hits, tokens_saved,
+        oldest/newest creation times and (provider, model, count) by_model."""
+        ...
+
+    @abstractmethod
+    def prune(self, max_size_mb: float | None = None, max_age_days: float | None = None) -> int:
+        ...
+
+    @abstractmethod
+    def add_batch(self, batch_id: str, provider: str, keys: list[str]) -> None:
+        ...
+
+    @abstractmethod
+    def pending_batches(self, provider: str) -> list[tuple[str, list[str]]]:
+        ...
+
+    @abstractmethod
+    def remove_batch(self, batch_id: str) -> None:
+        ...
+
+    def flush(self) -> None:
+        pass
+
+    def vacuum(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteBackend(CacheBackend):
+    """SQLite cache storage.
+
+    The database runs in WAL mode so readers never block the writer. Writes
+    are buffered and committed by a single background writer thread in
+    grouped transactions (every ``flush_interval`` seconds or ``flush_size``
+    entries); reads use one connection per thread and also see entries that
+    are still buffered. Safe to share across threads.
+    """
+
+    def __init__(self, db_path: str, flush_interval: float = 0.5, flush_size: int = 256) -> None:
+        self._db_path = db_path
+        self._flush_interval = flush_interval
+        self._flush_size = flush_size
+
+        self._writer = sqlite3.connect(db_path, check_same_thread=False)
+        self._writer.execute("PRAGMA journal_mode=WAL")
+        # With WAL, NORMAL only fsyncs at checkpoints; a crash loses at most
+        # the last few transactions, which are re-fetchable results.
+        self._writer.execute("PRAGMA synchronous=NORMAL")
+        self._writer.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT)"
+        )
+        existing = {row[1] for row in self._writer.execute("PRAGMA table_info(cache)")}
+        for column, decl in _METADATA_COLUMNS.items():
+            if column not in existing:
+                self._writer.execute(f"ALTER TABLE cache ADD COLUMN {column} {decl}")
+        self._writer.execute(f"CREATE INDEX IF NOT EXISTS cache_recency ON cache ({_RECENCY})")
+        self._writer.execute(
+            "CREATE TABLE IF NOT EXISTS batches"
+            " (batch_id TEXT PRIMARY KEY, provider TEXT, keys TEXT, submitted_at REAL)"
+        )
+        self._writer.commit()
+
+        self._write_lock = threading.Lock()
+        self._pending_lock = threading.Lock()
+        self._pending: dict[str, CacheEntry] = {}
+        self._hits: dict[str, int] = {}
+        self._local = threading.local()
+        self._readers: list[sqlite3.Connection] = []
+        self._closed = False
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="eth-spec-lint-cache-writer", daemon=True)
+        self._thread.start()
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._db_path, check_same_thread=False)
+            self._local.conn = conn
+            with self._pending_lock:
+                self._readers.append(conn)
+        return conn
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wake.wait(self._flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                # e.g. "database is locked"; buffered entries stay pending for the next flush
+                logger.exception("Cache flush failed; retrying")
+
+    def flush(self) -> None:
+        """Commit all buffered writes and hit counts in a single transaction."""
+        with self._write_lock:
+            with self._pending_lock:
+                batch = dict(self._pending)
+                hits, self._hits = self._hits, {}
+            if not batch and not hits:
+                return
+            now = time.time()
+            with self._writer:
+                self._writer.executemany(
+                    "INSERT OR REPLACE INTO cache"
+                    " (key, value, provider, model, created_at, last_hit_at, hits,"
+                    " input_tokens, output_tokens, latency_ms)"
+                    " VALUES (?, ?, ?, ?, ?, NULL, 0, ?, ?, ?)",
+                    [
+                        (
+                            key, e.value, e.provider, e.model, e.created_at or now,
+                            e.input_tokens, e.output_tokens, e.latency_ms,
+                        )
+                        for key, e in batch.items()
+                    ],
+                )
+                self._writer.executemany(
+                    "UPDATE cache SET hits = hits + ?, last_hit_at = ? WHERE key = ?",
+                    [(count, now, key) for key, count in hits.items()],
+                )
+            # Drop entries only after commit so readers never see a gap
+            with self._pending_lock:
+                for key, entry in batch.items():
+                    if self._pending.get(key) is entry:
+                        del self._pending[key]
+
+    def _record_hits(self, keys: Iterable[str]) -> None:
+        with self._pending_lock:
+            for key in keys:
+                self._hits[key] = self._hits.get(key, 0) + 1
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, str]:
+        found: dict[str, str] = {}
+        remaining: list[str] = []
+        with self._pending_lock:
+            for key in dict.fromkeys(keys):
+                if key in self._pending:
+                    found[key] = self._pending[key].value
+                else:
+                    remaining.append(key)
+        found.update(select_in(self._reader(), "SELECT key, value FROM cache WHERE key", remaining))
+        self._record_hits(found)
+        return found
+
+    def set_many(self, entries: Mapping[str, CacheEntry]) -> None:
+        with self._pending_lock:
+            self._pending.update(entries)
+            full = len(self._pending) >= self._flush_size
+        if full:
+            self._wake.set()
+
+    def entries(self) -> Iterator[tuple[str, CacheEntry]]:
+        self.flush()
+        rows = self._reader().execute(
+            "SELECT key, value, provider, model, input_tokens, output_tokens, latency_ms, created_at"
+            " FROM cache ORDER BY key"
+        )
+        for key, value, provider, model, input_tokens, output_tokens, latency_ms, created_at in rows:
+            yield key, CacheEntry(
+                value=value,
+                provider=provider or "",
+                model=model or "",
+                input_tokens=input_tokens or 0,
+                output_tokens=output_tokens or 0,
+                latency_ms=latency_ms or 0.0,
+                created_at=created_at or 0.0,
+            )
+
+    def stats(self) -> dict[str, Any]:
+        self.flush()
+        conn = self._reader()
+        entries, value_bytes, hits, oldest, newest, saved_tokens = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(value)), 0), COALESCE(SUM(hits), 0),"
+            " MIN(created_at), MAX(created_at),"
+            " COALESCE(SUM(hits * (COALESCE(input_tokens, 0) + COALESCE(output_tokens, 0))), 0)"
+            " FROM cache"
+        ).fetchone()
+        by_model = conn.execute(
+            "SELECT COALESCE(provider, ''), COALESCE(model, ''), COUNT(*) FROM cache"
+            " GROUP BY 1, 2 ORDER BY 3 DESC"
+        ).fetchall()
+        return {
+            "entries": entries,
+            "value_bytes": value_bytes,
+            "file_bytes": sum(
+                os.path.getsize(p) for p in (self._db_path, self._db_path + "-wal")
+                if os.path.exists(p)
+            ),
+            "hits": hits,
+            "tokens_saved": saved_tokens,
+            "oldest": oldest,
+            "newest": newest,
+            "by_model": [(provider, model, count) for provider, model, count in by_model],
+        }
+
+    def prune(self, max_size_mb: float | None = None, max_age_days: float | None = None) -> int:
+        """Evict entries not used within ``max_age_days``, then least recently
+        used entries until cached values fit in ``max_size_mb``.
+
+        Returns the number of entries removed.
+        """
+        self.flush()
+        removed = 0
+        with self._write_lock, self._writer:
+            if max_age_days is not None:
+                cutoff = time.time() - max_age_days * 86400
+                removed += self._writer.execute(
+                    f"DELETE FROM cache WHERE {_RECENCY} < ?", (cutoff,)
+                ).rowcount
+            if max_size_mb is not None:
+                removed += self._writer.execute(
+                    "DELETE FROM cache WHERE key IN ("
+                    " SELECT key FROM ("
+                    f"  SELECT key, SUM(LENGTH(value)) OVER (ORDER BY {_RECENCY} DESC, key) AS running"
+                    "  FROM cache)"
+                    " WHERE running > ?)",
+                    (int(max_size_mb * 1024 * 1024),),
+                ).rowcount
+        return removed
+
+    def vacuum(self) -> None:
+        """Fold the WAL back into the database file and reclaim free pages."""
+        self.flush()
+        with self._write_lock:
+            self._writer.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._writer.execute("VACUUM")
+
+    def add_batch(self, batch_id: str, provider: str, keys: list[str]) -> None:
+        """Record a submitted provider batch so an interrupted run can resume it."""
+        with self._write_lock, self._writer:
+            self._writer.execute(
+                "INSERT OR REPLACE INTO batches (batch_id, provider, keys, submitted_at) VALUES (?, ?, ?, ?)",
+                (batch_id, provider, json.dumps(keys), time.time()),
+            )
+
+    def pending_batches(self, provider: str) -> list[tuple[str, list[str]]]:
+        rows = self._reader().execute(
+            "SELECT batch_id, keys FROM batches WHERE provider = ? ORDER BY submitted_at",
+            (provider,),
+        ).fetchall()
+        return [(batch_id, json.loads(keys)) for batch_id, keys in rows]
+
+    def remove_batch(self, batch_id: str) -> None:
+        # Results ingested from the batch must be durable before it is forgotten
+        self.flush()
+        with self._write_lock, self._writer:
+            self._writer.execute("DELETE FROM batches WHERE batch_id = ?", (batch_id,))
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join()
+        self.flush()
+        for conn in self._readers:
+            conn.close()
+        self._writer.close()
+
+
+_TAR_MODES = {".tar": "", ".tar.gz": "gz", ".tgz": "gz"}
+_UNSAFE_NAME_RE = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+class DirectoryBackend(CacheBackend):
+    """Content-addressed cache storage: one JSON file per key.
+
+    Entries live at ``<root>/<key[:2]>/<key>.json`` and file mtimes track
+    last use, so the tree can be saved and restored with ``actions/cache``,
+    rsync, or any object store mounted as a path. If ``path`` ends in
+    ``.tar``, ``.tar.gz`` or ``.tgz`` the directory is unpacked from that
+    archive on open and repacked on close when anything changed.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._archive: Path | None = None
+        self._tar_mode = ""
+        for suffix, mode in _TAR_MODES.items():
+            if path.endswith(suffix):
+                self._archive, self._tar_mode = Path(path), mode
+        if self._archive is not None:
+            self._root = Path(tempfile.mkdtemp(prefix="eth-spec-lint-cache-"))
+            if self._archive.exists():
+                with tarfile.open(self._archive) as tar:
+                    if hasattr(tarfile, "data_filter"):
+                        tar.extractall(self._root, filter="data")
+                    else:  # Python < 3.11.4
+                        tar.extractall(self._root)
+        else:
+            self._root = Path(path)
+            self._root.mkdir(parents=True, exist_ok=True)
+        self._batches = self._root / "_batches"
+        self._lock = threading.Lock()
+        self._hits: dict[str, int] = {}
+        self._dirty = False
+
+    def _path(self, key: str) -> Path:
+        check_key(key)
+        return self._root / key[:2] / f"{key}.json"
+
+    def _write_json(self, path: Path, data: dict[str, Any]) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+        self._dirty = True
+
+    def _read(self, path: Path) -> dict[str, Any] | None:
+        try:
+            return json.loads(path.read_text())
+        except (OSError, ValueError):
+            return None
+
+    def _entry_files(self) -> Iterator[Path]:
+        for shard in sorted(self._root.iterdir()):
+            if shard.is_dir() and shard != self._batches:
+                yield from sorted(shard.glob("*.json"))
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, str]:
+        found: dict[str, str] = {}
+        for key in dict.fromkeys(keys):
+            path = self._path(key)
+            data = self._read(path)
+            if data is None:
+                continue
+            found[key] = data["value"]
+            os.utime(path)
+        with self._lock:
+            for key in found:
+                self._hits[key] = self._hits.get(key, 0) + 1
+        return found
+
+    def set_many(self, entries: Mapping[str, CacheEntry]) -> None:
+        now = time.time()
+        for key, entry in entries.items():
+            data = asdict(entry)
+            data["created_at"] = entry.created_at or now
+            data["hits"] = 0
+            self._write_json(self._path(key), data)
+
+    def entries(self) -> Iterator[tuple[str, CacheEntry]]:
+        names = {f.name for f in fields(CacheEntry)}
+        for path in self._entry_files():
+            data = self._read(path)
+            if data is not None:
+                yield path.stem, CacheEntry(**{k: v for k, v in data.items() if k in names})
+
+    def flush(self) -> None:
+        """Persist buffered hit counts into the entry files."""
+        with self._lock:
+            hits, self._hits = self._hits, {}
+        for key, count in hits.items():
+            path = self._path(key)
+            data = self._read(path)
+            if data is not None:
+                data["hits"] = data.get("hits", 0) + count
+                self._write_json(path, data)
+
+    def stats(self) -> dict[str, Any]:
+        self.flush()
+        entries = value_bytes = hits = saved_tokens = file_bytes = 0
+        created: list[float] = []
+        by_model: dict[tuple[str, str], int] = {}
+        for path in self._entry_files():
+            data = self._read(path)
+            if data is None:
+                continue
+            entries += 1
+            file_bytes += path.stat().st_size
+            value_bytes += len(data["value"])
+            hits += data.get("hits", 0)
+            saved_tokens += data.get("hits", 0) * (data.get("input_tokens", 0) + data.get("output_tokens", 0))
+            created.append(data.get("created_at", 0.0))
+            model_key = (data.get("provider", ""), data.get("model", ""))
+            by_model[model_key] = by_model.get(model_key, 0) + 1
+        return {
+            "entries": entries,
+            "value_bytes": value_bytes,
+            "file_bytes": file_bytes,
+            "hits": hits,
+            "tokens_saved": saved_tokens,
+            "oldest": min(created, default=None),
+            "newest": max(created, default=None),
+            "by_model": [(p, m, n) for (p, m), n in sorted(by_model.items(), key=lambda kv: -kv[1])],
+        }
+
+    def prune(self, max_size_mb: float | None = None, max_age_days: float | None = None) -> int:
+        self.flush()
+        files = sorted(
+            ((path.stat().st_mtime, path) for path in self._entry_files()),
+            key=lambda item: item[0],
+            reverse=True,
+        )
+        doomed: list[Path] = []
+        if max_age_days is not None:
+            cutoff = time.time() - max_age_days * 86400
+            doomed.extend(path for mtime, path in files if mtime < cutoff)
+            files = [(mtime, path) for mtime, path in files if mtime >= cutoff]
+        if max_size_mb is not None:
+            budget = int(max_size_mb * 1024 * 1024)
+            running = 0
+            for _, path in files:
+                running += path.stat().st_size
+                if running > budget:
+                    doomed.append(path)
+        for path in doomed:
+            path.unlink(missing_ok=True)
+        if doomed:
+            self._dirty = True
+        return len(doomed)
+
+    def vacuum(self) -> None:
+        """Remove leftover temp files and empty shard directories."""
+        for tmp in self._root.rglob("*.tmp"):
+            tmp.unlink(missing_ok=True)
+        for shard in self._root.iterdir():
+            if shard.is_dir() and not any(shard.iterdir()):
+                shard.rmdir()
+        self._dirty = True
+
+    def _batch_path(self, batch_id: str) -> Path:
+        return self._batches / f"{_UNSAFE_NAME_RE.sub('_', batch_id)}.json"
+
+    def add_batch(self, batch_id: str, provider: str, keys: list[str]) -> None:
+        self._write_json(self._batch_path(batch_id), {
+            "batch_id": batch_id, "provider": provider, "keys": keys, "submitted_at": time.time(),
+        })
+
+    def pending_batches(self, provider: str) -> list[tuple[str, list[str]]]:
+        if not self._batches.exists():
+            return []
+        records = [self._read(path) for path in self._batches.glob("*.json")]
+        records = sorted((r for r in records if r and r["provider"] == provider), key=lambda r: r["submitted_at"])
+        return [(r["batch_id"], r["keys"]) for r in records]
+
+    def remove_batch(self, batch_id: str) -> None:
+        self._batch_path(batch_id).unlink(missing_ok=True)
+        self._dirty = True
+
+    def close(self) -> None:
+        self.flush()
+        if self._archive is None:
+            return
+        if self._dirty:
+            self._archive.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self._archive.with_name(self._archive.name + ".tmp")
+            with tarfile.open(tmp, f"w:{self._tar_mode}") as tar:
+                for child in sorted(self._root.iterdir()):
+                    tar.add(child, arcname=child.name)
+            os.replace(tmp, self._archive)
+        shutil.rmtree(self._root, ignore_errors=True)
+
+
+# Backend name (``cache.backend``) -> implementation
+BACKENDS: dict[str, type[CacheBackend]] = {
+    "sqlite": SQLiteBackend,
+    "directory": DirectoryBackend,
+}
+
+
+class Cache:
+    """Result cache used by the comparison engine.
+
+    Storage is delegated to a :class:`CacheBackend`; ``Cache(path)`` opens
+    the default SQLite backend.
+    """
+
+    def __init__(self, path: str, backend: str = "sqlite", **options: Any) -> None:
+        try:
+            cls = BACKENDS[backend]
+        except KeyError:
+            raise ValueError(f"Unknown cache backend: {backend}") from None
+        self.backend = cls(path, **options)
+
+    def get(self, key: str) -> str | None:
+        return self.backend.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, str]:
+        """Look up many keys at once; missing keys are absent from the result."""
+        return self.backend.get_many(keys)
+
+    def set(self, key: str, value: str | CacheEntry) -> None:
+        self.set_many({key: value})
+
+    def set_many(self, items: Mapping[str, str | CacheEntry]) -> None:
+        self.backend.set_many({
+            key: value if isinstance(value, CacheEntry) else CacheEntry(value)
+            for key, value in items.items()
+        })
+
+    def flush(self) -> None:
+        self.backend.flush()
+
+    def stats(self) -> dict[str, Any]:
+        """Summary of cache contents for ``eth-spec-lint cache stats``."""
+        return self.backend.stats()
+
+    def prune(self, max_size_mb: float | None = None, max_age_days: float | None = None) -> int:
+        """Evict entries not used within ``max_age_days``, then least recently
+        used entries until the cache fits in ``max_size_mb``.
+
+        Returns the number of entries removed.
+        """
+        return self.backend.prune(max_size_mb, max_age_days)
+
+    def vacuum(self) -> None:
+        self.backend.vacuum()
+
+    def add_batch(self, batch_id: str, provider: str, keys: list[str]) -> None:
+        """Record a submitted provider batch so an interrupted run can resume it."""
+        self.backend.add_batch(batch_id, provider, keys)
+
+    def pending_batches(self, provider: str) -> list[tuple[str, list[str]]]:
+        return self.backend.pending_batches(provider)
+
+    def remove_batch(self, batch_id: str) -> None:
+        self.backend.remove_batch(batch_id)
+
+    def export_entries(self, path: str | Path) -> int:
+        """Write every entry to a JSON-lines file (gzipped if ``path`` ends in .gz)."""
+        opener = gzip.open if str(path).endswith(".gz") else open
+        count = 0
+        with opener(path, "wt") as f:
+            for key, entry in self.backend.entries():
+                f.write(json.dumps({"key": key, **asdict(entry)}) + "\n")
+                count += 1
+        return count
+
+    def import_entries(self, path: str | Path) -> int:
+        """Load entries written by :meth:`export_entries`, keeping existing keys.
+
+        Returns the number of entries added. Raises ValueError on a key that
+        is not a cache key (entries read before it are kept).
+        """
+        opener = gzip.open if str(path).endswith(".gz") else open
+        names = {f.name for f in fields(CacheEntry)}
+        added = 0
+        batch: dict[str, CacheEntry] = {}
+
+        def _commit() -> int:
+            existing = self.backend.get_many(batch)
+            new = {k: v for k, v in batch.items() if k not in existing}
+            self.backend.set_many(new)
+            batch.clear()
+            return len(new)
+
+        with opener(path, "rt") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                data = json.loads(line)
+                batch[check_key(data.pop("key"))] = CacheEntry(**{k: v for k, v in data.items() if k in names})
+                if len(batch) >= QUERY_CHUNK:
+                    added += _commit()
+        if batch:
+            added += _commit()
+        return added
+
+    def close(self) -> None:
+        self.backend.close()
+
+
+def open_cache(config: CacheConfig) -> Cache:
+    """Open the cache described by the ``cache`` config section."""
+    if config.backend == "sqlite":
+        return Cache(config.db_path)
+    return Cache(config.dir_path, backend=config.backend)
@@ -5,81 +5,105 @@ from __future__ import annotations
 import hashlib
 import json
 import logging
-import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 from ..client.base import ClientFunction
-from ..config import Config
+from ..config import Config, LLMConfig
 from ..parser.models import Finding, FindingCategory, Severity, SpecFunction
+from .cache import Cache, CacheEntry, open_cache
 from .diff_types import CATEGORY_SEVERITY
-from .prompts import render_compare_function
+from .prompts import Prompt, render_compare_function, render_compare_functions_packed, template_hash
+from .providers import LLMProvider, LLMResponse, get_provider
+from .ratelimit import (
+    RateLimiter,
+    backoff_delay,
+    error_headers,
+    is_retryable,
+    is_throttle,
+    retry_after_seconds,
+)
 
 logger = logging.getLogger(__name__)
 
-PROMPT_VERSION = "1"
-
-
-class Cache:
-    """SQLite-backed cache for LLM comparison results."""
-
-    def __init__(self, db_path: str) -> None:
-        self._conn = sqlite3.connect(db_path)
-        self._conn.execute(
-            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT)"
-        )
-        self._conn.commit()
-
-    def get(self, key: str) -> str | None:
-        row = self._conn.execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()
-        return row[0] if row else None
-
-    def set(self, key: str, value: str) -> None:
-        self._conn.execute(
-            "INSERT OR REPLACE INTO cache (key, value) VALUES (?, ?)", (key, value)
-        )
-        self._conn.commit()
-
-    def close(self) -> None:
-        self._conn.close()
-
-
-def _cache_key(spec_source: str, client_source: str) -> str:
-    payload = f"{PROMPT_VERSION}:{spec_source}:{client_source}"
+PROMPT_VERSION = "2"
+
+
+def _cache_key(spec_source: str, client_source: str, llm: LLMConfig) -> str:
+    """Key a comparison on everything that can change its result: prompt
+    templates (single and packed, which store under the same keys), provider,
+    model, temperature and both sources."""
+    payload = "\0".join([
+        PROMPT_VERSION,
+        template_hash("compare_function_system.j2", "compare_function.j2", "compare_functions_packed.j2"),
+        llm.provider,
+        llm.model,
+        repr(llm.temperature),
+        spec_source,
+        client_source,
+    ])
     return hashlib.sha256(payload.encode()).hexdigest()
 
 
-def _call_anthropic(prompt: str, config: Config) -> str:
-    import anthropic
-
-    client = anthropic.Anthropic()
-    resp = client.messages.create(
-        model=config.llm.model,
-        max_tokens=2048,
-        temperature=config.llm.temperature,
-        messages=[{"role": "user", "content": prompt}],
+def _cache_entry(resp: LLMResponse, llm: LLMConfig, share: int = 1) -> CacheEntry:
+    """Cache entry for ``resp``; ``share`` splits usage across packed pairs."""
+    return CacheEntry(
+        value=resp.text,
+        provider=llm.provider,
+        model=llm.model,
+        input_tokens=resp.input_tokens // share,
+        output_tokens=resp.output_tokens // share,
+        latency_ms=resp.latency_ms / share,
     )
-    return resp.content[0].text
-
 
-def _call_openai(prompt: str, config: Config) -> str:
-    import openai
 
-    client = openai.OpenAI()
-    resp = client.chat.completions.create(
-        model=config.llm.model,
-        temperature=config.llm.temperature,
-        messages=[{"role": "user", "content": prompt}],
-    )
-    return resp.choices[0].message.content or ""
-
-
-def _call_llm(prompt: str, config: Config) -> str:
-    if config.llm.provider == "anthropic":
-        return _call_anthropic(prompt, config)
-    elif config.llm.provider == "openai":
-        return _call_openai(prompt, config)
-    else:
-        raise ValueError(f"Unknown LLM provider: {config.llm.provider}")
+def _call_llm(
+    prompt: Prompt,
+    config: Config,
+    limiter: RateLimiter | None = None,
+    provider: LLMProvider | None = None,
+) -> LLMResponse:
+    """Send a prompt, retrying transient failures with jittered backoff.
+
+    ``limiter`` and ``provider`` are shared between concurrent callers so that
+    throttling seen by one request slows down all of them and HTTP connections
+    are reused. Without a provider a one-off session is opened and closed.
+    """
+    if provider is None:
+        with get_provider(config.llm) as session:
+            return _call_llm(prompt, config, limiter, session)
+    if limiter is None:
+        limiter = RateLimiter(1, config.llm.requests_per_minute, config.llm.tokens_per_minute)
+    estimate = len(prompt) // 4
+    attempt = 0
+    while True:
+        ticket = limiter.acquire(estimate)
+        started = time.monotonic()
+        try:
+            resp = provider.complete(prompt)
+        except Exception as exc:
+            headers = error_headers(exc)
+            retry_after = retry_after_seconds(headers)
+            limiter.release(ticket, throttled=is_throttle(exc), retry_after=retry_after)
+            if not is_retryable(exc) or attempt >= config.llm.max_retries:
+                raise
+            delay = backoff_delay(attempt, retry_after)
+            logger.warning(
+                "LLM call failed (%s), retry %d/%d in %.1fs",
+                exc, attempt + 1, config.llm.max_retries, delay,
+            )
+            time.sleep(delay)
+            attempt += 1
+            continue
+        limiter.release(
+            ticket,
+            tokens=resp.input_tokens + resp.output_tokens,
+            headers=resp.headers,
+        )
+        resp.latency_ms = (time.monotonic() - started) * 1000
+        provider.usage.add(resp)
+        return resp
 
 
 def _parse_findings_json(raw: str, spec_fn: SpecFunction, client_fn: ClientFunction) -> list[Finding]:
@@ -120,53 +144,200 @@ def _parse_findings_json(raw: str, spec_fn: SpecFunction, client_fn: ClientFunct
             spec_file=spec_fn.file_path,
             client_file=client_fn.file_path,
             client_line=client_fn.line_number,
+            spec_line=spec_fn.line_number,
             detail=item.get("detail", ""),
             confidence=float(item.get("confidence", 0.5)),
         ))
     return findings
 
 
+def _render_prompt(spec_fn: SpecFunction, client_fn: ClientFunction) -> Prompt:
+    return render_compare_function(
+        spec_source=spec_fn.source,
+        client_source=client_fn.source,
+        spec_name=spec_fn.name,
+        client_name=client_fn.name,
+    )
+
+
+def _estimate_tokens(spec_fn: SpecFunction, client_fn: ClientFunction) -> int:
+    return (len(spec_fn.source) + len(client_fn.source)) // 4
+
+
+def _pack_pairs(
+    misses: dict[str, tuple[SpecFunction, ClientFunction]],
+    config: Config,
+) -> list[dict[str, tuple[SpecFunction, ClientFunction]]]:
+    """Group cache misses into requests.
+
+    Pairs whose sources fit in ``llm.pack_max_pair_tokens`` are packed
+    together, in order, up to ``llm.pack_token_budget`` per request; every
+    other pair gets a request of its own.
+    """
+    budget = config.llm.pack_token_budget
+    groups: list[dict[str, tuple[SpecFunction, ClientFunction]]] = []
+    pack: dict[str, tuple[SpecFunction, ClientFunction]] = {}
+    pack_tokens = 0
+    for key, pair in misses.items():
+        tokens = _estimate_tokens(*pair)
+        if budget <= 0 or tokens > config.llm.pack_max_pair_tokens:
+            groups.append({key: pair})
+            continue
+        if pack and pack_tokens + tokens > budget:
+            groups.append(pack)
+            pack, pack_tokens = {}, 0
+        pack[key] = pair
+        pack_tokens += tokens
+    if pack:
+        groups.append(pack)
+    return groups
+
+
+def _split_packed_response(raw: str, ids: dict[str, str]) -> dict[str, str]:
+    """Map a packed ``{pair_id: [findings]}`` response back to per-pair raw JSON.
+
+    ``ids`` maps pair ID -> cache key. Pairs missing from the response are omitted.
+    """
+    start = raw.find("{")
+    end = raw.rfind("}")
+    if start == -1 or end == -1:
+        return {}
+    try:
+        obj = json.loads(raw[start:end + 1])
+    except json.JSONDecodeError:
+        logger.warning("Failed to parse packed LLM JSON response")
+        return {}
+    if not isinstance(obj, dict):
+        return {}
+    return {
+        key: json.dumps(obj[pair_id])
+        for pair_id, key in ids.items()
+        if isinstance(obj.get(pair_id), list)
+    }
+
+
+def _compare_group(
+    group: dict[str, tuple[SpecFunction, ClientFunction]],
+    config: Config,
+    limiter: RateLimiter,
+    provider: LLMProvider,
+) -> dict[str, CacheEntry]:
+    """Compare one request's worth of pairs; returns cache key -> cache entry."""
+    if len(group) == 1:
+        [(key, (spec_fn, client_fn))] = group.items()
+        resp = _call_llm(_render_prompt(spec_fn, client_fn), config, limiter, provider)
+        return {key: _cache_entry(resp, config.llm)}
+
+    ids = {f"p{i}": key for i, key in enumerate(group, 1)}
+    prompt = render_compare_functions_packed([
+        {
+            "id": pair_id,
+            "spec_name": group[key][0].name,
+            "spec_source": group[key][0].source,
+            "client_name": group[key][1].name,
+            "client_source": group[key][1].source,
+        }
+        for pair_id, key in ids.items()
+    ])
+    resp = _call_llm(prompt, config, limiter, provider)
+    packed = _cache_entry(resp, config.llm, share=len(group))
+    results = {
+        key: CacheEntry(
+            value=raw,
+            provider=packed.provider,
+            model=packed.model,
+            input_tokens=packed.input_tokens,
+            output_tokens=packed.output_tokens,
+            latency_ms=packed.latency_ms,
+        )
+        for key, raw in _split_packed_response(resp.text, ids).items()
+    }
+    for key, (spec_fn, client_fn) in group.items():
+        if key not in results:
+            logger.warning("Packed response omitted %s; comparing it alone", spec_fn.name)
+            single = _call_llm(_render_prompt(spec_fn, client_fn), config, limiter, provider)
+            results[key] = _cache_entry(single, config.llm)
+    return results
+
+
 def compare_function_pair(
     spec_fn: SpecFunction,
     client_fn: ClientFunction,
     config: Config,
     cache: Cache | None = None,
+    provider: LLMProvider | None = None,
 ) -> list[Finding]:
     """Compare a single spec function against its client implementation."""
-    key = _cache_key(spec_fn.source, client_fn.source)
+    key = _cache_key(spec_fn.source, client_fn.source, config.llm)
 
     if cache:
         cached = cache.get(key)
         if cached is not None:
             return _parse_findings_json(cached, spec_fn, client_fn)
 
-    prompt = render_compare_function(
-        spec_source=spec_fn.source,
-        client_source=client_fn.source,
-        spec_name=spec_fn.name,
-        client_name=client_fn.name,
-    )
-
-    raw = _call_llm(prompt, config)
+    resp = _call_llm(_render_prompt(spec_fn, client_fn), config, provider=provider)
 
     if cache:
-        cache.set(key, raw)
+        cache.set(key, _cache_entry(resp, config.llm))
 
-    return _parse_findings_json(raw, spec_fn, client_fn)
+    return _parse_findings_json(resp.text, spec_fn, client_fn)
 
 
 def compare_all(
     pairs: list[tuple[SpecFunction, ClientFunction]],
     config: Config,
 ) -> list[Finding]:
-    """Compare all matched function pairs."""
-    cache = Cache(config.cache.db_path)
-    all_findings: list[Finding] = []
+    """Compare all matched function pairs.
+
+    Cache lookups happen up front; only the misses are sent to the LLM, with at
+    most ``config.llm.concurrency`` requests in flight (fewer while the provider
+    is throttling). Small pairs are packed into shared requests when
+    ``llm.pack_token_budget`` is set. Findings are returned in pair order
+    regardless of completion order.
+    """
+    cache = open_cache(config.cache)
+    limiter = RateLimiter(
+        config.llm.concurrency,
+        config.llm.requests_per_minute,
+        config.llm.tokens_per_minute,
+    )
+    keys = [_cache_key(spec_fn.source, client_fn.source, config.llm) for spec_fn, client_fn in pairs]
+    responses: dict[str, str] = {}
     try:
-        for spec_fn, client_fn in pairs:
-            logger.info("Comparing %s <-> %s", spec_fn.name, client_fn.name)
-            findings = compare_function_pair(spec_fn, client_fn, config, cache)
-            all_findings.extend(findings)
+        responses.update(cache.get_many(keys))
+        # Several pairs can share a key (same sources); compare each once.
+        misses: dict[str, tuple[SpecFunction, ClientFunction]] = {}
+        for key, pair in zip(keys, pairs):
+            if key not in responses:
+                misses.setdefault(key, pair)
+        logger.info("%d cached, %d to compare", len(responses), len(misses))
+
+        if misses:
+            workers = max(1, config.llm.concurrency)
+            with get_provider(config.llm) as provider, ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = []
+                for group in _pack_pairs(misses, config):
+                    for spec_fn, client_fn in group.values():
+                        logger.info("Comparing %s <-> %s", spec_fn.name, client_fn.name)
+                    futures.append(pool.submit(_compare_group, group, config, limiter, provider))
+                try:
+                    for future in as_completed(futures):
+                        results = future.result()
+                        cache.set_many(results)
+                        responses.update((key, entry.value) for key, entry in results.items())
+                except BaseException:
+                    for future in futures:
+                        future.cancel()
+                    raise
+            logger.info("LLM usage: %s", provider.usage.summary())
+        if config.cache.max_size_mb is not None or config.cache.max_age_days is not None:
+            removed = cache.prune(config.cache.max_size_mb, config.cache.max_age_days)
+            if removed:
+                logger.info("Evicted %d cache entries", removed)
     finally:
         cache.close()
+
+    all_findings: list[Finding] = []
+    for key, (spec_fn, client_fn) in zip(keys, pairs):
+        all_findings.extend(_parse_findings_json(responses[key], spec_fn, client_fn))
     return all_findings
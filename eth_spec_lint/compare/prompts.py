@@ -2,6 +2,9 @@
 
 from __future__ import annotations
 
+import hashlib
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 
 from jinja2 import Environment, FileSystemLoader
@@ -16,14 +19,54 @@ def _get_env() -> Environment:
     )
 
 
-def render_compare_function(spec_source: str, client_source: str, spec_name: str, client_name: str) -> str:
+@lru_cache(maxsize=None)
+def template_hash(*names: str) -> str:
+    """Content hash of the named templates, so edited prompts invalidate cached results."""
+    digest = hashlib.sha256()
+    for name in names:
+        digest.update(name.encode())
+        digest.update((_PROMPTS_DIR / name).read_bytes())
+    return digest.hexdigest()
+
+
+@dataclass
+class Prompt:
+    """A prompt split into a static instruction prefix and a per-request part.
+
+    ``system`` is identical across requests so providers can cache it;
+    ``user`` carries the spec/client sources.
+    """
+    system: str
+    user: str
+
+    def __len__(self) -> int:
+        return len(self.system) + len(self.user)
+
+
+def render_compare_function(spec_source: str, client_source: str, spec_name: str, client_name: str) -> Prompt:
     env = _get_env()
     tmpl = env.get_template("compare_function.j2")
-    return tmpl.render(
-        spec_source=spec_source,
-        client_source=client_source,
-        spec_name=spec_name,
-        client_name=client_name,
+    return Prompt(
+        system=env.get_template("compare_function_system.j2").render(),
+        user=tmpl.render(
+            spec_source=spec_source,
+            client_source=client_source,
+            spec_name=spec_name,
+            client_name=client_name,
+        ),
+    )
+
+
+def render_compare_functions_packed(pairs: list[dict[str, str]]) -> Prompt:
+    """Render several function pairs into one request.
+
+    Each item in ``pairs`` needs ``id``, ``spec_name``, ``spec_source``,
+    ``client_name`` and ``client_source``. Shares the single-pair system prefix.
+    """
+    env = _get_env()
+    return Prompt(
+        system=env.get_template("compare_function_system.j2").render(),
+        user=env.get_template("compare_functions_packed.j2").render(pairs=pairs),
     )
 
 
@@ -0,0 +1,312 @@
+"""LLM provider sessions used by the comparison engine."""
+
+from __future__ import annotations
+
+import itertools
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+
+from ..config import LLMConfig
+from .prompts import Prompt
+
+MAX_TOKENS = 2048
+
+
+@dataclass
+class LLMResponse:
+    text: str
+    headers: Mapping[str, str] = field(default_factory=dict)
+    input_tokens: int = 0
+    output_tokens: int = 0
+    # Prompt-prefix cache usage reported by the provider
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+    latency_ms: float = 0.0
+
+
+class UsageStats:
+    """Thread-safe running totals of token usage for one provider session."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cache_read_tokens = 0
+        self.cache_write_tokens = 0
+
+    def add(self, resp: LLMResponse) -> None:
+        with self._lock:
+            self.requests += 1
+            self.input_tokens += resp.input_tokens
+            self.output_tokens += resp.output_tokens
+            self.cache_read_tokens += resp.cache_read_tokens
+            self.cache_write_tokens += resp.cache_write_tokens
+
+    def summary(self) -> str:
+        return (
+            f"{self.requests} requests, {self.input_tokens} input tokens "
+            f"({self.cache_read_tokens} read from prompt cache, {self.cache_write_tokens} written), "
+            f"{self.output_tokens} output tokens"
+        )
+
+
+class LLMProvider(ABC):
+    """A long-lived session with an LLM provider.
+
+    Implementations own their SDK client and its HTTP connection pool, so a
+    single instance should be reused for every comparison in a run and closed
+    at the end.
+    """
+
+    def __init__(self, config: LLMConfig) -> None:
+        self.config = config
+        self.usage = UsageStats()
+
+    @abstractmethod
+    def complete(self, prompt: Prompt) -> LLMResponse:
+        """Send a single prompt and return the response text, headers and usage."""
+        ...
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> LLMProvider:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+class BatchProvider(LLMProvider):
+    """A provider that also offers an asynchronous batch API."""
+
+    # Requests per submitted batch
+    max_batch_size: int
+
+    @abstractmethod
+    def submit_batch(self, prompts: dict[str, Prompt]) -> str:
+        """Submit ``custom_id -> prompt`` as one asynchronous batch; return its ID."""
+        ...
+
+    @abstractmethod
+    def batch_done(self, batch_id: str) -> bool:
+        """Whether the batch has finished processing (successfully or not)."""
+        ...
+
+    @abstractmethod
+    def batch_results(self, batch_id: str) -> dict[str, LLMResponse]:
+        """Return ``custom_id -> response`` for the requests that succeeded."""
+        ...
+
+
+def _pool_limits(concurrency: int):
+    import httpx
+
+    size = max(1, concurrency)
+    return httpx.Limits(max_connections=size, max_keepalive_connections=size)
+
+
+class AnthropicProvider(BatchProvider):
+    max_batch_size = 10_000
+
+    def __init__(self, config: LLMConfig) -> None:
+        super().__init__(config)
+        import anthropic
+
+        # Retries are handled by the engine so they are visible to the shared limiter
+        self._client = anthropic.Anthropic(
+            max_retries=0,
+            http_client=anthropic.DefaultHttpxClient(limits=_pool_limits(config.concurrency)),
+        )
+
+    def _params(self, prompt: Prompt) -> dict:
+        return {
+            "model": self.config.model,
+            "max_tokens": MAX_TOKENS,
+            "temperature": self.config.temperature,
+            # The instruction block is identical for every pair; mark it cacheable
+            "system": [
+                {"type": "text", "text": prompt.system, "cache_control": {"type": "ephemeral"}},
+            ],
+            "messages": [{"role": "user", "content": prompt.user}],
+        }
+
+    def complete(self, prompt: Prompt) -> LLMResponse:
+        raw = self._client.messages.with_raw_response.create(**self._params(prompt))
+        return self._response(raw.parse(), raw.headers)
+
+    def submit_batch(self, prompts: dict[str, Prompt]) -> str:
+        batch = self._client.messages.batches.create(requests=[
+            {"custom_id": custom_id, "params": self._params(prompt)}
+            for custom_id, prompt in prompts.items()
+        ])
+        return batch.id
+
+    def batch_done(self, batch_id: str) -> bool:
+        return self._client.messages.batches.retrieve(batch_id).processing_status == "ended"
+
+    def _response(self, message, headers: Mapping[str, str] | None = None) -> LLMResponse:
+        usage = message.usage
+        return LLMResponse(
+            text=message.content[0].text,
+            headers=headers or {},
+            input_tokens=usage.input_tokens,
+            output_tokens=usage.output_tokens,
+            cache_read_tokens=usage.cache_read_input_tokens or 0,
+            cache_write_tokens=usage.cache_creation_input_tokens or 0,
+        )
+
+    def batch_results(self, batch_id: str) -> dict[str, LLMResponse]:
+        results: dict[str, LLMResponse] = {}
+        for entry in self._client.messages.batches.results(batch_id):
+            if entry.result.type == "succeeded":
+                results[entry.custom_id] = self._response(entry.result.message)
+        return results
+
+    def close(self) -> None:
+        self._client.close()
+
+
+class OpenAIProvider(BatchProvider):
+    max_batch_size = 10_000
+    _BATCH_ENDPOINT = "/v1/chat/completions"
+
+    def __init__(self, config: LLMConfig) -> None:
+        super().__init__(config)
+        import openai
+
+        self._client = openai.OpenAI(
+            max_retries=0,
+            http_client=openai.DefaultHttpxClient(limits=_pool_limits(config.concurrency)),
+        )
+
+    def _params(self, prompt: Prompt) -> dict:
+        # OpenAI caches shared prompt prefixes automatically; keep the static
+        # instructions first so every request shares them.
+        return {
+            "model": self.config.model,
+            "temperature": self.config.temperature,
+            "messages": [
+                {"role": "system", "content": prompt.system},
+                {"role": "user", "content": prompt.user},
+            ],
+        }
+
+    def complete(self, prompt: Prompt) -> LLMResponse:
+        raw = self._client.chat.completions.with_raw_response.create(**self._params(prompt))
+        resp = raw.parse().model_dump()
+        return self._response(resp, raw.headers)
+
+    def _response(self, body: dict, headers: Mapping[str, str] | None = None) -> LLMResponse:
+        usage = body.get("usage") or {}
+        details = usage.get("prompt_tokens_details") or {}
+        return LLMResponse(
+            text=body["choices"][0]["message"]["content"] or "",
+            headers=headers or {},
+            input_tokens=usage.get("prompt_tokens") or 0,
+            output_tokens=usage.get("completion_tokens") or 0,
+            cache_read_tokens=details.get("cached_tokens") or 0,
+        )
+
+    def submit_batch(self, prompts: dict[str, Prompt]) -> str:
+        lines = [
+            json.dumps({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": self._BATCH_ENDPOINT,
+                "body": self._params(prompt),
+            })
+            for custom_id, prompt in prompts.items()
+        ]
+        upload = self._client.files.create(
+            file=("eth-spec-lint-batch.jsonl", "\n".join(lines).encode()),
+            purpose="batch",
+        )
+        batch = self._client.batches.create(
+            input_file_id=upload.id,
+            endpoint=self._BATCH_ENDPOINT,
+            completion_window="24h",
+        )
+        return batch.id
+
+    def batch_done(self, batch_id: str) -> bool:
+        status = self._client.batches.retrieve(batch_id).status
+        return status in ("completed", "failed", "expired", "cancelled")
+
+    def batch_results(self, batch_id: str) -> dict[str, LLMResponse]:
+        batch = self._client.batches.retrieve(batch_id)
+        if not batch.output_file_id:
+            return {}
+        results: dict[str, LLMResponse] = {}
+        for line in self._client.files.content(batch.output_file_id).text.splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            response = entry.get("response") or {}
+            if response.get("status_code") == 200:
+                results[entry["custom_id"]] = self._response(response["body"])
+        return results
+
+    def close(self) -> None:
+        self._client.close()
+
+
+class StubProvider(BatchProvider):
+    """Offline provider that answers every prompt with a fixed response.
+
+    Useful for benchmarking the pipeline without network access or API cost;
+    ``latency`` simulates per-request round-trip time in seconds. Batches
+    complete immediately and only live as long as the instance.
+    """
+
+    max_batch_size = 1_000
+    _batch_ids = itertools.count(1)
+
+    def __init__(self, config: LLMConfig, response: str = "[]", latency: float = 0.0) -> None:
+        super().__init__(config)
+        self.response = response
+        self.latency = latency
+        self.calls = 0
+        self._batches: dict[str, list[str]] = {}
+
+    def complete(self, prompt: Prompt) -> LLMResponse:
+        if self.latency:
+            time.sleep(self.latency)
+        self.calls += 1
+        return LLMResponse(
+            text=self.response,
+            input_tokens=len(prompt) // 4,
+            output_tokens=len(self.response) // 4,
+        )
+
+    def submit_batch(self, prompts: dict[str, Prompt]) -> str:
+        batch_id = f"stub-batch-{next(self._batch_ids)}"
+        self._batches[batch_id] = list(prompts)
+        return batch_id
+
+    def batch_done(self, batch_id: str) -> bool:
+        return True
+
+    def batch_results(self, batch_id: str) -> dict[str, LLMResponse]:
+        return {custom_id: LLMResponse(text=self.response) for custom_id in self._batches.get(batch_id, [])}
+
+
+# Provider name (``llm.provider``) -> implementation
+PROVIDERS: dict[str, type[LLMProvider]] = {
+    "anthropic": AnthropicProvider,
+    "openai": OpenAIProvider,
+    "stub": StubProvider,
+}
+
+
+def get_provider(config: LLMConfig) -> LLMProvider:
+    try:
+        cls = PROVIDERS[config.provider]
+    except KeyError:
+        raise ValueError(f"Unknown LLM provider: {config.provider}") from None
+    return cls(config)
@@ -0,0 +1,260 @@
+"""Adaptive rate limiting and retry backoff for LLM provider calls."""
+
+from __future__ import annotations
+
+import random
+import re
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Mapping
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+# Status codes worth retrying: timeouts, lock conflicts, throttling, overload, 5xx
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+# Status codes that mean "slow down" rather than "something broke"
+THROTTLE_STATUS = {429, 529}
+
+WINDOW_SECONDS = 60.0
+
+# Anthropic and OpenAI name their rate-limit headers differently
+_REMAINING_HEADERS = {
+    "requests": ("anthropic-ratelimit-requests-remaining", "x-ratelimit-remaining-requests"),
+    "tokens": ("anthropic-ratelimit-tokens-remaining", "x-ratelimit-remaining-tokens"),
+}
+_RESET_HEADERS = {
+    "requests": ("anthropic-ratelimit-requests-reset", "x-ratelimit-reset-requests"),
+    "tokens": ("anthropic-ratelimit-tokens-reset", "x-ratelimit-reset-tokens"),
+}
+_LIMIT_HEADERS = {
+    "requests": ("anthropic-ratelimit-requests-limit", "x-ratelimit-limit-requests"),
+    "tokens": ("anthropic-ratelimit-tokens-limit", "x-ratelimit-limit-tokens"),
+}
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+
+def backoff_delay(
+    attempt: int,
+    retry_after: float | None = None,
+    base: float = 1.0,
+    cap: float = 60.0,
+) -> float:
+    """Seconds to wait before retry number ``attempt`` (0-based).
+
+    Uses full-jitter exponential backoff. A server-provided ``retry_after`` is
+    treated as a floor, with a little jitter so that concurrent workers do not
+    all retry in the same instant.
+    """
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    if retry_after is not None:
+        delay = retry_after + random.uniform(0, base)
+    return delay
+
+
+def _parse_duration(value: str) -> float | None:
+    """Parse an OpenAI-style duration such as ``1s``, ``6m0s`` or ``20ms``."""
+    parts = _DURATION_RE.findall(value)
+    if not parts or "".join(n + u for n, u in parts) != value.strip():
+        return None
+    return sum(float(n) * _DURATION_UNITS[u] for n, u in parts)
+
+
+def _parse_reset(value: str) -> float | None:
+    """Seconds until a reset header value (duration, seconds, or RFC 3339 time)."""
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    if (duration := _parse_duration(value)) is not None:
+        return duration
+    try:
+        reset_at = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return max(0.0, (reset_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def _header(headers: Mapping[str, str], names: tuple[str, ...]) -> str | None:
+    for name in names:
+        value = headers.get(name)
+        if value is not None:
+            return value
+    return None
+
+
+def retry_after_seconds(headers: Mapping[str, str]) -> float | None:
+    """Read ``retry-after-ms`` / ``retry-after`` (seconds or HTTP date)."""
+    if (ms := headers.get("retry-after-ms")) is not None:
+        try:
+            return max(0.0, float(ms) / 1000)
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def error_status(exc: BaseException) -> int | None:
+    status = getattr(exc, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def error_headers(exc: BaseException) -> Mapping[str, str]:
+    response = getattr(exc, "response", None)
+    return getattr(response, "headers", None) or {}
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Whether a provider SDK exception is transient."""
+    status = error_status(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    # anthropic/openai both raise APIConnectionError (and its APITimeoutError
+    # subclass) for network failures; match by name to avoid importing either SDK.
+    return any(cls.__name__ == "APIConnectionError" for cls in type(exc).__mro__)
+
+
+def is_throttle(exc: BaseException) -> bool:
+    return error_status(exc) in THROTTLE_STATUS
+
+
+class RateLimiter:
+    """Shared admission control for concurrent provider calls.
+
+    Enforces optional requests/tokens-per-minute budgets over a sliding window
+    and an adaptive in-flight limit: throttling responses halve the limit and
+    pause new requests, and each run of successful requests raises it by one,
+    up to ``max_concurrency``. Rate-limit headers from successful responses are
+    used to learn the account's budgets and to pause before the provider
+    starts rejecting requests.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        requests_per_minute: int | None = None,
+        tokens_per_minute: int | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_concurrency = max(1, max_concurrency)
+        self.limit = self.max_concurrency
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._window: deque[list[float]] = deque()  # [dispatch time, tokens]
+        self._window_tokens = 0.0
+        self._blocked_until = 0.0
+        self._last_decrease = float("-inf")
+        self._streak = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _expire(self, now: float) -> None:
+        while self._window and self._window[0][0] <= now - WINDOW_SECONDS:
+            _, tokens = self._window.popleft()
+            self._window_tokens -= tokens
+
+    def _wait_time(self, now: float, tokens: int) -> float:
+        wait = self._blocked_until - now
+        if self.requests_per_minute and len(self._window) >= self.requests_per_minute:
+            wait = max(wait, self._window[0][0] + WINDOW_SECONDS - now)
+        if self.tokens_per_minute and self._window:
+            excess = self._window_tokens + tokens - self.tokens_per_minute
+            for started, used in self._window:
+                if excess <= 0:
+                    break
+                excess -= used
+                wait = max(wait, started + WINDOW_SECONDS - now)
+        return wait
+
+    def acquire(self, tokens: int = 0) -> list[float]:
+        """Block until a request estimated at ``tokens`` may be sent.
+
+        Returns a ticket to hand back to :meth:`release`.
+        """
+        with self._cond:
+            while True:
+                now = self._clock()
+                self._expire(now)
+                wait = self._wait_time(now, tokens)
+                if wait <= 0 and self._in_flight < self.limit:
+                    break
+                self._cond.wait(timeout=wait if wait > 0 else None)
+            self._in_flight += 1
+            ticket = [now, float(tokens)]
+            self._window.append(ticket)
+            self._window_tokens += tokens
+            return ticket
+
+    def release(
+        self,
+        ticket: list[float],
+        *,
+        tokens: int | None = None,
+        headers: Mapping[str, str] | None = None,
+        throttled: bool = False,
+        retry_after: float | None = None,
+    ) -> None:
+        """Return an in-flight slot, recording the outcome of the request."""
+        with self._cond:
+            now = self._clock()
+            self._expire(now)
+            self._in_flight -= 1
+            if tokens is not None:
+                if ticket[0] > now - WINDOW_SECONDS:
+                    self._window_tokens += tokens - ticket[1]
+                ticket[1] = float(tokens)
+            if throttled:
+                self._on_throttle(ticket, now, retry_after)
+            else:
+                self._on_success()
+            if headers:
+                self._apply_headers(headers, now)
+            self._cond.notify_all()
+
+    def _on_throttle(self, ticket: list[float], now: float, retry_after: float | None) -> None:
+        self._streak = 0
+        # Requests dispatched before the last decrease were sent under the old
+        # limit; their throttles should not shrink the limit a second time.
+        if ticket[0] > self._last_decrease:
+            self.limit = max(1, self.limit // 2)
+            self._last_decrease = now
+        if retry_after is not None:
+            self._blocked_until = max(self._blocked_until, now + retry_after)
+
+    def _on_success(self) -> None:
+        self._streak += 1
+        if self._streak >= self.limit and self.limit < self.max_concurrency:
+            self.limit += 1
+            self._streak = 0
+
+    def _apply_headers(self, headers: Mapping[str, str], now: float) -> None:
+        for kind in ("requests", "tokens"):
+            limit = _header(headers, _LIMIT_HEADERS[kind])
+            if limit is not None and limit.isdigit():
+                if kind == "requests" and self.requests_per_minute is None:
+                    self.requests_per_minute = int(limit)
+                elif kind == "tokens" and self.tokens_per_minute is None:
+                    self.tokens_per_minute = int(limit)
+            remaining = _header(headers, _REMAINING_HEADERS[kind])
+            reset = _header(headers, _RESET_HEADERS[kind])
+            if remaining is not None and remaining.strip() == "0" and reset is not None:
+                if (seconds := _parse_reset(reset)) is not None:
+                    self._blocked_until = max(self._blocked_until, now + seconds)
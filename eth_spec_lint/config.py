@@ -28,6 +28,7 @@ class ClientConfig:
             "packages/state-transition/src/**/*.ts",
         ]
     )
+    prefilter: bool = True
 
 
 @dataclass
@@ -36,16 +37,36 @@ class LLMConfig:
     model: str = "claude-sonnet-4-20250514"
     concurrency: int = 4
     temperature: float = 0.0
+    max_retries: int = 6
+    requests_per_minute: int | None = None
+    tokens_per_minute: int | None = None
+    batch_poll_interval: float = 60.0
+    pack_token_budget: int = 0
+    pack_max_pair_tokens: int = 300
 
 
 @dataclass
 class CacheConfig:
+    backend: str = "sqlite"
     db_path: str = ".eth-spec-lint-cache.db"
+    dir_path: str = ".eth-spec-lint-cache"
+    max_size_mb: float | None = None
+    max_age_days: float | None = None
+
+
+@dataclass
+class IndexConfig:
+    path: str | None = ".eth-spec-lint-index.db"
 
 
 @dataclass
 class MappingConfig:
     overrides_file: str | None = None
+    fuzzy_threshold: float | None = None
+    embedder: str | None = None
+    embedding_model: str | None = None
+    semantic_top_k: int = 5
+    semantic_min_score: float = 0.3
 
 
 @dataclass
@@ -60,6 +81,7 @@ class Config:
     client: ClientConfig = field(default_factory=ClientConfig)
     llm: LLMConfig = field(default_factory=LLMConfig)
     cache: CacheConfig = field(default_factory=CacheConfig)
+    index: IndexConfig = field(default_factory=IndexConfig)
     mapping: MappingConfig = field(default_factory=MappingConfig)
     report: ReportConfig = field(default_factory=ReportConfig)
 
@@ -93,6 +115,7 @@ def load_config(path: str | Path | None = None) -> Config:
         client=_build_dataclass(ClientConfig, raw.get("client")),
         llm=_build_dataclass(LLMConfig, raw.get("llm")),
         cache=_build_dataclass(CacheConfig, raw.get("cache")),
+        index=_build_dataclass(IndexConfig, raw.get("index")),
         mapping=_build_dataclass(MappingConfig, raw.get("mapping")),
         report=_build_dataclass(ReportConfig, raw.get("report")),
     )
@@ -0,0 +1,186 @@
+"""Persistent per-file index of parsed records, for incremental re-parsing."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import zlib
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from .sqlite_query import select_in
+
+
+class FileIndex:
+    """SQLite store of per-file parse results.
+
+    Entries are keyed by ``(namespace, path)`` and validated in two steps: an
+    unchanged mtime and size is trusted without reading the file; otherwise
+    the file is read and its SHA-256 compared, so a touched-but-identical file
+    still hits. ``version`` should change whenever the extraction logic does,
+    which invalidates every entry in the namespace. Payloads are any
+    JSON-serializable value, stored zlib-compressed.
+
+    Each entry may also carry named reference sets (e.g. the names a file
+    defines, or the files it imports), queried in either direction with
+    :meth:`refs_of` and :meth:`referrers` without decoding any payloads.
+    """
+
+    def __init__(self, db_path: str | Path, namespace: str, version: str) -> None:
+        self.namespace = namespace
+        self.version = version
+        self._conn = sqlite3.connect(str(db_path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " namespace TEXT NOT NULL, path TEXT NOT NULL, version TEXT NOT NULL,"
+            " mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL, sha256 TEXT NOT NULL,"
+            " payload BLOB NOT NULL, PRIMARY KEY (namespace, path))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS refs ("
+            " namespace TEXT NOT NULL, path TEXT NOT NULL, kind TEXT NOT NULL, ref TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS refs_by_ref ON refs (namespace, kind, ref)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS refs_by_path ON refs (namespace, path)")
+        self._conn.commit()
+        # Stat and digest captured by get() for the following put()
+        self._seen: dict[str, tuple[int, int, str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: str | Path) -> tuple[Any | None, bytes | None]:
+        """Return ``(payload, None)`` on a hit, or ``(None, file_bytes)`` on a miss.
+
+        The bytes returned on a miss are what the caller should parse and then
+        pass to :meth:`put`, so the file is never read twice.
+        """
+        key = str(path)
+        st = Path(path).stat()
+        row = self._conn.execute(
+            "SELECT version, mtime_ns, size, sha256, payload FROM files WHERE namespace = ? AND path = ?",
+            (self.namespace, key),
+        ).fetchone()
+        if row and row[0] == self.version and row[1] == st.st_mtime_ns and row[2] == st.st_size:
+            self.hits += 1
+            return self._decode(row[4]), None
+
+        data = Path(path).read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        self._seen[key] = (st.st_mtime_ns, st.st_size, digest)
+        if row and row[0] == self.version and row[3] == digest:
+            # Content unchanged (e.g. fresh checkout); refresh the stat fast path
+            self._conn.execute(
+                "UPDATE files SET mtime_ns = ?, size = ? WHERE namespace = ? AND path = ?",
+                (st.st_mtime_ns, st.st_size, self.namespace, key),
+            )
+            self.hits += 1
+            return self._decode(row[4]), None
+        self.misses += 1
+        return None, data
+
+    def is_current(self, path: str | Path) -> bool:
+        """Whether ``path`` has an entry of this version for its current content.
+
+        Checked like :meth:`get` (stat first, then SHA-256), without decoding
+        the payload or counting a hit or miss.
+        """
+        row = self._conn.execute(
+            "SELECT version, mtime_ns, size, sha256 FROM files WHERE namespace = ? AND path = ?",
+            (self.namespace, str(path)),
+        ).fetchone()
+        if not row or row[0] != self.version:
+            return False
+        st = Path(path).stat()
+        if row[1] == st.st_mtime_ns and row[2] == st.st_size:
+            return True
+        return hashlib.sha256(Path(path).read_bytes()).hexdigest() == row[3]
+
+    def __len__(self) -> int:
+        """Number of current-version entries in this namespace."""
+        (count,) = self._conn.execute(
+            "SELECT COUNT(*) FROM files WHERE namespace = ? AND version = ?", (self.namespace, self.version),
+        ).fetchone()
+        return count
+
+    def put(
+        self,
+        path: str | Path,
+        data: bytes,
+        payload: Any,
+        refs: dict[str, Iterable[str]] | None = None,
+    ) -> None:
+        """Store ``payload`` as the parse result of ``data`` read from ``path``.
+
+        ``refs`` maps a reference kind to the references of this file,
+        replacing whatever was recorded for it before.
+        """
+        key = str(path)
+        seen = self._seen.pop(key, None)
+        if seen is None:
+            st = Path(path).stat()
+            seen = (st.st_mtime_ns, st.st_size, hashlib.sha256(data).hexdigest())
+        self._conn.execute(
+            "INSERT OR REPLACE INTO files (namespace, path, version, mtime_ns, size, sha256, payload)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (self.namespace, key, self.version, *seen, self._encode(payload)),
+        )
+        self._conn.execute("DELETE FROM refs WHERE namespace = ? AND path = ?", (self.namespace, key))
+        self._conn.executemany(
+            "INSERT INTO refs (namespace, path, kind, ref) VALUES (?, ?, ?, ?)",
+            [(self.namespace, key, kind, ref) for kind, values in (refs or {}).items() for ref in set(values)],
+        )
+
+    def refs_of(self, paths: Iterable[str | Path], kind: str) -> set[str]:
+        """References of ``kind`` recorded for any of ``paths``."""
+        return self._select("SELECT ref FROM refs WHERE namespace = ? AND kind = ? AND path", paths, kind)
+
+    def all_refs(self, kind: str) -> set[str]:
+        """Every reference of ``kind`` recorded in this namespace."""
+        rows = self._conn.execute(
+            "SELECT DISTINCT ref FROM refs WHERE namespace = ? AND kind = ?", (self.namespace, kind),
+        )
+        return {ref for (ref,) in rows}
+
+    def referrers(self, refs: Iterable[str], kind: str) -> set[str]:
+        """Paths that recorded any of ``refs`` as a reference of ``kind``."""
+        return self._select("SELECT path FROM refs WHERE namespace = ? AND kind = ? AND ref", refs, kind)
+
+    def _select(self, query: str, values: Iterable[str | Path], kind: str) -> set[str]:
+        rows = select_in(self._conn, query, [str(v) for v in values], (self.namespace, kind))
+        return {value for (value,) in rows}
+
+    def retain(self, paths: Iterable[str | Path]) -> None:
+        """Drop entries for files in this namespace that are not in ``paths``."""
+        keep = {str(p) for p in paths}
+        stale = [
+            (self.namespace, path)
+            for (path,) in self._conn.execute("SELECT path FROM files WHERE namespace = ?", (self.namespace,))
+            if path not in keep
+        ]
+        self._conn.executemany("DELETE FROM files WHERE namespace = ? AND path = ?", stale)
+        self._conn.executemany("DELETE FROM refs WHERE namespace = ? AND path = ?", stale)
+
+    @staticmethod
+    def _encode(payload: Any) -> bytes:
+        return zlib.compress(json.dumps(payload, separators=(",", ":")).encode())
+
+    @staticmethod
+    def _decode(blob: bytes) -> Any:
+        return json.loads(zlib.decompress(blob))
+
+    def commit(self) -> None:
+        """Write pending changes, releasing the database for other connections."""
+        self._conn.commit()
+
+    def close(self) -> None:
+        self.commit()
+        self._conn.close()
+
+    def __enter__(self) -> FileIndex:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
@@ -0,0 +1,33 @@
+"""Process-pool helper for CPU-bound parsing."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from typing import TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def parallel_map(
+    fn: Callable[[T], R],
+    items: list[T],
+    jobs: int = 1,
+    initializer: Callable[[], None] | None = None,
+) -> list[R]:
+    """``list(map(fn, items))``, sharded across ``jobs`` worker processes.
+
+    Results come back in input order. ``fn`` and ``initializer`` must be
+    module-level functions so they can be pickled; ``initializer`` runs once
+    per worker (or once in-process when running serially).
+    """
+    if jobs <= 1 or len(items) < 2:
+        if initializer is not None:
+            initializer()
+        return [fn(item) for item in items]
+    workers = min(jobs, len(items))
+    # A few chunks per worker amortizes IPC without leaving workers idle at the end
+    chunksize = max(1, len(items) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer) as pool:
+        return list(pool.map(fn, items, chunksize=chunksize))
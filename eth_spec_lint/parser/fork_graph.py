@@ -2,39 +2,284 @@
 
 from __future__ import annotations
 
+import ast
+import logging
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TypeVar
+
 from .models import SpecConstant, SpecContainer, SpecFunction
 
+logger = logging.getLogger(__name__)
+
 # Canonical fork ordering
 FORK_ORDER = ["phase0", "altair", "bellatrix", "capella", "deneb", "electra"]
 
+# Where consensus-specs declares fork inheritance (PREVIOUS_FORK_OF) and the
+# constants naming each fork
+_FORK_METADATA = Path("pysetup") / "md_doc_paths.py"
+_FORK_CONSTANTS = Path("pysetup") / "constants.py"
+
+R = TypeVar("R", SpecFunction, SpecConstant, SpecContainer)
+
+
+def _module_strings(tree: ast.Module) -> dict[str, str]:
+    """Top-level ``NAME = "value"`` assignments of a module."""
+    strings: dict[str, str] = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and isinstance(node.value, ast.Constant) and isinstance(node.value.value, str):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    strings[target.id] = node.value.value
+    return strings
+
 
-def _fork_index(fork: str) -> int:
+def read_fork_parents(repo_path: str | Path) -> dict[str, str | None] | None:
+    """``fork -> previous fork`` from a consensus-specs checkout, if declared.
+
+    Reads ``PREVIOUS_FORK_OF`` from ``pysetup/md_doc_paths.py`` statically
+    (the module is parsed, never executed). Returns None when the file or the
+    mapping is missing.
+    """
+    repo = Path(repo_path)
+    try:
+        tree = ast.parse((repo / _FORK_METADATA).read_text())
+    except (OSError, SyntaxError):
+        return None
+    names = _module_strings(tree)
     try:
-        return FORK_ORDER.index(fork)
-    except ValueError:
-        return len(FORK_ORDER)
+        names.update(_module_strings(ast.parse((repo / _FORK_CONSTANTS).read_text())))
+    except (OSError, SyntaxError):
+        pass
+
+    def _value(node: ast.expr) -> str | None:
+        if isinstance(node, ast.Constant):
+            return node.value if isinstance(node.value, str) else None
+        if isinstance(node, ast.Name):
+            return names.get(node.id, node.id.lower())
+        return None
+
+    for node in tree.body:
+        target = node.targets[0] if isinstance(node, ast.Assign) else getattr(node, "target", None)
+        if isinstance(target, ast.Name) and target.id == "PREVIOUS_FORK_OF" and isinstance(node.value, ast.Dict):
+            parents = {
+                fork: _value(value)
+                for key, value in zip(node.value.keys, node.value.values)
+                if key is not None and (fork := _value(key)) is not None
+            }
+            return parents or None
+    return None
+
+
+class ForkRegistry:
+    """Fork ordering and inheritance, computed once.
+
+    ``forks`` are the forks in use, in order; ``parents`` the inheritance
+    edges (any fork it leaves out inherits from the one before it). With
+    parents from consensus-specs metadata, forks are ranked by inheritance
+    depth so that feature forks (``eip7594`` on ``deneb``) slot in after
+    their parent, and inheritance may pass through forks not in use.
+    Forks seen in data but never registered rank after every known fork, in
+    name order, rather than in arbitrary order.
+    """
+
+    def __init__(self, forks: Iterable[str], parents: dict[str, str | None] | None = None) -> None:
+        forks = list(dict.fromkeys(forks))
+        # Config order gives the parent of any fork the metadata does not declare
+        parents = {fork: (forks[i - 1] if i else None) for i, fork in enumerate(forks)} | (parents or {})
+        self.parents: dict[str, str | None] = parents
+        position = {fork: i for i, fork in enumerate(forks)}
+        self.forks: list[str] = sorted(forks, key=lambda f: (self._depth(f), position[f]))
+        self.rank: dict[str, int] = {fork: i for i, fork in enumerate(self.forks)}
+
+    @classmethod
+    def from_config(cls, spec_config) -> ForkRegistry:
+        """Registry for ``spec.forks``, using the checkout's fork metadata when present."""
+        parents = read_fork_parents(spec_config.repo_path)
+        if parents is not None:
+            logger.debug("Fork inheritance from %s", Path(spec_config.repo_path) / _FORK_METADATA)
+        return cls(spec_config.forks, parents)
+
+    def _depth(self, fork: str) -> int:
+        depth, seen = 0, {fork}
+        while (fork := self.parents.get(fork)) is not None and fork not in seen:
+            seen.add(fork)
+            depth += 1
+        return depth
+
+    def rank_of(self, fork: str) -> tuple[int, str]:
+        """Sort key for ``fork``; unknown forks sort last, by name."""
+        rank = self.rank.get(fork)
+        return (rank, "") if rank is not None else (len(self.rank), fork)
+
+    def parent(self, fork: str) -> str | None:
+        return self.parents.get(fork)
+
+    def ancestors(self, fork: str) -> list[str]:
+        """``fork`` and every fork it inherits from, nearest first."""
+        chain: list[str] = []
+        current: str | None = fork
+        while current is not None and current not in chain:
+            chain.append(current)
+            current = self.parents.get(current)
+        return chain
+
+    def resolve(self, records: Iterable[R], forks: Iterable[str] | None = None) -> dict[str, R]:
+        """Latest definition of each name, in one bucketed pass.
+
+        Records are grouped by fork rank and applied in rank order, so later
+        forks replace earlier definitions (input order breaks ties). With
+        ``forks``, only records from those forks are considered.
+        """
+        allowed = set(forks) if forks is not None else None
+        buckets: dict[tuple[int, str], list[R]] = {}
+        for record in records:
+            if allowed is None or record.fork in allowed:
+                buckets.setdefault(self.rank_of(record.fork), []).append(record)
+        resolved: dict[str, R] = {}
+        for key in sorted(buckets):
+            for record in buckets[key]:
+                resolved[record.name] = record
+        return resolved
+
 
+# Registry for the default fork list, used when callers do not pass one
+DEFAULT_REGISTRY = ForkRegistry(FORK_ORDER)
 
-def resolve_functions(functions: list[SpecFunction]) -> dict[str, SpecFunction]:
+
+def resolve_functions(
+    functions: list[SpecFunction],
+    registry: ForkRegistry = DEFAULT_REGISTRY,
+) -> dict[str, SpecFunction]:
     """Resolve fork overrides: later forks replace earlier definitions.
 
     Returns a dict of function name -> latest SpecFunction.
     """
-    resolved: dict[str, SpecFunction] = {}
-    for fn in sorted(functions, key=lambda f: _fork_index(f.fork)):
-        resolved[fn.name] = fn
-    return resolved
+    return registry.resolve(functions)
+
+
+def resolve_constants(
+    constants: list[SpecConstant],
+    registry: ForkRegistry = DEFAULT_REGISTRY,
+) -> dict[str, SpecConstant]:
+    return registry.resolve(constants)
+
+
+def resolve_containers(
+    containers: list[SpecContainer],
+    registry: ForkRegistry = DEFAULT_REGISTRY,
+) -> dict[str, SpecContainer]:
+    return registry.resolve(containers)
+
+
+@dataclass(slots=True, frozen=True)
+class ForkVersion:
+    """One distinct definition of a spec function and the forks it is in effect for."""
+    function: SpecFunction
+    forks: tuple[str, ...]
+
+
+class ForkGraph:
+    """Per-fork view of spec function definitions.
+
+    Maps ``(name, fork)`` to the definition in effect at that fork: the one
+    the fork itself defines, or else the one inherited along the registry's
+    parent edges. Redefinitions whose source is identical to the inherited
+    one are not treated as changes, so :meth:`versions` lists each distinct
+    source once, along with the forks that use it.
+    """
+
+    def __init__(self, functions: Iterable[SpecFunction], registry: ForkRegistry = DEFAULT_REGISTRY) -> None:
+        self.registry = registry
+        self._defined: dict[str, dict[str, SpecFunction]] = {}
+        for fn in sorted(functions, key=lambda f: registry.rank_of(f.fork)):
+            self._defined.setdefault(fn.name, {})[fn.fork] = fn
 
+    def __len__(self) -> int:
+        return len(self._defined)
+
+    @property
+    def forks(self) -> list[str]:
+        return self.registry.forks
+
+    def names(self) -> list[str]:
+        return list(self._defined)
+
+    def definition(self, name: str, fork: str) -> SpecFunction | None:
+        """The definition of ``name`` in effect at ``fork``."""
+        defined = self._defined.get(name, {})
+        for ancestor in self.registry.ancestors(fork):
+            if ancestor in defined:
+                return defined[ancestor]
+        return None
+
+    def latest(self, name: str) -> SpecFunction:
+        return next(reversed(self._defined[name].values()))
+
+    def versions(self, name: str) -> list[ForkVersion]:
+        """Distinct definitions of ``name`` in fork order.
+
+        Definitions from forks outside the registry are ignored.
+        """
+        versions: list[tuple[SpecFunction, list[str]]] = []
+        for fork in self.forks:
+            fn = self.definition(name, fork)
+            if fn is None:
+                continue
+            if versions and versions[-1][0].source == fn.source:
+                versions[-1][1].append(fork)
+            else:
+                versions.append((fn, [fork]))
+        return [ForkVersion(fn, tuple(forks)) for fn, forks in versions]
+
+
+@dataclass(slots=True, frozen=True)
+class ForkState:
+    """Spec definitions in effect at one fork (or, with ``fork=None``, overall)."""
+    fork: str | None
+    functions: dict[str, SpecFunction] = field(default_factory=dict)
+    constants: dict[str, SpecConstant] = field(default_factory=dict)
+    containers: dict[str, SpecContainer] = field(default_factory=dict)
+
+
+class SpecView:
+    """Parsed spec entities with fork resolution done once and shared.
+
+    Built once per run from :func:`~.spec_parser.parse_spec_repo` output;
+    commands query :meth:`as_of` / :attr:`latest` and :attr:`graph` instead
+    of re-resolving the raw lists.
+    """
 
-def resolve_constants(constants: list[SpecConstant]) -> dict[str, SpecConstant]:
-    resolved: dict[str, SpecConstant] = {}
-    for c in sorted(constants, key=lambda c: _fork_index(c.fork)):
-        resolved[c.name] = c
-    return resolved
+    def __init__(
+        self,
+        functions: list[SpecFunction],
+        constants: list[SpecConstant],
+        containers: list[SpecContainer],
+        registry: ForkRegistry = DEFAULT_REGISTRY,
+    ) -> None:
+        self.registry = registry
+        self.functions = functions
+        self.constants = constants
+        self.containers = containers
+        self.graph = ForkGraph(functions, registry)
+        self._states: dict[str | None, ForkState] = {}
 
+    def as_of(self, fork: str | None = None) -> ForkState:
+        """Definitions in effect at ``fork``: its own plus everything inherited."""
+        state = self._states.get(fork)
+        if state is None:
+            forks = self.registry.ancestors(fork) if fork is not None else None
+            state = ForkState(
+                fork=fork,
+                functions=self.registry.resolve(self.functions, forks),
+                constants=self.registry.resolve(self.constants, forks),
+                containers=self.registry.resolve(self.containers, forks),
+            )
+            self._states[fork] = state
+        return state
 
-def resolve_containers(containers: list[SpecContainer]) -> dict[str, SpecContainer]:
-    resolved: dict[str, SpecContainer] = {}
-    for c in sorted(containers, key=lambda c: _fork_index(c.fork)):
-        resolved[c.name] = c
-    return resolved
+    @property
+    def latest(self) -> ForkState:
+        """Latest definition of every name across all parsed forks."""
+        return self.as_of(None)
@@ -2,22 +2,38 @@
 
 from __future__ import annotations
 
+import sys
 from dataclasses import dataclass, field
 from enum import Enum
 
 
-@dataclass
+def _intern_location(record: object) -> None:
+    """Share one copy of the fork/path strings repeated across many records."""
+    object.__setattr__(record, "fork", sys.intern(record.fork))
+    object.__setattr__(record, "file_path", sys.intern(record.file_path))
+
+
+@dataclass(slots=True, frozen=True)
 class SpecFunction:
     name: str
     source: str
-    args: list[str]
+    args: tuple[str, ...]
     return_type: str | None = None
     fork: str = ""
     file_path: str = ""
     line_number: int = 0
 
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "args", tuple(self.args))
+        _intern_location(self)
 
-@dataclass
+    @property
+    def end_line(self) -> int:
+        """Line of the definition's last source line (same numbering as ``line_number``)."""
+        return self.line_number + self.source.count("\n")
+
+
+@dataclass(slots=True, frozen=True)
 class SpecConstant:
     name: str
     value: str
@@ -25,17 +41,24 @@ class SpecConstant:
     file_path: str = ""
     line_number: int = 0
 
+    def __post_init__(self) -> None:
+        _intern_location(self)
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class SpecContainer:
     """SSZ container / dataclass from the spec."""
     name: str
-    fields: list[tuple[str, str]]  # (field_name, type_annotation)
+    fields: tuple[tuple[str, str], ...]  # (field_name, type_annotation)
     source: str = ""
     fork: str = ""
     file_path: str = ""
     line_number: int = 0
 
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "fields", tuple(tuple(f) for f in self.fields))
+        _intern_location(self)
+
 
 class Severity(str, Enum):
     ERROR = "error"
@@ -62,5 +85,6 @@ class Finding:
     spec_file: str = ""
     client_file: str = ""
     client_line: int = 0
+    spec_line: int = 0
     detail: str = ""
     confidence: float = 0.0
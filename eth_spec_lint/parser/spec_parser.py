@@ -3,24 +3,95 @@
 from __future__ import annotations
 
 import ast
+import io
 import re
+from collections.abc import Iterable, Iterator
 from pathlib import Path
+from typing import TYPE_CHECKING
 
+from ..parallel import parallel_map
 from .models import SpecConstant, SpecContainer, SpecFunction
 
-# Match fenced Python code blocks in spec markdown
-_CODE_BLOCK_RE = re.compile(
-    r"```python\s*\n(.*?)```", re.DOTALL
-)
+if TYPE_CHECKING:
+    from ..file_index import FileIndex
+
+# Bump whenever extraction output (or what is indexed with it) changes, to
+# invalidate parse index entries
+PARSER_VERSION = "4"
+
+# Opening code fence: ``` or ~~~ (3+), then an info string such as
+# "python", "python title=x" or "{.python}"
+_FENCE_OPEN_RE = re.compile(r"^(?P<indent>[ \t]*)(?P<fence>`{3,}|~{3,})(?P<info>.*)$")
+_FENCE_LANG_RE = re.compile(r"\s*\{?\s*\.?([\w+-]*)")
+
+
+def iter_code_blocks(lines: Iterable[str], language: str = "python") -> Iterator[tuple[str, int]]:
+    """Yield ``(block_text, start_line)`` for each fenced ``language`` block.
+
+    ``lines`` may be any line iterator (e.g. an open file), so only the block
+    being collected is held in memory. ``start_line`` is the 1-based line of
+    the block's first content line. Fences follow CommonMark: a block closes
+    on a fence of the same character at least as long as the opener (so a
+    ```` fence can contain ``` lines), fences of other languages are skipped
+    whole, content is dedented by the opener's indentation (fences inside
+    list items), and an unterminated block runs to the end of the input.
+    """
+    fence = ""
+    indent = 0
+    wanted = False
+    start = 0
+    block: list[str] = []
+    for lineno, line in enumerate(lines, 1):
+        if not fence:
+            m = _FENCE_OPEN_RE.match(line.rstrip("\r\n"))
+            if m is None or (m["fence"][0] == "`" and "`" in m["info"]):
+                continue
+            fence, indent = m["fence"], len(m["indent"])
+            wanted = _FENCE_LANG_RE.match(m["info"])[1].lower() == language
+            start, block = lineno + 1, []
+            continue
+        stripped = line.strip()
+        if stripped.startswith(fence) and not stripped.strip(fence[0]):
+            if wanted:
+                yield "".join(block), start
+            fence = ""
+            continue
+        if wanted:
+            # Drop at most the opening fence's indentation
+            width = len(line) - len(line.lstrip(" \t"))
+            block.append(line[min(width, indent):])
+    if fence and wanted:
+        yield "".join(block), start
 
 
 def extract_code_blocks(markdown: str) -> list[str]:
     """Return all fenced Python code blocks from a markdown string."""
-    return _CODE_BLOCK_RE.findall(markdown)
+    return [block for block, _ in iter_code_blocks(io.StringIO(markdown, newline=None))]
 
 
-def _parse_function(node: ast.FunctionDef, source_lines: list[str], fork: str, file_path: str) -> SpecFunction:
-    src = ast.get_source_segment("\n".join(source_lines), node) or ""
+def _split_lines(block: str) -> list[bytes]:
+    """UTF-8 lines of ``block`` with line endings kept, indexed like ``lineno - 1``."""
+    return block.encode().splitlines(keepends=True)
+
+
+def _segment(lines: list[bytes], node: ast.stmt) -> str:
+    """Source text of ``node``, sliced directly from the precomputed lines.
+
+    Equivalent to ``ast.get_source_segment`` but without re-splitting the
+    whole block for every node. AST column offsets are UTF-8 byte offsets,
+    hence the byte lines.
+    """
+    first, last = node.lineno - 1, node.end_lineno - 1
+    if first == last:
+        return lines[first][node.col_offset:node.end_col_offset].decode()
+    parts = [lines[first][node.col_offset:], *lines[first + 1:last], lines[last][:node.end_col_offset]]
+    return b"".join(parts).decode()
+
+
+def _parse_function(
+    node: ast.FunctionDef, lines: list[bytes], fork: str, file_path: str, line_offset: int,
+) -> SpecFunction:
+    src = _segment(lines, node)
     args = [a.arg for a in node.args.args]
     ret = None
     if node.returns:
@@ -32,11 +103,13 @@ def _parse_function(node: ast.FunctionDef, source_lines: list[str], fork: str, f
         return_type=ret,
         fork=fork,
         file_path=file_path,
-        line_number=node.lineno,
+        line_number=line_offset + node.lineno,
     )
 
 
-def _parse_container(node: ast.ClassDef, source_lines: list[str], fork: str, file_path: str) -> SpecContainer | None:
+def _parse_container(
+    node: ast.ClassDef, lines: list[bytes], fork: str, file_path: str, line_offset: int,
+) -> SpecContainer | None:
     """Parse a class that looks like an SSZ container (class with annotated fields)."""
     fields: list[tuple[str, str]] = []
     for item in node.body:
@@ -47,14 +120,14 @@ def _parse_container(node: ast.ClassDef, source_lines: list[str], fork: str, fil
     return SpecContainer(
         name=node.name,
         fields=fields,
-        source=ast.get_source_segment("\n".join(source_lines), node) or "",
+        source=_segment(lines, node),
         fork=fork,
         file_path=file_path,
-        line_number=node.lineno,
+        line_number=line_offset + node.lineno,
     )
 
 
-def _parse_constant(node: ast.Assign, source_lines: list[str], fork: str, file_path: str) -> list[SpecConstant]:
+def _parse_constant(node: ast.Assign, fork: str, file_path: str, line_offset: int) -> list[SpecConstant]:
     constants = []
     for target in node.targets:
         if isinstance(target, ast.Name) and target.id.isupper():
@@ -63,7 +136,7 @@ def _parse_constant(node: ast.Assign, source_lines: list[str], fork: str, file_p
                 value=ast.unparse(node.value),
                 fork=fork,
                 file_path=file_path,
-                line_number=node.lineno,
+                line_number=line_offset + node.lineno,
             ))
     return constants
 
@@ -73,43 +146,103 @@ def parse_spec_file(
     fork: str,
 ) -> tuple[list[SpecFunction], list[SpecConstant], list[SpecContainer]]:
     """Parse a single spec markdown file, returning extracted functions, constants, and containers."""
-    text = Path(file_path).read_text()
-    blocks = extract_code_blocks(text)
+    with open(file_path) as fh:
+        return _parse_blocks(iter_code_blocks(fh), fork, str(file_path))
+
 
+def parse_spec_text(
+    text: str,
+    fork: str,
+    file_path: str = "",
+) -> tuple[list[SpecFunction], list[SpecConstant], list[SpecContainer]]:
+    """Parse spec markdown already read into memory."""
+    return _parse_blocks(iter_code_blocks(io.StringIO(text, newline=None)), fork, file_path)
+
+
+def _parse_blocks(
+    blocks: Iterable[tuple[str, int]],
+    fork: str,
+    file_path: str,
+) -> tuple[list[SpecFunction], list[SpecConstant], list[SpecContainer]]:
+    """Extract definitions from ``(block, start_line)`` pairs, one block at a time."""
     functions: list[SpecFunction] = []
     constants: list[SpecConstant] = []
     containers: list[SpecContainer] = []
 
-    for block in blocks:
+    for block, start_line in blocks:
         try:
             tree = ast.parse(block)
         except SyntaxError:
             continue
 
-        lines = block.splitlines()
-        for node in ast.walk(tree):
+        # Make line numbers absolute within the markdown file
+        offset = start_line - 1
+        lines = _split_lines(block)
+        # Only top-level statements: nested helpers and class attributes are
+        # part of their enclosing definition, not spec definitions of their own
+        for node in tree.body:
             if isinstance(node, ast.FunctionDef):
-                functions.append(_parse_function(node, lines, fork, str(file_path)))
+                functions.append(_parse_function(node, lines, fork, file_path, offset))
             elif isinstance(node, ast.ClassDef):
-                c = _parse_container(node, lines, fork, str(file_path))
+                c = _parse_container(node, lines, fork, file_path, offset)
                 if c:
                     containers.append(c)
             elif isinstance(node, ast.Assign):
-                constants.extend(_parse_constant(node, lines, fork, str(file_path)))
+                constants.extend(_parse_constant(node, fork, file_path, offset))
 
     return functions, constants, containers
 
 
-def parse_spec_repo(
-    repo_path: str | Path,
-    forks: list[str],
+def _encode_records(
+    fns: list[SpecFunction],
+    consts: list[SpecConstant],
+    ctrs: list[SpecContainer],
+) -> dict:
+    """Compact index payload; fork and file path are implied by the index key."""
+    return {
+        "f": [[f.name, f.source, f.args, f.return_type, f.line_number] for f in fns],
+        "k": [[c.name, c.value, c.line_number] for c in consts],
+        "c": [[c.name, c.fields, c.source, c.line_number] for c in ctrs],
+    }
+
+
+def _decode_records(
+    payload: dict,
+    fork: str,
+    file_path: str,
 ) -> tuple[list[SpecFunction], list[SpecConstant], list[SpecContainer]]:
-    """Parse all spec files across forks. Later forks override earlier ones."""
-    all_fns: list[SpecFunction] = []
-    all_consts: list[SpecConstant] = []
-    all_containers: list[SpecContainer] = []
+    fns = [
+        SpecFunction(name=name, source=source, args=args, return_type=ret,
+                     fork=fork, file_path=file_path, line_number=line)
+        for name, source, args, ret, line in payload["f"]
+    ]
+    consts = [
+        SpecConstant(name=name, value=value, fork=fork, file_path=file_path, line_number=line)
+        for name, value, line in payload["k"]
+    ]
+    ctrs = [
+        SpecContainer(name=name, fields=fields, source=source,
+                      fork=fork, file_path=file_path, line_number=line)
+        for name, fields, source, line in payload["c"]
+    ]
+    return fns, consts, ctrs
+
+
+def _parse_worker(task: tuple[str, str, bytes | None]) -> dict:
+    """Parse one file (reading it unless its bytes are given); return compact records.
 
+    Module-level so it can run in a process pool.
+    """
+    file_path, fork, data = task
+    if data is None:
+        return _encode_records(*parse_spec_file(file_path, fork))
+    return _encode_records(*parse_spec_text(data.decode(), fork, file_path))
+
+
+def list_spec_files(repo_path: str | Path, forks: list[str]) -> list[tuple[Path, str]]:
+    """``(markdown_file, fork)`` for every spec file of ``forks``, in parse order."""
     repo = Path(repo_path)
+    files: list[tuple[Path, str]] = []
     for fork in forks:
         specs_dir = repo / "specs" / fork
         if not specs_dir.exists():
@@ -117,10 +250,83 @@ def parse_spec_repo(
             specs_dir = repo / "specs" / "_features" / fork
         if not specs_dir.exists():
             continue
-        for md_file in sorted(specs_dir.rglob("*.md")):
-            fns, consts, ctrs = parse_spec_file(md_file, fork)
-            all_fns.extend(fns)
-            all_consts.extend(consts)
-            all_containers.extend(ctrs)
+        files.extend((md_file, fork) for md_file in sorted(specs_dir.rglob("*.md")))
+    return files
+
 
+def spec_files_defining(
+    repo_path: str | Path,
+    forks: list[str],
+    index: FileIndex,
+    names: Iterable[str],
+) -> list[tuple[Path, str]]:
+    """Spec files that may define any of the functions ``names``.
+
+    Names are looked up in the references the index recorded per file.
+    Those are only trusted for files whose content still matches their
+    entry; every other spec file (new, or edited since it was indexed, e.g.
+    after a spec bump) is included too. Results are in the order
+    :func:`parse_spec_repo` would visit them.
+    """
+    defining = set(index.referrers(names, "name"))
+    return [
+        (path, fork) for path, fork in list_spec_files(repo_path, forks)
+        if (str(path) in defining and path.is_file()) or not index.is_current(path)
+    ]
+
+
+def parse_spec_repo(
+    repo_path: str | Path,
+    forks: list[str],
+    index: FileIndex | None = None,
+    jobs: int = 1,
+) -> tuple[list[SpecFunction], list[SpecConstant], list[SpecContainer]]:
+    """Parse all spec files across forks. Later forks override earlier ones.
+
+    With an ``index``, files whose content is unchanged since the last run are
+    loaded from it instead of being re-parsed, and entries for files that no
+    longer exist are dropped. With ``jobs > 1`` the remaining files are parsed
+    in a process pool; results keep the serial order either way.
+    """
+    files = list_spec_files(repo_path, forks)
+    result = parse_spec_files(files, index, jobs)
+    if index is not None:
+        index.retain(md_file for md_file, _ in files)
+    return result
+
+
+def parse_spec_files(
+    files: list[tuple[Path, str]],
+    index: FileIndex | None = None,
+    jobs: int = 1,
+) -> tuple[list[SpecFunction], list[SpecConstant], list[SpecContainer]]:
+    """Parse the given ``(path, fork)`` spec files, as :func:`parse_spec_repo` does.
+
+    Indexed entries record the function names each file defines, for
+    :func:`spec_files_defining`.
+    """
+    payloads: list[dict | None] = [None] * len(files)
+    tasks: list[tuple[str, str, bytes | None]] = []
+    for position, (md_file, fork) in enumerate(files):
+        data = None
+        if index is not None:
+            payloads[position], data = index.get(md_file)
+            if payloads[position] is not None:
+                continue
+        tasks.append((str(md_file), fork, data))
+
+    parsed = zip(tasks, parallel_map(_parse_worker, tasks, jobs))
+    all_fns: list[SpecFunction] = []
+    all_consts: list[SpecConstant] = []
+    all_containers: list[SpecContainer] = []
+    for position, (md_file, fork) in enumerate(files):
+        payload = payloads[position]
+        if payload is None:
+            (_, _, data), payload = next(parsed)
+            if index is not None:
+                index.put(md_file, data, payload, {"name": [f[0] for f in payload["f"]]})
+        fns, consts, ctrs = _decode_records(payload, fork, str(md_file))
+        all_fns.extend(fns)
+        all_consts.extend(consts)
+        all_containers.extend(ctrs)
     return all_fns, all_consts, all_containers
@@ -18,6 +18,7 @@ def generate_json_report(findings: list[Finding], output_path: str | Path) -> No
             "spec_function": f.spec_function,
             "client_function": f.client_function,
             "spec_file": f.spec_file,
+            "spec_line": f.spec_line,
             "client_file": f.client_file,
             "client_line": f.client_line,
             "confidence": f.confidence,
@@ -24,7 +24,7 @@ def generate_markdown_report(findings: list[Finding], output_path: str | Path) -
             icon = {"error": "X", "warning": "!", "note": "i"}[f.severity.value]
             lines.append(f"### [{icon}] {f.category.value}: {f.summary}")
             lines.append("")
-            lines.append(f"- **Spec**: `{f.spec_function}` ({f.spec_file})")
+            lines.append(f"- **Spec**: `{f.spec_function}` ({f.spec_file}:{f.spec_line})")
             lines.append(f"- **Client**: `{f.client_function}` ({f.client_file}:{f.client_line})")
             if f.detail:
                 lines.append(f"- **Detail**: {f.detail}")
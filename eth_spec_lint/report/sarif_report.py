@@ -36,6 +36,17 @@ def generate_sarif_report(findings: list[Finding], output_path: str | Path) -> N
                 }
             ],
         }
+        if f.spec_file:
+            result["relatedLocations"] = [
+                {
+                    "id": 1,
+                    "message": {"text": f"Spec definition of {f.spec_function}"},
+                    "physicalLocation": {
+                        "artifactLocation": {"uri": f.spec_file},
+                        "region": {"startLine": max(f.spec_line, 1)},
+                    },
+                }
+            ]
         results.append(result)
 
     sarif = {
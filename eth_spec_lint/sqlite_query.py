@@ -0,0 +1,27 @@
+"""Chunked ``IN (...)`` queries for the SQLite stores."""
+
+from __future__ import annotations
+
+import sqlite3
+from collections.abc import Iterator, Sequence
+from typing import Any
+
+# Stay well under SQLite's host-parameter limit for IN (...) queries
+QUERY_CHUNK = 500
+
+
+def select_in(
+    conn: sqlite3.Connection,
+    query: str,
+    values: Sequence[Any],
+    params: Sequence[Any] = (),
+) -> Iterator[tuple]:
+    """Rows of ``query IN (values)``, run ``QUERY_CHUNK`` values at a time.
+
+    ``query`` ends with the column to match, e.g. ``"SELECT k, v FROM t
+    WHERE k"``; ``params`` are bound to its own placeholders, ahead of each
+    chunk of ``values``.
+    """
+    for start in range(0, len(values), QUERY_CHUNK):
+        chunk = values[start:start + QUERY_CHUNK]
+        yield from conn.execute(f"{query} IN ({','.join('?' * len(chunk))})", (*params, *chunk))
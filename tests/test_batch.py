@@ -0,0 +1,82 @@
+"""Tests for batch-API scan mode."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from eth_spec_lint.client.base import ClientFunction
+from eth_spec_lint.compare.batch import run_batch
+from eth_spec_lint.compare.engine import Cache, _cache_key, compare_all
+from eth_spec_lint.compare.providers import LLMProvider, LLMResponse, StubProvider, UsageStats
+from eth_spec_lint.config import Config
+from eth_spec_lint.parser.models import SpecFunction
+
+
+def _pairs(n):
+    return [
+        (
+            SpecFunction(name=f"fn_{i}", source=f"def fn_{i}(): ...", args=[]),
+            ClientFunction(name=f"fn{i}", source=f"function fn{i}() {{}}", params=[]),
+        )
+        for i in range(n)
+    ]
+
+
+def _config(tmp_path):
+    config = Config()
+    config.cache.db_path = str(tmp_path / "cache.db")
+    config.llm.provider = "stub"
+    config.llm.batch_poll_interval = 0
+    return config
+
+
+@patch("eth_spec_lint.compare.engine._call_llm")
+def test_run_batch_fills_cache(mock_llm, tmp_path):
+    config = _config(tmp_path)
+    pairs = _pairs(3)
+    run_batch(pairs, config)
+
+    cache = Cache(config.cache.db_path)
+    assert all(cache.get(_cache_key(s.source, c.source, config.llm)) == "[]" for s, c in pairs)
+    assert cache.pending_batches("stub") == []
+    cache.close()
+
+    assert compare_all(pairs, config) == []
+    mock_llm.assert_not_called()
+
+
+def test_run_batch_resumes_pending(tmp_path):
+    config = _config(tmp_path)
+    pairs = _pairs(2)
+    keys = [_cache_key(s.source, c.source, config.llm) for s, c in pairs]
+
+    cache = Cache(config.cache.db_path)
+    cache.add_batch("old-batch", "stub", [keys[0]])
+    cache.close()
+
+    provider = MagicMock(spec=StubProvider, max_batch_size=100, usage=UsageStats())
+    provider.__enter__.return_value = provider
+    provider.batch_done.side_effect = [False, True, True]
+    provider.submit_batch.return_value = "new-batch"
+    provider.batch_results.side_effect = lambda batch_id: (
+        {keys[0]: LLMResponse(text="[]")} if batch_id == "old-batch" else {keys[1]: LLMResponse(text="[]")}
+    )
+    with patch("eth_spec_lint.compare.batch.get_provider", return_value=provider):
+        run_batch(pairs, config)
+
+    # Only the pair not covered by the resumed batch is resubmitted
+    provider.submit_batch.assert_called_once()
+    assert list(provider.submit_batch.call_args.args[0]) == [keys[1]]
+
+    cache = Cache(config.cache.db_path)
+    assert cache.get(keys[0]) == "[]" and cache.get(keys[1]) == "[]"
+    assert cache.pending_batches("stub") == []
+    cache.close()
+
+
+def test_run_batch_rejects_provider_without_batch_api(tmp_path):
+    provider = MagicMock(spec=LLMProvider)
+    provider.__enter__.return_value = provider
+    with patch("eth_spec_lint.compare.batch.get_provider", return_value=provider):
+        with pytest.raises(ValueError, match="does not support batch mode"):
+            run_batch(_pairs(1), _config(tmp_path))
@@ -0,0 +1,245 @@
+"""Tests for the SQLite result cache."""
+
+import hashlib
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from eth_spec_lint.compare.cache import Cache
+
+
+def _key(name: str) -> str:
+    """A well-formed cache key (the directory backend only accepts those)."""
+    return hashlib.sha256(name.encode()).hexdigest()
+
+
+def test_cache_uses_wal(tmp_path):
+    db = str(tmp_path / "cache.db")
+    cache = Cache(db)
+    mode = sqlite3.connect(db).execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == "wal"
+    cache.close()
+
+
+def test_buffered_writes_visible_and_persisted(tmp_path):
+    db = str(tmp_path / "cache.db")
+    cache = Cache(db, flush_interval=60)
+    cache.set("a", "1")
+    # Visible before the writer has committed it
+    assert cache.get("a") == "1"
+    cache.close()
+
+    cache = Cache(db)
+    assert cache.get("a") == "1"
+    cache.close()
+
+
+def test_get_many_set_many(tmp_path):
+    cache = Cache(str(tmp_path / "cache.db"))
+    cache.set_many({f"k{i}": str(i) for i in range(1200)})
+    cache.flush()
+    cache.set("pending", "p")
+    found = cache.get_many(["k0", "k1199", "missing", "pending", "k0"])
+    assert found == {"k0": "0", "k1199": "1199", "pending": "p"}
+    cache.close()
+
+
+def test_concurrent_writers(tmp_path):
+    db = str(tmp_path / "cache.db")
+    cache = Cache(db, flush_size=16)
+
+    def worker(n):
+        for i in range(100):
+            cache.set(f"{n}-{i}", str(i))
+            assert cache.get(f"{n}-{i}") == str(i)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    cache.close()
+
+    count = sqlite3.connect(db).execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+    assert count == 800
+
+
+def test_writer_survives_failed_flush(tmp_path):
+    db = str(tmp_path / "cache.db")
+    cache = Cache(db, flush_interval=0.01)
+    real_flush = cache.backend.flush
+    failed = threading.Event()
+
+    def flaky_flush():
+        if not failed.is_set():
+            failed.set()
+            raise sqlite3.OperationalError("database is locked")
+        real_flush()
+
+    cache.backend.flush = flaky_flush
+    cache.set("a", "1")
+    assert failed.wait(5)
+    for _ in range(500):
+        if sqlite3.connect(db).execute("SELECT COUNT(*) FROM cache").fetchone()[0]:
+            break
+        time.sleep(0.01)
+    assert sqlite3.connect(db).execute("SELECT value FROM cache WHERE key = 'a'").fetchone() == ("1",)
+    cache.close()
+
+
+def test_migrates_legacy_schema(tmp_path):
+    db = str(tmp_path / "cache.db")
+    conn = sqlite3.connect(db)
+    conn.execute("CREATE TABLE cache (key TEXT PRIMARY KEY, value TEXT)")
+    conn.execute("INSERT INTO cache VALUES ('old', 'v')")
+    conn.commit()
+    conn.close()
+
+    cache = Cache(db)
+    assert cache.get("old") == "v"
+    assert cache.stats()["entries"] == 1
+    cache.close()
+
+
+def test_metadata_and_hits(tmp_path):
+    from eth_spec_lint.compare.cache import CacheEntry
+
+    cache = Cache(str(tmp_path / "cache.db"))
+    cache.set("k", CacheEntry("[]", provider="anthropic", model="m", input_tokens=100, output_tokens=10))
+    cache.flush()
+    cache.get("k")
+    cache.get_many(["k"])
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["tokens_saved"] == 220
+    assert stats["by_model"] == [("anthropic", "m", 1)]
+    cache.close()
+
+
+def test_prune_by_age_and_size(tmp_path):
+    db = str(tmp_path / "cache.db")
+    cache = Cache(db)
+    cache.set_many({f"k{i}": "x" * 1024 for i in range(10)})
+    cache.flush()
+    conn = sqlite3.connect(db)
+    # k0..k4 were last used long ago; k9 most recently
+    for i in range(10):
+        conn.execute("UPDATE cache SET created_at = ? WHERE key = ?", (1000.0 * i, f"k{i}"))
+    conn.execute("UPDATE cache SET last_hit_at = ? WHERE key = 'k9'", (time.time(),))
+    conn.commit()
+
+    assert cache.prune(max_age_days=1) == 9
+    assert cache.get_many([f"k{i}" for i in range(10)]).keys() == {"k9"}
+
+    cache.set_many({f"n{i}": "x" * 1024 for i in range(4)})
+    assert cache.prune(max_size_mb=3 * 1024 / (1024 * 1024)) == 2
+    assert cache.stats()["entries"] == 3
+    cache.vacuum()
+    cache.close()
+
+
+def test_cache_key_tracks_model_settings():
+    from eth_spec_lint.compare.engine import _cache_key
+    from eth_spec_lint.config import LLMConfig
+
+    base = _cache_key("spec", "client", LLMConfig())
+    assert base == _cache_key("spec", "client", LLMConfig())
+    assert base != _cache_key("spec", "client", LLMConfig(model="other"))
+    assert base != _cache_key("spec", "client", LLMConfig(temperature=0.5))
+    assert base != _cache_key("spec", "client", LLMConfig(provider="openai"))
+
+
+def test_cache_key_tracks_packed_template(tmp_path, monkeypatch):
+    import shutil
+
+    from eth_spec_lint.compare import prompts
+    from eth_spec_lint.compare.engine import _cache_key
+    from eth_spec_lint.config import LLMConfig
+
+    base = _cache_key("spec", "client", LLMConfig())
+    edited = tmp_path / "prompts"
+    shutil.copytree(prompts._PROMPTS_DIR, edited)
+    with open(edited / "compare_functions_packed.j2", "a") as f:
+        f.write("\nReply tersely.\n")
+    monkeypatch.setattr(prompts, "_PROMPTS_DIR", edited)
+    prompts.template_hash.cache_clear()
+    try:
+        assert base != _cache_key("spec", "client", LLMConfig())
+    finally:
+        prompts.template_hash.cache_clear()
+
+
+def test_directory_backend_roundtrip(tmp_path):
+    from eth_spec_lint.compare.cache import CacheEntry
+
+    root = tmp_path / "cache-dir"
+    a, b = _key("a"), _key("b")
+    cache = Cache(str(root), backend="directory")
+    cache.set_many({a: CacheEntry("[]", model="m", input_tokens=5), b: "x"})
+    assert cache.get_many([a, b, _key("missing")]) == {a: "[]", b: "x"}
+    cache.add_batch("msgbatch/1", "anthropic", [a])
+    assert cache.pending_batches("anthropic") == [("msgbatch/1", [a])]
+    cache.remove_batch("msgbatch/1")
+    cache.close()
+
+    assert (root / a[:2] / f"{a}.json").exists()
+    cache = Cache(str(root), backend="directory")
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["hits"] == 2
+    assert cache.prune(max_size_mb=0) == 2
+    cache.close()
+
+
+def test_directory_backend_rejects_bad_keys(tmp_path):
+    cache = Cache(str(tmp_path / "cache-dir"), backend="directory")
+    for key in ("../../x", "ab12", _key("a").upper()):
+        with pytest.raises(ValueError):
+            cache.set(key, "v")
+        with pytest.raises(ValueError):
+            cache.get(key)
+    cache.close()
+    assert not (tmp_path / "x").exists()
+
+
+def test_tarball_backend_persists_between_runs(tmp_path):
+    archive = tmp_path / "cache.tar.gz"
+    cache = Cache(str(archive), backend="directory")
+    cache.set(_key("k1"), "v1")
+    cache.close()
+    assert archive.exists()
+
+    cache = Cache(str(archive), backend="directory")
+    assert cache.get(_key("k1")) == "v1"
+    cache.close()
+
+
+def test_export_import(tmp_path):
+    from eth_spec_lint.compare.cache import CacheEntry
+
+    a, b = _key("a"), _key("b")
+    main_cache = Cache(str(tmp_path / "main.db"))
+    main_cache.set_many({a: CacheEntry("1", model="m", created_at=123.0), b: "2"})
+    dump = tmp_path / "entries.jsonl.gz"
+    assert main_cache.export_entries(dump) == 2
+    main_cache.close()
+
+    pr_cache = Cache(str(tmp_path / "pr"), backend="directory")
+    pr_cache.set(a, "local")
+    assert pr_cache.import_entries(dump) == 1
+    assert pr_cache.get_many([a, b]) == {a: "local", b: "2"}
+    pr_cache.close()
+
+
+def test_import_rejects_bad_keys(tmp_path):
+    import json
+
+    dump = tmp_path / "entries.jsonl"
+    dump.write_text(json.dumps({"key": "../../escaped", "value": "x"}) + "\n")
+    cache = Cache(str(tmp_path / "pr"), backend="directory")
+    with pytest.raises(ValueError):
+        cache.import_entries(dump)
+    cache.close()
+    assert not (tmp_path / "escaped.json").exists()
@@ -68,3 +68,253 @@ def test_lodestar_analyzer():
     exported = {f.name: f.exported for f in fns}
     assert exported.get("processSlot") is True
     assert exported.get("internalHelper") is False
+
+
+@pytest.mark.skipif(not _HAS_TREESITTER, reason="tree-sitter not installed")
+def test_lodestar_analyzer_index(tmp_path, monkeypatch):
+    from pathlib import Path
+
+    from eth_spec_lint.client import lodestar
+    from eth_spec_lint.file_index import FileIndex
+
+    src = tmp_path / "client.ts"
+    src.write_text((Path(__file__).parent / "fixtures" / "sample_client.ts").read_text())
+    db = tmp_path / "index.db"
+    with FileIndex(db, "lodestar", lodestar.ANALYZER_VERSION) as index:
+        cold = lodestar.LodestarAnalyzer(index).analyze([str(src)])
+
+    def fail(*args, **kwargs):
+        raise AssertionError("unchanged file was re-parsed")
+
+    monkeypatch.setattr(lodestar, "_extract_functions_from_tree", fail)
+    with FileIndex(db, "lodestar", lodestar.ANALYZER_VERSION) as index:
+        warm = lodestar.LodestarAnalyzer(index).analyze([str(src)])
+    assert index.hits == 1
+    assert warm == cold
+
+
+@pytest.mark.skipif(not _HAS_TREESITTER, reason="tree-sitter not installed")
+def test_lodestar_analyzer_incremental_reparse(tmp_path):
+    from pathlib import Path
+
+    from eth_spec_lint.client.lodestar import LodestarAnalyzer
+
+    src = tmp_path / "client.ts"
+    original = (Path(__file__).parent / "fixtures" / "sample_client.ts").read_text()
+    src.write_text(original)
+    analyzer = LodestarAnalyzer(retain_trees=True)
+    analyzer.analyze_file(str(src))
+
+    src.write_text(original.replace("processSlot", "processSlotRenamed") + "\nfunction addedLater(x: number): void {}\n")
+    incremental = analyzer.analyze_file(str(src))
+    fresh = LodestarAnalyzer().analyze_file(str(src))
+    assert incremental == fresh
+    assert {"processSlotRenamed", "addedLater"} <= {f.name for f in incremental}
+
+
+@pytest.mark.skipif(not _HAS_TREESITTER, reason="tree-sitter not installed")
+def test_lodestar_analyzer_parallel_matches_serial(tmp_path):
+    from pathlib import Path
+
+    from eth_spec_lint.client.lodestar import LodestarAnalyzer
+
+    text = (Path(__file__).parent / "fixtures" / "sample_client.ts").read_text()
+    for name in ("a", "b", "c", "d"):
+        (tmp_path / f"{name}.ts").write_text(text)
+    pattern = [str(tmp_path / "*.ts")]
+    assert LodestarAnalyzer(jobs=2).analyze(pattern) == LodestarAnalyzer().analyze(pattern)
+
+
+@pytest.mark.skipif(not _HAS_TREESITTER, reason="tree-sitter not installed")
+def test_lodestar_analyzer_arrow_consts_methods_namespaces(tmp_path):
+    from eth_spec_lint.client.lodestar import LodestarAnalyzer
+
+    src = tmp_path / "client.ts"
+    src.write_text(
+        "export const processEpoch = (state: CachedBeaconState): void => {\n"
+        "  const local = () => 1;\n"
+        "};\n"
+        "export class EpochCache {\n"
+        "  getBeaconProposer(slot: Slot): ValidatorIndex {\n"
+        "    return 0;\n"
+        "  }\n"
+        "  constructor() {}\n"
+        "}\n"
+        "export namespace Util {\n"
+        "  export function computeEpoch(slot: Slot) {}\n"
+        "}\n"
+    )
+    fns = {f.name: f for f in LodestarAnalyzer().analyze_file(str(src))}
+    assert set(fns) == {"processEpoch", "getBeaconProposer", "computeEpoch"}
+
+    arrow = fns["processEpoch"]
+    assert arrow.params == ("state",) and arrow.return_type == "void"
+    assert arrow.exported and (arrow.line_number, arrow.end_line) == (1, 3)
+
+    method = fns["getBeaconProposer"]
+    assert method.kind == "method" and method.container == "EpochCache"
+    assert method.params == ("slot",) and method.line_number == 5
+
+    assert fns["computeEpoch"].container == "Util"
+    assert fns["computeEpoch"].exported
+
+
+def test_build_mapping_prefers_functions_over_methods():
+    from eth_spec_lint.client.base import ClientFunction
+
+    spec_fns = [SpecFunction(name="process_slot", source="...", args=["state"])]
+    client_fns = [
+        ClientFunction(name="processSlot", source="fn", params=["state"]),
+        ClientFunction(name="processSlot", source="method", params=["state"], kind="method", container="Chain"),
+    ]
+    pairs = build_mapping(spec_fns, client_fns)
+    assert pairs[0][1].source == "fn"
+
+
+@pytest.mark.skipif(not _HAS_TREESITTER, reason="tree-sitter not installed")
+def test_client_source_is_lazy(tmp_path):
+    from pathlib import Path
+
+    from eth_spec_lint.client.lodestar import LodestarAnalyzer
+    from eth_spec_lint.file_index import FileIndex
+
+    text = (Path(__file__).parent / "fixtures" / "sample_client.ts").read_text()
+    src = tmp_path / "client.ts"
+    src.write_text("// héader\n" + text)
+    with FileIndex(tmp_path / "index.db", "lodestar", "test") as index:
+        for analyzer in (LodestarAnalyzer(), LodestarAnalyzer(index), LodestarAnalyzer(index)):
+            fns = {f.name: f for f in analyzer.analyze([str(src)])}
+            assert all(f._source is None for f in fns.values())
+            assert fns["processSlot"].source.startswith("function processSlot(state: BeaconState)")
+            assert fns["internalHelper"].source == "function internalHelper(): void {\n  // not exported\n}"
+            assert fns["getActiveValidatorIndices"]._source is None
+
+
+def test_build_fork_mapping():
+    from eth_spec_lint.client.base import ClientFunction
+    from eth_spec_lint.client.mapping import build_fork_mapping
+    from eth_spec_lint.parser.fork_graph import ForkGraph, ForkRegistry
+
+    graph = ForkGraph([
+        SpecFunction(name="process_attestation", source="v1", args=[], fork="phase0"),
+        SpecFunction(name="process_attestation", source="v2", args=[], fork="altair"),
+        SpecFunction(name="process_slot", source="s1", args=[], fork="phase0"),
+        SpecFunction(name="upgrade_state", source="u1", args=[], fork="phase0"),
+        SpecFunction(name="upgrade_state", source="u2", args=[], fork="altair"),
+    ], ForkRegistry(["phase0", "altair", "bellatrix"]))
+    client_fns = [
+        ClientFunction(name="processAttestationPhase0", params=[]),
+        ClientFunction(name="processAttestation", params=[]),
+        ClientFunction(name="processSlot", params=[]),
+        ClientFunction(name="upgradeState", params=[]),
+        ClientFunction(name="customUpgrade", params=[]),
+    ]
+    pairs = build_fork_mapping(graph, client_fns, {"upgrade_state@phase0": "customUpgrade"})
+    assert [(s.name, s.fork, c.name) for s, c in pairs] == [
+        ("process_attestation", "phase0", "processAttestationPhase0"),
+        ("process_attestation", "altair", "processAttestation"),
+        ("process_slot", "phase0", "processSlot"),
+        ("upgrade_state", "phase0", "customUpgrade"),
+        ("upgrade_state", "altair", "upgradeState"),
+    ]
+
+
+def test_name_tokens():
+    from eth_spec_lint.client.mapping_index import name_key, name_tokens
+
+    assert name_tokens("getBLSPubkey") == ["get", "bls", "pubkey"]
+    assert name_tokens("processEth1Data") == ["process", "eth1", "data"]
+    assert name_key("process_eth1_data") == name_key("ProcessEth1Data") == "process_eth1_data"
+
+
+def test_mapping_index_ranks_candidates():
+    from eth_spec_lint.client.base import ClientFunction
+    from eth_spec_lint.client.mapping_index import MappingIndex
+
+    spec_fn = SpecFunction(name="process_attestation", source="...", args=["state", "attestation"])
+    client_fns = [
+        ClientFunction(name="processAttestation", params=["state"], file_path="a.ts"),
+        ClientFunction(name="processAttestation", params=["state", "attestation"], file_path="b.ts"),
+        ClientFunction(name="processAttestationAltair", params=["state", "attestation"], file_path="c.ts"),
+        ClientFunction(name="processAttestation", params=["state", "attestation"], file_path="phase0/d.ts"),
+        ClientFunction(name="processAttestations", params=["state", "attestations"], file_path="e.ts"),
+    ]
+    index = MappingIndex(client_fns)
+    ranked = index.candidates(spec_fn, forks=["phase0", "altair"])
+    assert [(c.function.file_path, c.fork) for c in ranked] == [
+        ("c.ts", "altair"), ("phase0/d.ts", "phase0"), ("b.ts", None), ("a.ts", None),
+    ]
+    assert all(c.exact for c in ranked)
+    assert ranked[0].score > ranked[1].score > ranked[2].score > ranked[3].score
+    assert index.best(spec_fn, forks=["bellatrix"], generic=False) is None
+
+    fuzzy = index.candidates(spec_fn, threshold=0.8)
+    assert [c.function.file_path for c in fuzzy] == ["b.ts", "a.ts", "e.ts"]
+    assert not fuzzy[-1].exact and 0.8 <= fuzzy[-1].score < 1.5
+    assert index.candidates(spec_fn, threshold=0.99)[-1].function.file_path == "a.ts"
+
+
+def test_build_mapping_fuzzy_threshold():
+    from eth_spec_lint.client.base import ClientFunction
+
+    spec_fns = [SpecFunction(name="get_validator_churn_limit", source="...", args=["state"])]
+    client_fns = [
+        ClientFunction(name="getValidatorsChurnLimit", params=["state"]),
+        ClientFunction(name="getChurnLimit", params=["state"]),
+    ]
+    assert build_mapping(spec_fns, client_fns) == []
+    pairs = build_mapping(spec_fns, client_fns, threshold=0.8)
+    assert [c.name for _, c in pairs] == ["getValidatorsChurnLimit"]
+
+
+def test_hashing_embedder_matches_across_languages():
+    pytest.importorskip("numpy")
+    from eth_spec_lint.client.semantic import HashingEmbedder
+
+    vectors = HashingEmbedder().embed([
+        "def get_current_epoch(state: BeaconState) -> Epoch:\n    return compute_epoch_at_slot(state.slot)",
+        "export function getCurrentEpoch(state: BeaconState): Epoch {\n  return computeEpochAtSlot(state.slot);\n}",
+        "export function verifyBlobSidecar(sidecar: BlobSidecar): boolean {\n  return kzg.verify(sidecar);\n}",
+        "",
+    ])
+    scores = vectors @ vectors[0]
+    assert scores[1] > 0.9 > scores[2]
+    assert scores[3] == 0
+
+
+def test_semantic_candidates_cached_by_source(tmp_path):
+    pytest.importorskip("numpy")
+    from eth_spec_lint.client.base import ClientFunction
+    from eth_spec_lint.client.semantic import EmbeddingStore, HashingEmbedder, semantic_candidates
+
+    spec_fns = [
+        SpecFunction(name="get_total_active_balance", args=["state"], source=(
+            "def get_total_active_balance(state):\n"
+            "    return get_total_balance(state, set(get_active_validator_indices(state, get_current_epoch(state))))"
+        )),
+        SpecFunction(name="is_slashable_validator", args=["validator", "epoch"], source=(
+            "def is_slashable_validator(validator, epoch):\n"
+            "    return (not validator.slashed) and (validator.activation_epoch <= epoch < validator.withdrawable_epoch)"
+        )),
+    ]
+    client_fns = [
+        ClientFunction(name="isSlashable", params=["validator", "epoch"], source=(
+            "function isSlashable(validator, epoch) {\n"
+            "  return !validator.slashed && validator.activationEpoch <= epoch && epoch < validator.withdrawableEpoch;\n}"
+        )),
+        ClientFunction(name="totalActiveBalance", params=["state"], source=(
+            "function totalActiveBalance(state) {\n"
+            "  return getTotalBalance(state, getActiveValidatorIndices(state, getCurrentEpoch(state)));\n}"
+        )),
+        ClientFunction(name="encodeSsz", params=["value"], source="function encodeSsz(value) { return ssz.serialize(value); }"),
+    ]
+    db = tmp_path / "index.db"
+    with EmbeddingStore(db, HashingEmbedder()) as store:
+        proposals = semantic_candidates(spec_fns, client_fns, store, top_k=2, min_score=0.3)
+        assert (store.hits, store.misses) == (0, 5)
+    assert [[c.function.name for c in ranked] for _, ranked in proposals] == [["totalActiveBalance"], ["isSlashable"]]
+    assert all(not c.exact and 0.3 <= c.score <= 1 for _, ranked in proposals for c in ranked)
+
+    with EmbeddingStore(db, HashingEmbedder()) as store:
+        assert semantic_candidates(spec_fns, client_fns, store, top_k=2, min_score=0.3) == proposals
+        assert (store.hits, store.misses) == (5, 0)
@@ -4,7 +4,8 @@ import json
 from unittest.mock import patch
 
 from eth_spec_lint.client.base import ClientFunction
-from eth_spec_lint.compare.engine import Cache, _parse_findings_json, compare_function_pair
+from eth_spec_lint.compare.engine import Cache, _parse_findings_json, compare_all, compare_function_pair
+from eth_spec_lint.compare.providers import LLMResponse
 from eth_spec_lint.config import Config
 from eth_spec_lint.parser.models import FindingCategory, Severity, SpecFunction
 
@@ -72,7 +73,7 @@ def test_cache(tmp_path):
 
 @patch("eth_spec_lint.compare.engine._call_llm")
 def test_compare_function_pair(mock_llm, tmp_path):
-    mock_llm.return_value = MOCK_LLM_RESPONSE
+    mock_llm.return_value = LLMResponse(text=MOCK_LLM_RESPONSE)
     config = Config()
     config.cache.db_path = str(tmp_path / "cache.db")
 
@@ -84,7 +85,7 @@ def test_compare_function_pair(mock_llm, tmp_path):
 
 @patch("eth_spec_lint.compare.engine._call_llm")
 def test_compare_uses_cache(mock_llm, tmp_path):
-    mock_llm.return_value = MOCK_LLM_RESPONSE
+    mock_llm.return_value = LLMResponse(text=MOCK_LLM_RESPONSE)
     config = Config()
     config.cache.db_path = str(tmp_path / "cache.db")
     cache = Cache(config.cache.db_path)
@@ -98,3 +99,137 @@ def test_compare_uses_cache(mock_llm, tmp_path):
     assert mock_llm.call_count == 1
 
     cache.close()
+
+
+def _make_pairs(n):
+    return [
+        (
+            SpecFunction(name=f"fn_{i}", source=f"def fn_{i}(state): ...", args=["state"], fork="phase0"),
+            ClientFunction(name=f"fn{i}", source=f"export function fn{i}(state) {{}}", params=["state"]),
+        )
+        for i in range(n)
+    ]
+
+
+@patch("eth_spec_lint.compare.engine._call_llm")
+def test_compare_all_preserves_pair_order(mock_llm, tmp_path):
+    import time
+
+    def fake_llm(prompt, config, *args):
+        # Later pairs finish first
+        idx = int(prompt.user.split("`fn_")[1].split("`")[0])
+        time.sleep(0.01 * (5 - idx))
+        return LLMResponse(text=json.dumps([{"category": "MISSING_CHECK", "summary": f"finding {idx}"}]))
+
+    mock_llm.side_effect = fake_llm
+    config = Config()
+    config.cache.db_path = str(tmp_path / "cache.db")
+    config.llm.provider = "stub"
+    config.llm.concurrency = 4
+
+    findings = compare_all(_make_pairs(5), config)
+    assert [f.summary for f in findings] == [f"finding {i}" for i in range(5)]
+    assert [f.spec_function for f in findings] == [f"fn_{i}" for i in range(5)]
+    assert mock_llm.call_count == 5
+
+
+@patch("eth_spec_lint.compare.engine._call_llm")
+def test_compare_all_only_dispatches_misses(mock_llm, tmp_path):
+    mock_llm.return_value = LLMResponse(text=MOCK_LLM_RESPONSE)
+    config = Config()
+    config.cache.db_path = str(tmp_path / "cache.db")
+    config.llm.provider = "stub"
+    pairs = _make_pairs(3)
+
+    compare_all(pairs[:2], config)
+    assert mock_llm.call_count == 2
+
+    findings = compare_all(pairs, config)
+    assert mock_llm.call_count == 3
+    assert len(findings) == 3
+
+
+def test_compare_all_with_stub_provider(tmp_path):
+    config = Config()
+    config.cache.db_path = str(tmp_path / "cache.db")
+    config.llm.provider = "stub"
+
+    with patch("eth_spec_lint.compare.providers.StubProvider.close") as mock_close:
+        findings = compare_all(_make_pairs(3), config)
+    assert findings == []
+    mock_close.assert_called_once()
+
+
+def test_get_provider_unknown():
+    import pytest
+
+    from eth_spec_lint.compare.providers import get_provider
+
+    config = Config()
+    config.llm.provider = "nope"
+    with pytest.raises(ValueError):
+        get_provider(config.llm)
+
+
+def test_render_prompt_splits_static_prefix():
+    from eth_spec_lint.compare.prompts import render_compare_function
+
+    a = render_compare_function("def a(): ...", "function a() {}", "a", "a")
+    b = render_compare_function("def b(): ...", "function b() {}", "b", "b")
+    assert a.system == b.system
+    assert "OFF_BY_ONE" in a.system
+    assert "def a(): ..." in a.user and "def a(): ..." not in a.system
+
+
+def test_usage_stats_counts_cache_hits():
+    from eth_spec_lint.compare.providers import UsageStats
+
+    usage = UsageStats()
+    usage.add(LLMResponse(text="[]", input_tokens=100, output_tokens=5, cache_write_tokens=900))
+    usage.add(LLMResponse(text="[]", input_tokens=100, output_tokens=5, cache_read_tokens=900))
+    assert usage.requests == 2
+    assert usage.cache_read_tokens == 900
+    assert "900 read from prompt cache" in usage.summary()
+
+
+@patch("eth_spec_lint.compare.engine._call_llm")
+def test_compare_all_packs_small_pairs(mock_llm, tmp_path):
+    def fake_llm(prompt, config, *args):
+        if "Pair `p1`" in prompt.user:
+            # Answer every pair except the last; it should be retried alone
+            ids = [f"p{i}" for i in range(1, prompt.user.count("## Pair "))]
+            return LLMResponse(text=json.dumps({pid: [{"category": "OFF_BY_ONE", "summary": pid}] for pid in ids}))
+        return LLMResponse(text="[]")
+
+    mock_llm.side_effect = fake_llm
+    config = Config()
+    config.cache.db_path = str(tmp_path / "cache.db")
+    config.llm.provider = "stub"
+    config.llm.pack_token_budget = 1000
+
+    findings = compare_all(_make_pairs(3), config)
+    assert [f.spec_function for f in findings] == ["fn_0", "fn_1"]
+    assert [f.summary for f in findings] == ["p1", "p2"]
+    # One packed request plus one fallback for the omitted pair
+    assert mock_llm.call_count == 2
+
+    # Each pair's slice was cached under its own key
+    findings = compare_all(_make_pairs(3), config)
+    assert len(findings) == 2
+    assert mock_llm.call_count == 2
+
+
+def test_pack_pairs_respects_budget():
+    from eth_spec_lint.compare.engine import _pack_pairs
+
+    config = Config()
+    config.llm.pack_token_budget = 25
+    config.llm.pack_max_pair_tokens = 15
+    big = (
+        SpecFunction(name="big", source="x" * 200, args=[]),
+        ClientFunction(name="big", source="y" * 200, params=[]),
+    )
+    misses = {f"k{i}": pair for i, pair in enumerate(_make_pairs(4))}
+    misses["kbig"] = big
+    groups = _pack_pairs(misses, config)
+    assert [list(g) for g in groups] == [["k0", "k1"], ["kbig"], ["k2", "k3"]]
@@ -1,5 +1,7 @@
 """Tests for PR file filtering."""
 
+import pytest
+
 from eth_spec_lint.ci.pr_filter import filter_pairs_by_changed_files
 from eth_spec_lint.client.base import ClientFunction
 from eth_spec_lint.parser.models import SpecFunction
@@ -30,3 +32,190 @@ def test_filter_empty_changed():
     ]
     filtered = filter_pairs_by_changed_files(pairs, [])
     assert len(filtered) == 0
+
+
+def test_changed_client_files_match_globs(tmp_path, monkeypatch):
+    from eth_spec_lint.ci.pr_scope import changed_client_files
+    from eth_spec_lint.config import ClientConfig
+
+    for rel in ("packages/a/src/x.ts", "packages/a/src/deep/y.ts", "packages/a/test/z.ts"):
+        (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / rel).write_text("")
+    monkeypatch.chdir(tmp_path)
+    client = ClientConfig(repo_path=".", source_globs=["packages/*/src/**/*.ts"])
+    changed = ["packages/a/src/x.ts", "packages/a/src/deep/y.ts", "packages/a/test/z.ts", "packages/a/src/gone.ts"]
+    assert changed_client_files(changed, client) == ["./packages/a/src/deep/y.ts", "./packages/a/src/x.ts"]
+
+
+def test_scoped_pairs_follow_calls_into_changed_files(tmp_path, monkeypatch):
+    pytest.importorskip("tree_sitter_typescript")
+    from eth_spec_lint.ci.pr_scope import scoped_pairs
+    from eth_spec_lint.client.lodestar import ANALYZER_VERSION, LodestarAnalyzer
+    from eth_spec_lint.config import ClientConfig, Config, IndexConfig, SpecConfig
+    from eth_spec_lint.file_index import FileIndex
+    from eth_spec_lint.parser import spec_parser
+    from eth_spec_lint.parser.spec_parser import PARSER_VERSION, parse_spec_repo
+
+    spec_dir = tmp_path / "specs" / "specs" / "phase0"
+    spec_dir.mkdir(parents=True)
+    (spec_dir / "a.md").write_text(
+        "```python\ndef process_slot(state):\n    pass\n\n\ndef process_epoch(state):\n    pass\n```\n"
+    )
+    (spec_dir / "b.md").write_text("```python\ndef get_balance(state):\n    pass\n```\n")
+    src = tmp_path / "client" / "src"
+    src.mkdir(parents=True)
+    (src / "util.ts").write_text("export function helper() {}\n")
+    (src / "slot.ts").write_text(
+        'import {helper} from "./util.js";\n'
+        "export function processSlot(state) { helper(); }\n"
+        "export function processEpoch(state) {}\n"
+    )
+    (src / "balance.ts").write_text("export function getBalance(state) {}\n")
+    (src / "old.ts").write_text("export class Legacy { processSlot(state) {} }\n")
+
+    config = Config(
+        spec=SpecConfig(repo_path=str(tmp_path / "specs"), forks=["phase0"]),
+        client=ClientConfig(repo_path=str(tmp_path / "client"), source_globs=["src/**/*.ts"]),
+        index=IndexConfig(path=str(tmp_path / "index.db")),
+    )
+    assert scoped_pairs(config, [str(src / "util.ts")]) is None
+
+    with FileIndex(config.index.path, "spec", PARSER_VERSION) as index:
+        parse_spec_repo(config.spec.repo_path, config.spec.forks, index)
+    with FileIndex(config.index.path, "lodestar", ANALYZER_VERSION) as index:
+        LodestarAnalyzer(index).analyze([f"{config.client.repo_path}/src/**/*.ts"])
+
+    # Only files reachable from the diff are parsed
+    monkeypatch.setattr(spec_parser, "_parse_worker", lambda task: pytest.fail(f"reparsed {task[0]}"))
+    (src / "old.ts").write_text("export class Legacy { processSlot(state) { return 1; } }\n")
+    pairs = scoped_pairs(config, [str(src / "util.ts")])
+    assert [(s.name, c.name, c.kind) for s, c in pairs] == [("process_slot", "processSlot", "function")]
+
+
+def test_check_pr_without_index_follows_calls_across_files(tmp_path, monkeypatch):
+    pytest.importorskip("tree_sitter_typescript")
+    from click.testing import CliRunner
+
+    from eth_spec_lint.ci import pr_filter
+    from eth_spec_lint.cli import main
+    from eth_spec_lint.compare import engine
+
+    spec_dir = tmp_path / "specs" / "specs" / "phase0"
+    spec_dir.mkdir(parents=True)
+    (spec_dir / "a.md").write_text("```python\ndef process_slot(state):\n    pass\n```\n")
+    src = tmp_path / "client" / "src"
+    src.mkdir(parents=True)
+    (src / "util.ts").write_text("export function helper() {}\n")
+    (src / "slot.ts").write_text('import {helper} from "./util.js";\nexport function processSlot(state) { helper(); }\n')
+    cfg = tmp_path / "cfg.yml"
+    cfg.write_text(
+        f"spec: {{repo_path: {tmp_path / 'specs'}, forks: [phase0]}}\n"
+        f"client: {{repo_path: {tmp_path / 'client'}, source_globs: ['src/**/*.ts']}}\n"
+        "index: {path: null}\n"
+        f"report: {{output_dir: {tmp_path / 'reports'}, formats: [json]}}\n"
+    )
+    compared = []
+    monkeypatch.chdir(tmp_path / "client")
+    monkeypatch.setattr(pr_filter, "get_changed_hunks", lambda base: {"src/util.ts": [(1, 1)]})
+    monkeypatch.setattr(engine, "compare_all", lambda pairs, config: compared.extend(pairs) or [])
+
+    result = CliRunner().invoke(main, ["-c", str(cfg), "check-pr", "--base", "base"])
+    assert result.exit_code == 0, result.output
+    # Only the helper's file changed; its caller in slot.ts is still re-checked
+    assert [(s.name, c.name) for s, c in compared] == [("process_slot", "processSlot")]
+
+
+def _git(repo, *args):
+    import subprocess
+
+    subprocess.run(["git", "-c", "user.name=t", "-c", "user.email=t@t", *args], cwd=repo, check=True, capture_output=True)
+
+
+def test_changed_spec_functions_compare_sources(tmp_path):
+    from eth_spec_lint.ci.pr_filter import changed_spec_functions, get_changed_hunks
+
+    spec = tmp_path / "specs" / "phase0" / "beacon-chain.md"
+    spec.parent.mkdir(parents=True)
+    spec.write_text(
+        "# Phase 0\n\n```python\ndef a(state):\n    return 1\n```\n\n"
+        "```python\ndef b(state):\n    return 2\n```\n\n"
+        "```python\ndef c(state):\n    return 3\n```\n"
+    )
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "add", "-A")
+    _git(tmp_path, "commit", "-qm", "base")
+
+    # Shift every line, change c, and add d
+    text = spec.read_text().replace("# Phase 0\n", "# Phase 0\n\nIntro.\n").replace("return 3", "return 4")
+    spec.write_text(text + "\n```python\ndef d(state):\n    pass\n```\n")
+
+    assert get_changed_hunks("HEAD", tmp_path)["specs/phase0/beacon-chain.md"][0] == (3, 4)
+    changed = changed_spec_functions(tmp_path, ["phase0"], "HEAD")
+    assert [(fn.name, fn.line_number, fn.end_line) for fn in changed] == [("c", 16, 17), ("d", 21, 22)]
+
+
+def test_scoped_pairs_after_spec_bump(tmp_path):
+    pytest.importorskip("tree_sitter_typescript")
+    from eth_spec_lint.ci.pr_filter import changed_spec_functions
+    from eth_spec_lint.ci.pr_scope import scoped_pairs
+    from eth_spec_lint.client.lodestar import ANALYZER_VERSION, LodestarAnalyzer
+    from eth_spec_lint.config import ClientConfig, Config, IndexConfig, SpecConfig
+    from eth_spec_lint.file_index import FileIndex
+    from eth_spec_lint.parser.spec_parser import PARSER_VERSION, parse_spec_repo
+
+    specs = tmp_path / "specs"
+    spec = specs / "specs" / "phase0" / "a.md"
+    spec.parent.mkdir(parents=True)
+    spec.write_text("```python\ndef process_slot(state):\n    pass\n```\n")
+    _git(specs, "init", "-q")
+    _git(specs, "add", "-A")
+    _git(specs, "commit", "-qm", "base")
+    src = tmp_path / "client" / "src"
+    src.mkdir(parents=True)
+    (src / "foo.ts").write_text("export function processFoo(state) {}\n")
+
+    config = Config(
+        spec=SpecConfig(repo_path=str(specs), forks=["phase0"]),
+        client=ClientConfig(repo_path=str(tmp_path / "client"), source_globs=["src/**/*.ts"]),
+        index=IndexConfig(path=str(tmp_path / "index.db")),
+    )
+    with FileIndex(config.index.path, "spec", PARSER_VERSION) as index:
+        parse_spec_repo(config.spec.repo_path, config.spec.forks, index)
+    with FileIndex(config.index.path, "lodestar", ANALYZER_VERSION) as index:
+        LodestarAnalyzer(index).analyze([f"{config.client.repo_path}/src/**/*.ts"])
+
+    # Bump the spec: the index still records a.md as defining only process_slot
+    spec.write_text(spec.read_text() + "\n```python\ndef process_foo(state):\n    pass\n```\n")
+    _git(specs, "commit", "-qam", "bump")
+    changed = changed_spec_functions(specs, ["phase0"], "HEAD~1")
+    assert [fn.name for fn in changed] == ["process_foo"]
+    pairs = scoped_pairs(config, [], {}, 1, changed, {})
+    assert [(s.name, c.name) for s, c in pairs] == [("process_foo", "processFoo")]
+
+
+def test_filter_keeps_changed_spec():
+    spec_a = SpecFunction(name="a", source="", args=[], file_path="spec/a.md")
+    spec_b = SpecFunction(name="b", source="", args=[], file_path="spec/b.md")
+    pairs = [
+        (spec_a, ClientFunction(name="a", source="", params=[], file_path="src/a.ts")),
+        (spec_b, ClientFunction(name="b", source="", params=[], file_path="src/b.ts")),
+    ]
+    filtered = filter_pairs_by_changed_files(pairs, [], [spec_b])
+    assert [spec.name for spec, _ in filtered] == ["b"]
+
+
+def test_filter_pairs_by_changed_lines(tmp_path):
+    from eth_spec_lint.ci.pr_filter import ChangedLines, changed_functions, filter_pairs_by_changed_lines
+
+    path = str(tmp_path / "a.ts")
+    helper = ClientFunction(name="helper", source="", file_path=path, line_number=1, end_line=3)
+    edited = ClientFunction(name="processSlot", source="", file_path=path, line_number=5, end_line=9)
+    caller = ClientFunction(name="processEpoch", source="helper(x)", file_path=path, line_number=11, end_line=12)
+    other = ClientFunction(name="processBlock", source="helpers(x)", file_path=path, line_number=14, end_line=20)
+    spec = SpecFunction(name="s", source="", args=[], file_path="spec/s.md")
+    changed = ChangedLines({path: [(2, 2), (9, 10)]})
+
+    assert changed_functions([helper, edited, caller, other], changed) == [helper, edited, caller]
+    pairs = [(spec, edited), (spec, caller), (spec, other)]
+    assert filter_pairs_by_changed_lines(pairs, changed, [helper, edited, caller, other]) == pairs[:2]
+    assert filter_pairs_by_changed_lines(pairs, ChangedLines({}), [], [spec]) == pairs
@@ -0,0 +1,81 @@
+"""Tests for the client file name prefilter."""
+
+import pytest
+
+from eth_spec_lint.client.mapping import candidate_names
+from eth_spec_lint.client.prefilter import NamePrefilter
+from eth_spec_lint.parser.models import SpecFunction
+
+
+def test_prefilter_whole_identifiers():
+    f = NamePrefilter(["processSlot", "processSlots", "process_slot", "getBeaconProposer"])
+    assert f.search(b"export function processSlot(state) {}")
+    assert f.search(b"x = processSlots;")
+    assert f.search(b"const getBeaconProposer = () => 0")
+    assert not f.search(b"processSlotting(); $processSlot; processSlot_x")
+    assert not f.search(b"")
+    assert not NamePrefilter([]).search(b"anything")
+
+
+def test_prefilter_matches_naive_search():
+    import random
+    import re
+
+    rng = random.Random(0)
+    names = {"".join(rng.choice("abAB_") for _ in range(rng.randint(1, 5))) for _ in range(50)}
+    f = NamePrefilter(names)
+    for _ in range(300):
+        text = " ".join("".join(rng.choice("abAB_") for _ in range(rng.randint(1, 6))) for _ in range(3))
+        expected = any(re.search(rf"(?<![\w$]){re.escape(n)}(?![\w$])", text, re.IGNORECASE) for n in names)
+        assert f.search(text.encode()) == expected, text
+
+
+def test_prefilter_matches_file(tmp_path):
+    f = NamePrefilter(["processSlot"])
+    hit, miss, empty = tmp_path / "a.ts", tmp_path / "b.ts", tmp_path / "c.ts"
+    hit.write_text("function processSlot() {}")
+    miss.write_text("function unrelated() {}")
+    empty.write_text("")
+    assert f.matches_file(hit)
+    assert not f.matches_file(miss)
+    assert not f.matches_file(empty)
+
+
+def test_candidate_names():
+    spec_fns = [SpecFunction(name="process_slot", source="", args=[])]
+    assert candidate_names(spec_fns, {"process_slot": "customSlot"}) == {
+        "process_slot", "processSlot", "customSlot",
+    }
+
+
+try:
+    import tree_sitter_typescript  # noqa: F401
+    _HAS_TREESITTER = True
+except ImportError:
+    _HAS_TREESITTER = False
+
+
+@pytest.mark.skipif(not _HAS_TREESITTER, reason="tree-sitter not installed")
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_analyzer_skips_unrelated_files(tmp_path, jobs):
+    from eth_spec_lint.client.lodestar import LodestarAnalyzer
+
+    (tmp_path / "a.ts").write_text("export function processSlot(state) {}\n")
+    (tmp_path / "b.ts").write_text("export function unrelated() {}\n")
+    (tmp_path / "c.ts").write_text("export function alsoUnrelated() {}\n")
+    analyzer = LodestarAnalyzer(jobs=jobs, prefilter=NamePrefilter(["processSlot"]))
+    fns = analyzer.analyze([str(tmp_path / "*.ts")])
+    assert [f.name for f in fns] == ["processSlot"]
+    assert analyzer.skipped == 2
+
+
+def test_prefilter_keeps_files_mapping_pairs(tmp_path):
+    from eth_spec_lint.client.base import ClientFunction
+    from eth_spec_lint.client.mapping import build_mapping
+
+    spec_fns = [SpecFunction(name="get_bls_pubkey", source="", args=["x"])]
+    source = tmp_path / "bls.ts"
+    source.write_text("export function getBLSPubkey(x) {}\n")
+    assert NamePrefilter(candidate_names(spec_fns)).matches_file(source)
+    pairs = build_mapping(spec_fns, [ClientFunction(name="getBLSPubkey", params=["x"])])
+    assert [c.name for _, c in pairs] == ["getBLSPubkey"]
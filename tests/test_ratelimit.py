@@ -0,0 +1,116 @@
+"""Tests for provider rate limiting and retry backoff."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from eth_spec_lint.compare.engine import _call_llm
+from eth_spec_lint.compare.providers import LLMResponse
+from eth_spec_lint.compare.ratelimit import (
+    RateLimiter,
+    backoff_delay,
+    is_retryable,
+    retry_after_seconds,
+)
+from eth_spec_lint.config import Config
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeStatusError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        self.response = type("Resp", (), {"headers": headers or {}})()
+
+
+def test_backoff_delay_bounds():
+    for attempt in range(8):
+        assert 0 <= backoff_delay(attempt, cap=10) <= 10
+    assert backoff_delay(0, retry_after=5.0) >= 5.0
+
+
+def test_retry_after_parsing():
+    assert retry_after_seconds({"retry-after": "3"}) == 3.0
+    assert retry_after_seconds({"retry-after-ms": "250", "retry-after": "3"}) == 0.25
+    assert retry_after_seconds({}) is None
+
+
+def test_is_retryable():
+    assert is_retryable(FakeStatusError(429))
+    assert is_retryable(FakeStatusError(529))
+    assert not is_retryable(FakeStatusError(400))
+    assert not is_retryable(ValueError("nope"))
+
+
+def test_limiter_halves_on_throttle_and_recovers():
+    clock = FakeClock()
+    limiter = RateLimiter(8, clock=clock)
+
+    tickets = [limiter.acquire() for _ in range(4)]
+    # A burst of throttles from the same generation only halves once
+    for t in tickets:
+        limiter.release(t, throttled=True)
+    assert limiter.limit == 4
+
+    for _ in range(4):
+        limiter.release(limiter.acquire())
+    assert limiter.limit == 5
+
+
+def test_limiter_learns_limits_and_pauses_from_headers():
+    clock = FakeClock()
+    limiter = RateLimiter(4, clock=clock)
+    ticket = limiter.acquire(100)
+    limiter.release(ticket, tokens=150, headers={
+        "anthropic-ratelimit-requests-limit": "50",
+        "x-ratelimit-remaining-tokens": "0",
+        "x-ratelimit-reset-tokens": "2s",
+    })
+    assert limiter.requests_per_minute == 50
+    assert limiter._wait_time(clock(), 0) == pytest.approx(2.0)
+
+
+def test_limiter_token_budget_wait():
+    clock = FakeClock()
+    limiter = RateLimiter(4, tokens_per_minute=1000, clock=clock)
+    limiter.release(limiter.acquire(800))
+    clock.now += 10
+    assert limiter._wait_time(clock(), 300) == pytest.approx(50.0)
+    assert limiter._wait_time(clock(), 100) <= 0
+
+
+@patch("eth_spec_lint.compare.engine.time.sleep")
+def test_call_llm_retries_throttling(mock_sleep):
+    provider = MagicMock()
+    provider.complete.side_effect = [
+        FakeStatusError(429, {"retry-after-ms": "10"}),
+        FakeStatusError(529),
+        LLMResponse(text="[]"),
+    ]
+    assert _call_llm("prompt", Config(), provider=provider).text == "[]"
+    assert provider.complete.call_count == 3
+    assert mock_sleep.call_args_list[0].args[0] >= 0.01
+
+
+@patch("eth_spec_lint.compare.engine.time.sleep")
+def test_call_llm_gives_up(mock_sleep):
+    config = Config()
+    config.llm.max_retries = 2
+    provider = MagicMock()
+    provider.complete.side_effect = FakeStatusError(429)
+    with pytest.raises(FakeStatusError):
+        _call_llm("prompt", config, provider=provider)
+    assert provider.complete.call_count == 3
+
+    provider.complete.reset_mock()
+    provider.complete.side_effect = FakeStatusError(400)
+    with pytest.raises(FakeStatusError):
+        _call_llm("prompt", config, provider=provider)
+    assert provider.complete.call_count == 1
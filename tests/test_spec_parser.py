@@ -48,3 +48,234 @@ def test_fork_resolution():
     resolved = resolve_functions(fns)
     assert resolved["foo"].source == "v2"
     assert resolved["foo"].fork == "altair"
+
+
+def _spec_repo(tmp_path):
+    specs = tmp_path / "specs" / "phase0"
+    specs.mkdir(parents=True)
+    (specs / "beacon-chain.md").write_text(FIXTURE.read_text())
+    return tmp_path
+
+
+def test_parse_index_reuses_unchanged_files(tmp_path, monkeypatch):
+    from eth_spec_lint.file_index import FileIndex
+    from eth_spec_lint.parser import spec_parser
+
+    repo = _spec_repo(tmp_path)
+    db = tmp_path / "index.db"
+    with FileIndex(db, "spec", spec_parser.PARSER_VERSION) as index:
+        cold = spec_parser.parse_spec_repo(repo, ["phase0"], index)
+    assert index.misses == 1
+
+    def fail(*args, **kwargs):
+        raise AssertionError("unchanged file was re-parsed")
+
+    monkeypatch.setattr(spec_parser, "parse_spec_text", fail)
+    with FileIndex(db, "spec", spec_parser.PARSER_VERSION) as index:
+        warm = spec_parser.parse_spec_repo(repo, ["phase0"], index)
+    assert index.hits == 1
+    assert warm == cold
+
+
+def test_parse_index_reparses_changed_files(tmp_path):
+    from eth_spec_lint.file_index import FileIndex
+    from eth_spec_lint.parser import spec_parser
+
+    repo = _spec_repo(tmp_path)
+    db = tmp_path / "index.db"
+    with FileIndex(db, "spec", spec_parser.PARSER_VERSION) as index:
+        spec_parser.parse_spec_repo(repo, ["phase0"], index)
+
+    md = repo / "specs" / "phase0" / "beacon-chain.md"
+    md.write_text(md.read_text() + "\n```python\ndef added() -> None:\n    pass\n```\n")
+    with FileIndex(db, "spec", spec_parser.PARSER_VERSION) as index:
+        fns, _, _ = spec_parser.parse_spec_repo(repo, ["phase0"], index)
+    assert index.misses == 1
+    assert "added" in [f.name for f in fns]
+
+    # A new parser version invalidates everything
+    with FileIndex(db, "spec", "test-next") as index:
+        spec_parser.parse_spec_repo(repo, ["phase0"], index)
+    assert index.misses == 1
+
+
+def test_parse_spec_repo_parallel_matches_serial(tmp_path):
+    from eth_spec_lint.parser.spec_parser import parse_spec_repo
+
+    text = FIXTURE.read_text()
+    for fork in ("phase0", "altair"):
+        specs = tmp_path / "specs" / fork
+        specs.mkdir(parents=True)
+        for name in ("a", "b", "c"):
+            (specs / f"{name}.md").write_text(text)
+
+    serial = parse_spec_repo(tmp_path, ["phase0", "altair"])
+    parallel = parse_spec_repo(tmp_path, ["phase0", "altair"], jobs=3)
+    assert parallel == serial
+    assert [f.fork for f in parallel[0]][-1] == "altair"
+
+
+def test_parse_spec_text_top_level_only():
+    from eth_spec_lint.parser.spec_parser import parse_spec_text
+
+    text = (
+        "```python\n"
+        "def outer(x: int) -> int:\n"
+        "    # Δ non-ASCII comment shifts byte offsets\n"
+        "    def inner() -> int:\n"
+        "        return 1\n"
+        "    return inner() + x\n"
+        "\n"
+        "class Config(Container):\n"
+        "    FLAG = 1\n"
+        "    slot: Slot\n"
+        "```\n"
+    )
+    fns, consts, containers = parse_spec_text(text, "phase0")
+    assert [f.name for f in fns] == ["outer"]
+    assert fns[0].source.startswith("def outer") and fns[0].source.endswith("return inner() + x")
+    assert consts == []
+    assert containers[0].source.endswith("slot: Slot")
+
+
+def test_parse_spec_text_crlf():
+    from eth_spec_lint.parser.spec_parser import extract_code_blocks, parse_spec_text
+
+    text = "```python\r\ndef f(x: int) -> int:\r\n    return x\r\n```\r\n"
+    fns, _, _ = parse_spec_text(text, "phase0")
+    assert [f.source for f in fns] == ["def f(x: int) -> int:\n    return x"]
+    assert extract_code_blocks(text) == ["def f(x: int) -> int:\n    return x\n"]
+
+
+def test_segment_matches_get_source_segment():
+    import ast
+
+    from eth_spec_lint.parser.spec_parser import _segment, _split_lines, extract_code_blocks
+
+    for block in extract_code_blocks(FIXTURE.read_text()):
+        lines = _split_lines(block)
+        for node in ast.parse(block).body:
+            assert _segment(lines, node) == ast.get_source_segment(block, node)
+
+
+def test_iter_code_blocks_fences():
+    from eth_spec_lint.parser.spec_parser import iter_code_blocks
+
+    markdown = (
+        "# Title\n"                     # 1
+        "```python title=\"x\"\n"       # 2
+        "A = 1\n"                       # 3
+        "```\n"                         # 4
+        "````markdown\n"                # 5
+        "```python\n"                   # 6
+        "B = 2\n"                       # 7
+        "```\n"                         # 8
+        "````\n"                        # 9
+        "- item\n"                      # 10
+        "  ~~~{.python}\n"              # 11
+        "  C = 3\n"                     # 12
+        "  ~~~\n"                       # 13
+        "```python\n"                   # 14
+        "D = 4\n"                       # 15
+    )
+    blocks = list(iter_code_blocks(markdown.splitlines(keepends=True)))
+    assert blocks == [("A = 1\n", 3), ("C = 3\n", 12), ("D = 4\n", 15)]
+
+
+def test_spec_line_numbers_are_absolute():
+    fns, consts, containers = parse_spec_file(FIXTURE, "phase0")
+    lines = FIXTURE.read_text().splitlines()
+    for record in [*fns, *containers]:
+        assert lines[record.line_number - 1].lstrip().startswith(("def ", "class ")), record.name
+    for const in consts:
+        assert lines[const.line_number - 1].startswith(const.name)
+
+
+def test_records_are_frozen_slotted_and_interned():
+    import dataclasses
+
+    import pytest
+
+    from eth_spec_lint.parser.models import SpecFunction
+
+    path = "".join(["specs/phase0/", "beacon-chain.md"])
+    a = SpecFunction(name="foo", source="", args=["state"], fork="phase0", file_path=path)
+    b = SpecFunction(name="bar", source="", args=["state"], fork="phase0", file_path=path[:-3] + ".md")
+    assert a.args == ("state",)
+    assert a.file_path is b.file_path
+    assert not hasattr(a, "__dict__")
+    assert hash(a) != hash(b)
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        a.name = "baz"
+
+
+def test_fork_graph_versions_and_inheritance():
+    from eth_spec_lint.parser.fork_graph import ForkGraph, ForkRegistry
+    from eth_spec_lint.parser.models import SpecFunction
+
+    forks = ForkRegistry(["phase0", "altair", "bellatrix", "capella"])
+    graph = ForkGraph([
+        SpecFunction(name="foo", source="v1", args=[], fork="phase0"),
+        SpecFunction(name="foo", source="v1", args=[], fork="bellatrix"),  # unchanged redefinition
+        SpecFunction(name="foo", source="v2", args=[], fork="capella"),
+        SpecFunction(name="bar", source="b", args=[], fork="altair"),
+    ], forks)
+    assert graph.definition("foo", "altair").fork == "phase0"
+    assert graph.definition("bar", "phase0") is None
+    assert graph.latest("foo").source == "v2"
+    assert [(v.function.source, v.forks) for v in graph.versions("foo")] == [
+        ("v1", ("phase0", "altair", "bellatrix")),
+        ("v2", ("capella",)),
+    ]
+    assert [v.forks for v in graph.versions("bar")] == [("altair", "bellatrix", "capella")]
+
+
+def test_fork_registry_undeclared_fork_inherits_config_order():
+    from eth_spec_lint.parser.fork_graph import ForkGraph, ForkRegistry
+    from eth_spec_lint.parser.models import SpecConstant, SpecFunction
+
+    # Metadata predating the newest configured fork
+    registry = ForkRegistry(
+        ["phase0", "altair", "bellatrix", "fulu"],
+        {"phase0": None, "altair": "phase0", "bellatrix": "altair"},
+    )
+    assert registry.forks == ["phase0", "altair", "bellatrix", "fulu"]
+    assert registry.ancestors("fulu") == ["fulu", "bellatrix", "altair", "phase0"]
+
+    consts = [SpecConstant(name="X", value="4", fork="fulu"), SpecConstant(name="X", value="3", fork="bellatrix")]
+    assert registry.resolve(consts)["X"].value == "4"
+    graph = ForkGraph([SpecFunction(name="f", source="v1", args=[], fork="altair")], registry)
+    assert graph.definition("f", "fulu").source == "v1"
+
+
+def test_fork_registry_from_consensus_specs_metadata(tmp_path):
+    from eth_spec_lint.config import SpecConfig
+    from eth_spec_lint.parser.fork_graph import ForkRegistry, SpecView
+    from eth_spec_lint.parser.models import SpecConstant
+
+    pysetup = tmp_path / "pysetup"
+    pysetup.mkdir()
+    (pysetup / "constants.py").write_text("PHASE0 = 'phase0'\nALTAIR = 'altair'\nEIP7594 = 'eip7594'\nELECTRA = 'electra'\n")
+    (pysetup / "md_doc_paths.py").write_text(
+        "from .constants import *\n"
+        "PREVIOUS_FORK_OF = {\n"
+        "    PHASE0: None,\n    ALTAIR: PHASE0,\n    ELECTRA: ALTAIR,\n    EIP7594: ALTAIR,\n"
+        "}\n"
+    )
+    registry = ForkRegistry.from_config(SpecConfig(repo_path=str(tmp_path), forks=["phase0", "eip7594", "altair", "electra"]))
+    assert registry.forks == ["phase0", "altair", "eip7594", "electra"]
+    assert registry.ancestors("eip7594") == ["eip7594", "altair", "phase0"]
+
+    consts = [
+        SpecConstant(name="X", value="3", fork="electra"),
+        SpecConstant(name="X", value="1", fork="phase0"),
+        SpecConstant(name="X", value="2", fork="eip7594"),
+        SpecConstant(name="X", value="9", fork="unknown_b"),
+        SpecConstant(name="X", value="8", fork="unknown_a"),
+    ]
+    view = SpecView([], consts, [], registry)
+    assert view.latest.constants["X"].value == "9"
+    assert view.as_of("eip7594").constants["X"].value == "2"
+    assert view.as_of("altair").constants["X"].value == "1"
+    assert view.as_of("electra").constants["X"].value == "3"
+    assert view.as_of("altair") is view.as_of("altair")